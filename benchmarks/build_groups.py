@@ -0,0 +1,115 @@
+"""Build groups bookkeeping scaling benchmark.
+
+Simulates the group bookkeeping of a rig build with synthetic components:
+each component creates a chain of controls (the parent of each control is
+the previous one) in one group, with the Main.addCtl parent check, and the
+Rig.finalize collects the groups of all the components.
+
+The legacy bookkeeping (lists and list membership) is compared with the
+build_groups.MemberList. The time per control of the legacy version grows
+with the number of controls per group, the MemberList one stays flat.
+
+The nodes are python objects with python level __eq__ and __hash__, like
+the pymel nodes, so the membership test cost is comparable.
+
+Usage:
+    python benchmarks/build_groups.py [--components 20]
+"""
+import argparse
+
+import common
+
+
+class FakeNode(object):
+
+    __slots__ = ["handle"]
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def __eq__(self, other):
+        return isinstance(other, FakeNode) and self.handle == other.handle
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.handle)
+
+
+def legacy_build(n_components, n_controls):
+    """Bookkeeping before build_groups."""
+    rig_groups = {}
+    handle = 0
+    for c in range(n_components):
+        groups = {}
+        transform2Lock = []
+        parent = FakeNode(handle)
+        handle += 1
+        for i in range(n_controls):
+            ctl = FakeNode(handle)
+            handle += 1
+            # Main.addToGroup
+            for name in ["controllers"]:
+                if name not in groups.keys():
+                    groups[name] = []
+                groups[name].extend([ctl])
+            # Main.addCtl
+            if parent not in groups["controllers"]:
+                transform2Lock.append(parent)
+            parent = ctl
+        # Rig.finalize > Rig.addToGroup
+        for name, objects in groups.items():
+            if name not in rig_groups.keys():
+                rig_groups[name] = []
+            rig_groups[name].extend(objects)
+    return rig_groups
+
+
+def member_list_build(build_groups, n_components, n_controls):
+    """Bookkeeping with build_groups."""
+    rig_groups = {}
+    handle = 0
+    for c in range(n_components):
+        groups = {}
+        transform2Lock = []
+        parent = FakeNode(handle)
+        handle += 1
+        for i in range(n_controls):
+            ctl = FakeNode(handle)
+            handle += 1
+            build_groups.add_to_groups(groups, [ctl], ["controllers"])
+            if parent not in groups["controllers"]:
+                transform2Lock.append(parent)
+            parent = ctl
+        for name, objects in groups.items():
+            build_groups.add_to_groups(rig_groups, objects, [name])
+    return rig_groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=20)
+    args = parser.parse_args()
+
+    build_groups = common.load_module("build_groups")
+
+    print("{:>10} {:>14} {:>14} {:>9}".format(
+        "ctl/group", "legacy us/ctl", "new us/ctl", "speedup"))
+    for n_controls in [10, 100, 1000]:
+        total = args.components * n_controls
+        legacy = common.timed(
+            lambda: legacy_build(args.components, n_controls))
+        new = common.timed(
+            lambda: member_list_build(build_groups,
+                                      args.components,
+                                      n_controls))
+        print("{:>10} {:>14.2f} {:>14.2f} {:>8.1f}x".format(
+            n_controls,
+            legacy / total * 1e6,
+            new / total * 1e6,
+            legacy / new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Shared helpers for the Shifter benchmarks.
+
+The benchmarks that need Maya must be run with mayapy, with mGear in the
+python path (ie. the mGear module installed or MAYA_MODULE_PATH set).
+"""
+import copy
+import imp
+import json
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_PATH = os.path.join(ROOT, "scripts")
+TEMPLATES_PATH = os.path.join(
+    SCRIPTS_PATH, "mgear", "shifter", "component", "_templates")
+
+BIPED = os.path.join(TEMPLATES_PATH, "biped.sgt")
+METAHUMAN = os.path.join(TEMPLATES_PATH, "EPIC_metahuman_z_up.sgt")
+MANNEQUIN = os.path.join(TEMPLATES_PATH, "EPIC_mannequin_z_up.sgt")
+QUADRUPED = os.path.join(TEMPLATES_PATH, "quadruped.sgt")
+
+
+def initialize_maya():
+    """Initialize maya standalone and load the mGear plugins."""
+    if SCRIPTS_PATH not in sys.path:
+        sys.path.insert(0, SCRIPTS_PATH)
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    from maya import cmds
+    for plugin in ["mgear_solvers", "matrixNodes"]:
+        try:
+            cmds.loadPlugin(plugin, quiet=True)
+        except RuntimeError:
+            print("Can't load plugin: {}".format(plugin))
+
+
+def load_module(name):
+    """Load a standard library only shifter module, without importing the
+    shifter package (that needs Maya).
+
+    Args:
+        name (str): Module name, ie. "guide_template_binary"
+
+    Returns:
+        module: The module
+    """
+    return imp.load_source(
+        name, os.path.join(SCRIPTS_PATH, "mgear", "shifter", name + ".py"))
+
+
+def new_scene():
+    from maya import cmds
+    cmds.file(new=True, force=True)
+
+
+def load_template(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def timed(func, repeat=3):
+    """Run a function several times.
+
+    Returns:
+        float: best time in seconds
+    """
+    times = []
+    for i in range(repeat):
+        start = timeit.default_timer()
+        func()
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+def _rename_references(value, names):
+    for old, new in names.items():
+        value = re.sub(r"(?<![A-Za-z0-9]){}(?=_)".format(old), new, value)
+    return value
+
+
+def synthetic_template(conf, count):
+    """Create a big template replicating the components of a template.
+
+    Each copy of the components gets a different component name, and the
+    parenting, children and string references are renamed to point to the
+    copy.
+
+    Args:
+        conf (dict): Template to replicate
+        count (int): Number of components of the new template
+
+    Returns:
+        dict: The synthetic template
+    """
+    conf = copy.deepcopy(conf)
+    base_list = list(conf["components_list"])
+    base_dict = conf["components_dict"]
+    conf["ctl_buffers_dict"] = None
+    n_copy = 0
+    while len(conf["components_list"]) < count:
+        n_copy += 1
+        names = {}
+        for name in base_list:
+            c_name, c_side_index = name.rsplit("_", 1)
+            names[name] = "{}S{}_{}".format(c_name, n_copy, c_side_index)
+        for name in base_list:
+            if len(conf["components_list"]) >= count:
+                break
+            comp = copy.deepcopy(base_dict[name])
+            values = comp["param_values"]
+            values["comp_name"] = "{}S{}".format(values["comp_name"], n_copy)
+            for k, v in values.items():
+                if isinstance(v, str) or type(v).__name__ == "unicode":
+                    values[k] = _rename_references(v, names)
+            if comp["parent_fullName"]:
+                comp["parent_fullName"] = names[comp["parent_fullName"]]
+            comp["child_components"] = [names[c]
+                                        for c in comp["child_components"]]
+            conf["components_dict"][names[name]] = comp
+            conf["components_list"].append(names[name])
+
+    existing = set(conf["components_list"])
+    for comp in conf["components_dict"].values():
+        comp["child_components"] = [c for c in comp["child_components"]
+                                    if c in existing]
+    return conf
@@ -0,0 +1,70 @@
+"""Guide parse benchmark.
+
+Time guide.Rig.setFromHierarchy on the biped, the metahuman and a synthetic
+500 components guide, resolving the component locators with the shared
+guide index and with the legacy dag.findChild search.
+
+Usage:
+    mayapy benchmarks/guide_parse.py [--repeat 3]
+"""
+import argparse
+
+import common
+
+
+def parse(model):
+    from mgear import shifter
+    rig = shifter.Rig()
+    rig.guide.setFromHierarchy(model, True)
+    return rig
+
+
+def legacy_find(self, name):
+    from mgear.core import dag
+    return dag.findChild(self.model, name)
+
+
+def run(label, conf, repeat):
+    import pymel.core as pm
+    from mgear.shifter import io, guide_index
+
+    common.new_scene()
+    io.import_guide_template(conf=conf)
+    model = pm.PyNode("guide")
+
+    indexed = common.timed(lambda: parse(model), repeat)
+
+    find = guide_index.GuideIndex.find
+    guide_index.GuideIndex.find = legacy_find
+    try:
+        legacy = common.timed(lambda: parse(model), repeat)
+    finally:
+        guide_index.GuideIndex.find = find
+
+    print("{:<24} {:>6} {:>12.4f} {:>12.4f} {:>8.2f}x".format(
+        label,
+        len(conf["components_list"]),
+        legacy,
+        indexed,
+        legacy / max(indexed, 1e-9)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    common.initialize_maya()
+    biped = common.load_template(common.BIPED)
+    cases = [("biped", biped),
+             ("metahuman", common.load_template(common.METAHUMAN)),
+             ("synthetic_500", common.synthetic_template(biped, 500))]
+
+    print("{:<24} {:>6} {:>12} {:>12} {:>9}".format(
+        "guide", "comps", "findChild", "index", "speedup"))
+    for label, conf in cases:
+        run(label, conf, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
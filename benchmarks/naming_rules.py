@@ -0,0 +1,64 @@
+"""Naming rule solver micro benchmark.
+
+Compare the names per second of the legacy name_solve, that parses and
+validates the rule on each call, with the compiled naming rules.
+
+Usage:
+    mayapy benchmarks/naming_rules.py [--count 100000]
+"""
+import argparse
+import string
+import timeit
+
+import common
+
+
+def legacy_name_solve(naming, rule, values, validate=True):
+    """name_solve before the compiled naming rules."""
+    included_val = dict()
+    if validate and not naming.name_rule_validator(
+            rule, naming.NAMING_RULE_TOKENS):
+        return
+    for token in string.Formatter().parse(rule):
+        if token[1]:
+            try:
+                included_val[token[1]] = values[token[1]]
+            except KeyError:
+                continue
+        elif token[0]:
+            continue
+        else:
+            return
+
+    return rule.format(**included_val)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    naming = common.load_module("naming")
+    values = {"component": "arm",
+              "side": "L",
+              "index": "0",
+              "description": "fk0",
+              "extension": "ctl"}
+    rule = naming.DEFAULT_NAMING_RULE
+    compiled = naming.get_name_rule(rule)
+
+    cases = [
+        ("legacy name_solve",
+         lambda: legacy_name_solve(naming, rule, values)),
+        ("cached name_solve",
+         lambda: naming.name_solve(rule, values)),
+        ("compiled NameRule.solve",
+         lambda: compiled.solve(values))]
+
+    for label, func in cases:
+        seconds = min(timeit.repeat(func, number=args.count, repeat=3))
+        print("{:<28} {:>12.0f} names/s".format(label, args.count / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Partial build benchmark.
+
+Build the biped with all its components, then only some of them with
+Rig.buildFromDict(components=...), and check that the partial build creates
+the requested components, with stubs for the components they need.
+
+Usage:
+    mayapy benchmarks/partial_build.py [--components arm_L0 leg_R0]
+"""
+import argparse
+
+import common
+
+
+def build(conf, components=None):
+    from mgear import shifter
+    common.new_scene()
+    rig = shifter.Rig()
+    rig.buildFromDict(conf, components=components)
+    return rig
+
+
+def check(rig, components):
+    """Check the components of a partial build.
+
+    Raises:
+        RuntimeError: A component is missing or wasn't requested
+    """
+    built = set(rig.components)
+    missing = set(components) - built
+    if missing:
+        raise RuntimeError("Not built: {}".format(", ".join(sorted(missing))))
+    extra = built - set(components) - rig.stubComponents
+    if extra:
+        raise RuntimeError("Built without request: {}".format(
+            ", ".join(sorted(extra))))
+    missing = built - set(rig.components_infos)
+    if missing:
+        raise RuntimeError("No component infos: {}".format(
+            ", ".join(sorted(missing))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", nargs="+",
+                        default=["arm_L0", "leg_R0"])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    common.initialize_maya()
+    conf = common.load_template(common.BIPED)
+
+    holder = {}
+
+    def partial():
+        holder["rig"] = build(conf, args.components)
+
+    full_time = common.timed(lambda: build(conf), args.repeat)
+    partial_time = common.timed(partial, args.repeat)
+    rig = holder["rig"]
+    check(rig, args.components)
+
+    print("{:<10} {:>6} {:>6} {:>10}".format("build", "comps", "stubs", "s"))
+    print("{:<10} {:>6} {:>6} {:>10.2f}".format(
+        "full", len(conf["components_list"]), 0, full_time))
+    print("{:<10} {:>6} {:>6} {:>10.2f}".format(
+        "partial",
+        len(rig.components) - len(rig.stubComponents),
+        len(rig.stubComponents),
+        partial_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Guide template format benchmark.
+
+Compare the file size and the load time of the shipped .sgt templates with
+the compact binary format, uncompressed and compressed, and check that the
+round trip is lossless, also when the matrices and positions are tuples like
+the PyMEL get() values. It doesn't need Maya.
+
+Usage:
+    python benchmarks/template_format.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+
+import common
+
+
+def as_tuples(value):
+    """Replace the lists of a template with tuples.
+
+    The dictionaries are updated in place, to keep their key order.
+    """
+    if isinstance(value, dict):
+        for k, v in value.items():
+            value[k] = as_tuples(v)
+        return value
+    if isinstance(value, list):
+        return tuple(as_tuples(v) for v in value)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    binary = common.load_module("guide_template_binary")
+
+    line = "{:<26} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}"
+    print(line.format("template", "json KB", "raw KB", "zlib KB",
+                      "json ms", "raw ms", "zlib ms"))
+    for path in [common.BIPED, common.QUADRUPED,
+                 common.MANNEQUIN, common.METAHUMAN]:
+        with open(path, "r") as f:
+            text = f.read()
+        conf = json.loads(text)
+        raw = binary.dumps(conf, compress=False)
+        compressed = binary.dumps(conf, compress=True)
+        for data in [raw, compressed]:
+            if binary.loads(data) != conf:
+                raise RuntimeError("Round trip failed: {}".format(path))
+        tuples = binary.dumps(as_tuples(json.loads(text)), compress=False)
+        if tuples != raw:
+            raise RuntimeError("Tuple round trip failed: {}".format(path))
+
+        json_time = common.timed(lambda: json.loads(text), args.repeat)
+        raw_time = common.timed(lambda: binary.loads(raw), args.repeat)
+        zlib_time = common.timed(lambda: binary.loads(compressed),
+                                 args.repeat)
+
+        print(line.format(os.path.basename(path),
+                          len(text) // 1024,
+                          len(raw) // 1024,
+                          len(compressed) // 1024,
+                          "{:.2f}".format(json_time * 1000),
+                          "{:.2f}".format(raw_time * 1000),
+                          "{:.2f}".format(zlib_time * 1000)))
+
+
+if __name__ == "__main__":
+    main()
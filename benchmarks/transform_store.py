@@ -0,0 +1,137 @@
+"""Component guide transform storage benchmark.
+
+Loads the transforms of all the components of a template (tra, atra, pos,
+apos and blade) the legacy way, one PyMEL matrix or vector per value, and
+with the transform_store.TransformStore, then exports them back to the
+template format. Prints the load time, the export time and the memory
+allocated by the loaded transforms.
+
+With mayapy the legacy objects are the PyMEL datatypes. Without Maya they
+are python objects holding the nested lists, so the legacy numbers are a
+lower bound. The memory is measured with tracemalloc (python 3).
+
+Usage:
+    python benchmarks/transform_store.py [--repeat 3] [--components 2000]
+"""
+import argparse
+
+import common
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+class FakeValue(object):
+    """Stand-in of a PyMEL matrix or vector without Maya."""
+
+    __slots__ = ["values"]
+
+    def __init__(self, values):
+        self.values = [list(v) if isinstance(v, list) else v
+                       for v in values]
+
+    def get(self):
+        return self.values
+
+
+def get_types():
+    try:
+        from pymel.core import datatypes
+        return datatypes.Matrix, datatypes.Vector
+    except ImportError:
+        return FakeValue, FakeValue
+
+
+def legacy_load(components, Matrix, Vector):
+    """Transforms before transform_store."""
+    loaded = []
+    for c_dict in components:
+        tra = dict((k, Matrix(v)) for k, v in c_dict["tra"].items())
+        atra = [Matrix(t) for t in c_dict["atra"]]
+        pos = dict((k, Vector(v)) for k, v in c_dict["pos"].items())
+        apos = [Vector(v) for v in c_dict["apos"]]
+        blades = dict((k, Matrix(v)) for k, v in c_dict["blade"].items())
+        loaded.append((tra, atra, pos, apos, blades))
+    return loaded
+
+
+def legacy_export(loaded):
+    for tra, atra, pos, apos, blades in loaded:
+        dict((k, m.get()) for k, m in tra.items())
+        [t.get() for t in atra]
+        dict((k, v.get()) for k, v in pos.items())
+        [p.get() for p in apos]
+        dict((k, m.get()) for k, m in blades.items())
+
+
+def store_load(transform_store, components):
+    return [transform_store.TransformStore.from_dict(c_dict)
+            for c_dict in components]
+
+
+def store_export(loaded):
+    for store in loaded:
+        dict((k, store.matrix(r)) for k, r in store.tra.items())
+        [store.matrix(r) for r in store.atra]
+        dict((k, store.position(r)) for k, r in store.pos.items())
+        [store.position(r) for r in store.apos]
+        dict((k, store.matrix(r)) for k, r in store.blades.items())
+
+
+def allocated(func):
+    """Memory allocated by the result of a function, in KB."""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--components", type=int, default=2000)
+    args = parser.parse_args()
+
+    transform_store = common.load_module("transform_store")
+    Matrix, Vector = get_types()
+
+    line = "{:<26} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}"
+    print(line.format("template", "old load", "new load", "old exp",
+                      "new exp", "old KB", "new KB"))
+    templates = [("biped", common.load_template(common.BIPED)),
+                 ("metahuman", common.load_template(common.METAHUMAN))]
+    templates.append(("synthetic {}".format(args.components),
+                      common.synthetic_template(templates[0][1],
+                                                args.components)))
+    for name, conf in templates:
+        components = list(conf["components_dict"].values())
+        old = legacy_load(components, Matrix, Vector)
+        new = store_load(transform_store, components)
+        old_load = common.timed(
+            lambda: legacy_load(components, Matrix, Vector), args.repeat)
+        new_load = common.timed(
+            lambda: store_load(transform_store, components), args.repeat)
+        old_export = common.timed(lambda: legacy_export(old), args.repeat)
+        new_export = common.timed(lambda: store_export(new), args.repeat)
+        old_kb = allocated(lambda: legacy_load(components, Matrix, Vector))
+        new_kb = allocated(lambda: store_load(transform_store, components))
+
+        def ms(seconds):
+            return "{:.1f}ms".format(seconds * 1000)
+
+        def kb(size):
+            return "n/a" if size is None else "{:.0f}".format(size)
+
+        print(line.format(name, ms(old_load), ms(new_load),
+                          ms(old_export), ms(new_export),
+                          kb(old_kb), kb(new_kb)))
+
+
+if __name__ == "__main__":
+    main()
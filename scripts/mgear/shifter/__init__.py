@@ -5,6 +5,7 @@ import os.path
 import sys
 
 # Maya
+import maya.cmds as cmds
 import pymel.core as pm
 from pymel.core import datatypes
 from pymel import versions
@@ -14,10 +15,16 @@ import mgear
 import mgear.core.utils
 from . import guide, component
 
-from mgear.core import primitive, attribute, skin, dag, icon, node
+from mgear.core import primitive, attribute, skin, dag, icon
 from mgear import shifter_classic_components
 from mgear import shifter_epic_components
 from mgear.shifter import naming
+from mgear.shifter import build_profiler
+from mgear.shifter import incremental_build
+from mgear.shifter import dependency_graph
+from mgear.shifter import build_groups
+from mgear.shifter import controller_tags
+from mgear.shifter import control_buffers
 
 
 # check if we have loaded the necessary plugins
@@ -40,6 +47,10 @@ SHIFTER_COMPONENT_ENV_KEY = "MGEAR_SHIFTER_COMPONENT_PATH"
 def log_window():
     log_window_name = "mgear_shifter_build_log_window"
     log_window_field_reporter = "mgear_shifter_log_field_reporter"
+    if pm.about(batch=True):
+        # no UI in batch mode (ie. mayapy)
+        mgear.logInfos()
+        return
     if not pm.window(log_window_name, exists=True):
         logWin = pm.window(log_window_name, title="Shifter Build Log",
                            iconName='Shifter Log')
@@ -57,38 +68,127 @@ def log_window():
     mgear.logInfos()
 
 
+def _defaultComponentDirectories():
+    """Get the default components directories"""
+    return [os.path.join(os.path.dirname(shifter_classic_components.__file__)),
+            os.path.join(os.path.dirname(shifter_epic_components.__file__))]
+
+
+class ComponentRegistry(object):
+    """Cache of the component directories and modules.
+
+    The component directories are scanned only once and the component
+    modules are imported only once per type. The cache is invalidated
+    explicitly with invalidate() (ie. reloadComponents) or when the
+    MGEAR_SHIFTER_COMPONENT_PATH value or the modification time of any of the
+    components base directories changes.
+
+    Attributes:
+        directories_cache (dict): {base path: [component types]}
+        modules (dict): Modules by (component type, is guide) key
+    """
+
+    def __init__(self):
+        self.signature = None
+        self.directories_cache = None
+        self.modules = {}
+
+    @staticmethod
+    def get_signature():
+        """Get the state of the components directories on disk.
+
+        Returns:
+            tuple: env value and base directories modification time
+        """
+        env = os.environ.get(SHIFTER_COMPONENT_ENV_KEY, "")
+        paths = _defaultComponentDirectories()
+        paths.extend([p for p in env.split(os.pathsep) if p])
+        signature = [env]
+        for path in paths:
+            try:
+                signature.append(os.stat(path).st_mtime)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def check(self):
+        """Invalidate the cache if the directories have changed on disk."""
+        signature = self.get_signature()
+        if signature != self.signature:
+            self.invalidate()
+            self.signature = signature
+
+    def invalidate(self):
+        """Clear the cache. Next query will scan the directories again."""
+        self.signature = None
+        self.directories_cache = None
+        self.modules = {}
+
+    def directories(self):
+        """Get the components directories
+
+        Returns:
+            dict: {base path: [component types]}
+        """
+        self.check()
+        if self.directories_cache is None:
+            self.directories_cache = \
+                mgear.core.utils.gatherCustomModuleDirectories(
+                    SHIFTER_COMPONENT_ENV_KEY,
+                    _defaultComponentDirectories())
+        return self.directories_cache
+
+    def get_module(self, comp_type, guide=False):
+        """Get the component module or the component guide module
+
+        Args:
+            comp_type (str): The component type
+            guide (bool, optional): If True, returns the guide module
+
+        Returns:
+            module: The component or guide module
+        """
+        self.check()
+        key = (comp_type, guide)
+        module = self.modules.get(key)
+        if module is None:
+            if guide:
+                defFmt = "mgear.core.shifter.component.{}.guide"
+                customFmt = "{}.guide"
+            else:
+                defFmt = "mgear.core.shifter.component.{}"
+                customFmt = "{}"
+            module = mgear.core.utils.importFromStandardOrCustomDirectories(
+                self.directories(), defFmt, customFmt, comp_type)
+            self.modules[key] = module
+        return module
+
+    def get_guide_class(self, comp_type):
+        """Get the Guide class of a component type"""
+        return getattr(self.get_module(comp_type, guide=True), "Guide")
+
+    def get_component_class(self, comp_type):
+        """Get the Component class of a component type"""
+        return getattr(self.get_module(comp_type), "Component")
+
+
+component_registry = ComponentRegistry()
+
+
 def getComponentDirectories():
     """Get the components directory"""
     # TODO: ready to support multiple default directories
-    return mgear.core.utils.gatherCustomModuleDirectories(
-        SHIFTER_COMPONENT_ENV_KEY,
-        [os.path.join(os.path.dirname(shifter_classic_components.__file__)),
-         os.path.join(os.path.dirname(shifter_epic_components.__file__))])
-    # return mgear.core.utils.gatherCustomModuleDirectories(
-    #     SHIFTER_COMPONENT_ENV_KEY,
-    #     os.path.join(os.path.dirname(shifter_classic_components.__file__)))
+    return component_registry.directories()
 
 
 def importComponentGuide(comp_type):
     """Import the Component guide"""
-    dirs = getComponentDirectories()
-    defFmt = "mgear.core.shifter.component.{}.guide"
-    customFmt = "{}.guide"
-
-    module = mgear.core.utils.importFromStandardOrCustomDirectories(
-        dirs, defFmt, customFmt, comp_type)
-    return module
+    return component_registry.get_module(comp_type, guide=True)
 
 
 def importComponent(comp_type):
     """Import the Component """
-    dirs = getComponentDirectories()
-    defFmt = "mgear.core.shifter.component.{}"
-    customFmt = "{}"
-
-    module = mgear.core.utils.importFromStandardOrCustomDirectories(
-        dirs, defFmt, customFmt, comp_type)
-    return module
+    return component_registry.get_module(comp_type)
 
 
 def reloadComponents(*args):
@@ -97,6 +197,7 @@ def reloadComponents(*args):
     Args:
         *args: Dummy
     """
+    component_registry.invalidate()
     compDir = getComponentDirectories()
 
     for x in compDir:
@@ -117,7 +218,21 @@ class Rig(object):
         groups (dic): Rig groups (Maya sets)
         components (dic): Dictionary for the rig components.
             Keys are the component fullname (ie. 'arm_L0')
-        componentsIndex (list): Components index list.
+        componentsIndex (list): Components index list, in build order.
+        components_infos (dict): Type, version and author of the built
+            components, by component fullname.
+        graph (DependencyGraph): Dependency graph of the guide components.
+        profile (bool): If True, the build is profiled and a report is saved
+            at the end of the build. Default from MGEAR_SHIFTER_PROFILE.
+        incremental (bool): If True and the same rig was built before in
+            this session, only the components with changes in the guide are
+            rebuilt. Default from MGEAR_SHIFTER_INCREMENTAL.
+        partial (list of str): Components to build. The components they
+            need (parents and references) are built as stubs and the rest
+            are not built. None to build all the components.
+        stubComponents (set): Components built as stubs in a partial build.
+        wholeGuide (bool): False if only the selected components of the
+            guide were parsed. The incremental build needs the whole guide.
 
     """
 
@@ -130,15 +245,39 @@ class Rig(object):
 
         self.components = {}
         self.componentsIndex = []
+        self.components_infos = {}
 
         self.customStepDic = {}
 
-    def buildFromDict(self, conf_dict):
+        self.profile = build_profiler.env_enabled(
+            build_profiler.SHIFTER_PROFILE_ENV_KEY)
+        self.profiler = build_profiler.NullProfiler()
+
+        self.incremental = build_profiler.env_enabled(
+            incremental_build.SHIFTER_INCREMENTAL_ENV_KEY)
+        self.wholeGuide = True
+        self.conf_dict = None
+        self.guideHashes = {}
+
+        self.partial = None
+        self.stubComponents = set()
+
+    def buildFromDict(self, conf_dict, components=None):
+        """Build the rig from a guide template dictionary.
+
+        Args:
+            conf_dict (dict): The guide template dictionary
+            components (list of str, optional): Partial build. Only these
+                components are built, with stubs for the parents and
+                references they need. The custom steps are skipped.
+        """
         log_window()
         startTime = datetime.datetime.now()
         mgear.log("\n" + "= SHIFTER RIG SYSTEM " + "=" * 46)
 
         self.stopBuild = False
+        self.conf_dict = conf_dict
+        self.partial = components
 
         self.guide.set_from_dict(conf_dict)
         endTime = datetime.datetime.now()
@@ -151,9 +290,13 @@ class Rig(object):
 
         # Build
         mgear.log("\n" + "= BUILDING RIG " + "=" * 46)
-        self.from_dict_custom_step(conf_dict, pre=True)
+        if self.partial:
+            mgear.log("Partial build: custom steps skipped")
+        else:
+            self.from_dict_custom_step(conf_dict, pre=True)
         self.build()
-        self.from_dict_custom_step(conf_dict, pre=False)
+        if not self.partial:
+            self.from_dict_custom_step(conf_dict, pre=False)
 
         endTime = datetime.datetime.now()
         finalTime = endTime - startTime
@@ -187,6 +330,7 @@ class Rig(object):
         if selection[0].hasAttr("ismodel"):
             self.preCustomStep(selection)
             ismodel = True
+        self.wholeGuide = ismodel
 
         if not self.stopBuild:
             mgear.log("\n" + "= GUIDE VALIDATION " + "=" * 46)
@@ -222,12 +366,187 @@ class Rig(object):
 
         self.customStepDic["mgearRun"] = self
 
-        self.initialHierarchy()
-        self.processComponents()
-        self.finalize()
+        self.profiler = build_profiler.get_profiler(
+            self.profile, self.options["rig_name"])
+
+        if not self.validateGraph():
+            self.stopBuild = True
+            return None
+
+        rebuild = None
+        if self.incremental and not self.partial:
+            rebuild = self.getIncrementalRebuild()
+
+        if rebuild is None:
+            with self.profiler.record("rig", "initialHierarchy"):
+                self.initialHierarchy()
+            self.hierarchyGroups = dict(
+                (k, build_groups.MemberList(v))
+                for k, v in self.groups.items())
+            self.components_infos = {}
+            self.processComponents(self.getPartialComponents())
+        else:
+            mgear.log("Incremental build: rebuilding {} components".format(
+                len(rebuild)))
+            self.processComponents(rebuild)
+        with self.profiler.record("rig", "finalize"):
+            self.finalize()
+
+        if self.incremental and not self.partial:
+            incremental_build.store_hashes(self.model, self.guideHashes)
+            incremental_build.register_rig(self)
+
+        self.profiler.report()
 
         return self.model
 
+    def validateGraph(self):
+        """Create the dependency graph of the components and validate it.
+
+        Returns:
+            bool: False if the guide can't be built
+        """
+        self.graph = dependency_graph.DependencyGraph.from_guide(self.guide)
+        errors, warnings = self.graph.validate()
+        for msg in warnings:
+            mgear.log(msg, mgear.sev_warning)
+        for msg in errors:
+            mgear.log(msg, mgear.sev_error)
+        return not errors
+
+    def getPartialComponents(self):
+        """Get the components of a partial build.
+
+        Returns:
+            list of str or None: The components to build, including the
+                stubs. None if is not a partial build
+        """
+        self.stubComponents = set()
+        if not self.partial:
+            return None
+
+        for name in self.partial:
+            if name not in self.graph:
+                mgear.log("Partial build: component {} not found".format(
+                    name), mgear.sev_warning)
+        build, self.stubComponents = self.graph.get_partial_build(
+            self.partial)
+        mgear.log("Partial build: {} components and {} stubs".format(
+            len(build), len(self.stubComponents)))
+        return list(build | self.stubComponents)
+
+    def getIncrementalRebuild(self):
+        """Prepare the incremental build of the rig.
+
+        If the same rig was built before in this session, the rig is taken
+        over and the components to rebuild are deleted from it.
+
+        Returns:
+            list of str or None: The components to rebuild, in build order.
+                None if the rig needs a full build
+        """
+        conf = self.conf_dict or self.guide.get_guide_template_dict()
+        self.guideHashes = incremental_build.component_hashes(conf)
+
+        previous = incremental_build.get_registered_rig(
+            self.options["rig_name"])
+        result = None
+        if not self.wholeGuide:
+            reason = "select the guide model to build only the changes"
+        elif previous is None:
+            reason = "the rig was not built in this session"
+        elif (self.options["importSkin"]
+                or self.options["doPreCustomStep"]
+                or self.options["doPostCustomStep"]):
+            reason = "skin import and custom steps need a full build"
+        else:
+            result = incremental_build.get_rebuild_list(
+                self.graph,
+                incremental_build.read_hashes(previous["model"]),
+                self.guideHashes)
+            reason = "the guide settings have changed"
+        if result is None:
+            mgear.log("Incremental build: full build, {}".format(reason))
+            return None
+
+        rebuild, removed = result
+        self.takeOverRig(previous)
+        self.removeComponents(removed + rebuild)
+        return rebuild
+
+    def takeOverRig(self, previous):
+        """Continue the build on the rig of a previous build.
+
+        Args:
+            previous (dict): The state of the previous build of the rig, see
+                incremental_build.RIG_STATE
+        """
+        for key, value in previous.items():
+            setattr(self, key, value)
+
+        self.groups = dict(
+            (k, build_groups.MemberList(v))
+            for k, v in self.hierarchyGroups.items())
+        self.subGroups = {}
+        for comp in self.components.values():
+            comp.rig = self
+            comp.options = self.options
+            if comp.fullName in self.guides:
+                comp.guide = self.guides[comp.fullName]
+
+        # the groups and the bind pose are created again in the finalize
+        old = self.model.rigGroups.inputs() + self.model.rigPoses.inputs()
+        if old:
+            pm.delete(old)
+
+    def removeComponents(self, names):
+        """Delete the rig objects of the components.
+
+        Deletes the component root and joints, the controller tags and the
+        attributes added to the UI host of other components.
+
+        Args:
+            names (list of str): Components full names
+        """
+        objects = []
+        for name in names:
+            comp = self.components.pop(name, None)
+            if comp is None:
+                continue
+            self.componentsIndex.remove(name)
+            self.components_infos.pop(name, None)
+
+            for host, attrName in getattr(comp, "hostAttributes", []):
+                if host.exists() and host.hasAttr(attrName):
+                    host.deleteAttr(attrName)
+
+            for ctl in comp.controlers:
+                if ctl.exists():
+                    objects.extend(pm.listConnections(ctl.message,
+                                                      type="controller"))
+            objects.extend([getattr(comp, "root", None),
+                            getattr(comp, "component_jnt_org", None)])
+            objects.extend(comp.jointList)
+
+        for obj in objects:
+            # children of objects deleted before are already gone
+            if obj is not None and obj.exists():
+                pm.delete(obj)
+
+    def getForeignHost(self, comp):
+        """Get the UI host of a component if it's not part of it.
+
+        Args:
+            comp (Component): The component
+
+        Returns:
+            dagNode or None: The UI host
+        """
+        ui_host = comp.settings["ui_host"]
+        if self.getComponentName(ui_host) == comp.fullName:
+            return None
+        return self.findRelative(ui_host)
+
     def stepsList(self, checker, attr):
         if self.options[checker] and self.options[attr]:
             return self.options[attr].split(",")
@@ -343,6 +662,7 @@ class Rig(object):
         self.rigGroups = self.model.addAttr("rigGroups", at='message', m=1)
         self.rigPoses = self.model.addAttr("rigPoses", at='message', m=1)
         self.rigCtlTags = self.model.addAttr("rigCtlTags", at='message', m=1)
+        self.controllerTags = controller_tags.ControllerTagManager(self.model)
         self.rigScriptNodes = self.model.addAttr(
             "rigScriptNodes", at='message', m=1)
 
@@ -385,45 +705,76 @@ class Rig(object):
             self.jnt_org = primitive.addTransformFromPos(self.model, "jnt_org")
             pm.connectAttr(self.jntVis_att, self.jnt_org.attr("visibility"))
 
-    def processComponents(self):
+    def processComponents(self, componentNames=None):
         """
         Process the components of the rig, following the creation steps.
+
+        The components are processed in the dependency graph order, so the
+        components are created after the components they depend on.
+
+        Args:
+            componentNames (list of str, optional): Components to process.
+                Default is all the guide components
         """
 
         # Init
-        self.components_infos = {}
+        if componentNames is None:
+            componentNames = self.guide.componentsIndex
 
-        for comp in self.guide.componentsIndex:
+        for comp in self.graph.schedule(componentNames):
             guide_ = self.guides[comp]
             mgear.log("Init : " + guide_.fullName + " (" + guide_.type + ")")
 
-            module = importComponent(guide_.type)
-            Component = getattr(module, "Component")
+            with self.profiler.record(guide_.fullName, "Init", guide_.type):
+                if guide_.fullName in self.stubComponents:
+                    Component = component.StubComponent
+                else:
+                    module = importComponent(guide_.type)
+                    Component = getattr(module, "Component")
 
-            comp = Component(self, guide_)
-            if comp.fullName not in self.componentsIndex:
+                comp = Component(self, guide_)
+            if comp.fullName not in self.components:
                 self.components[comp.fullName] = comp
                 self.componentsIndex.append(comp.fullName)
 
                 self.components_infos[comp.fullName] = [
                     guide_.compType, guide_.getVersion(), guide_.author]
 
+        # the components of an incremental build are added to the ones of
+        # the previous build
+        self.componentsIndex = self.graph.schedule(self.components)
+        stepComponents = self.graph.schedule(componentNames)
+
         # Creation steps
         self.steps = component.Main.steps
         for i, name in enumerate(self.steps):
             # for count, compName in enumerate(self.componentsIndex):
-            for compName in self.componentsIndex:
+            for compName in stepComponents:
                 comp = self.components[compName]
                 mgear.log(name + " : " + comp.fullName
                           + " (" + comp.type + ")")
-                comp.stepMethods[i]()
+                # track the attributes added to other components UI host,
+                # the incremental build needs to remove them
+                host = None
+                if self.incremental and i:
+                    host = self.getForeignHost(comp)
+                if host:
+                    hostAttrs = set(host.listAttr(userDefined=True))
+                with self.profiler.record(comp.fullName, name, comp.type):
+                    comp.stepMethods[i]()
+                if host:
+                    if not hasattr(comp, "hostAttributes"):
+                        comp.hostAttributes = []
+                    comp.hostAttributes.extend(
+                        [(host, a.attrName(longName=True))
+                         for a in host.listAttr(userDefined=True)
+                         if a not in hostAttrs])
 
             if self.options["step"] >= 1 and i >= self.options["step"] - 1:
                 break
 
     def finalize(self):
         """Finalize the rig."""
-        groupIdx = 0
 
         # Properties --------------------------------------
         mgear.log("Finalize")
@@ -435,48 +786,26 @@ class Rig(object):
                 if not jOrg.listRelatives(c=True):
                     pm.delete(jOrg)
 
+        # Controller tags ---------------------------------
+        with self.profiler.record("rig", "finalize.ctlTags"):
+            self.controllerTags.flush()
+
         # Groups ------------------------------------------
         mgear.log("Creating groups")
-        # Retrieve group content from components
-        for name in self.componentsIndex:
-            component_ = self.components[name]
-            for name, objects in component_.groups.items():
-                self.addToGroup(objects, name)
-            for name, objects in component_.subGroups.items():
-                self.addToSubGroup(objects, name)
-
-        # Create master set to group all the groups
-        masterSet = pm.sets(n=self.model.name() + "_sets_grp", em=True)
-        pm.connectAttr(masterSet.message, self.model.rigGroups[groupIdx])
-        groupIdx += 1
-
-        # Creating all groups
-        pm.select(cl=True)
-        for name, objects in self.groups.items():
-            s = pm.sets(n=self.model.name() + "_" + name + "_grp")
-            s.union(objects)
-            pm.connectAttr(s.message, self.model.rigGroups[groupIdx])
-            groupIdx += 1
-            masterSet.add(s)
-        for parentGroup, subgroups in self.subGroups.items():
-            pg = pm.PyNode(self.model.name() + "_" + parentGroup + "_grp")
-            for sg in subgroups:
-                sub = pm.PyNode(self.model.name() + "_" + sg + "_grp")
-                if sub in masterSet.members():
-                    masterSet.remove(sub)
-                pg.add(sub)
+        with self.profiler.record("rig", "finalize.sets"):
+            setNames = self.createGroupSets()
 
         # Bind pose ---------------------------------------
         # controls_grp = self.groups["controllers"]
         # pprint(controls_grp, stream=None, indent=1, width=100)
-        ctl_master_grp = pm.PyNode(self.model.name() + "_controllers_grp")
+        ctl_master_grp = pm.PyNode(setNames["controllers"])
         pm.select(ctl_master_grp, replace=True)
         dag_node = pm.dagPose(save=True, selection=True)
         pm.connectAttr(dag_node.message, self.model.rigPoses[0])
         print dag_node
 
         # Bind skin re-apply
-        if self.options["importSkin"]:
+        if self.options["importSkin"] and not self.partial:
             try:
                 pm.displayInfo("Importing Skin")
                 skin.importSkin(self.options["skin"])
@@ -486,6 +815,59 @@ class Rig(object):
                     "Skin doesn't exist or is not correct. "
                     + self.options["skin"] + " Skipped!")
 
+    def createGroupSets(self):
+        """Create the sets of the rig groups.
+
+        The groups of the components are collected and the membership of all
+        the sets is resolved before creating them. Then each set is created
+        with all its members in one command.
+
+        Returns:
+            dict: Set name by group name
+        """
+        # Retrieve group content from components
+        for name in self.componentsIndex:
+            component_ = self.components[name]
+            for name, objects in component_.groups.items():
+                self.addToGroup(objects, name)
+            for name, objects in component_.subGroups.items():
+                self.addToSubGroup(objects, name)
+
+        children, topLevel, missing = build_groups.get_set_hierarchy(
+            self.groups, self.subGroups)
+        for name in missing:
+            pm.displayWarning(
+                "Parent group {} not found, its sub groups are "
+                "kept in the master set".format(name))
+
+        prefix = self.model.name() + "_"
+        setNames = {}
+        for name, objects in self.groups.items():
+            members = [o.longName() if isinstance(o, pm.nodetypes.DagNode)
+                       else str(o) for o in objects]
+            setName = prefix + name + "_grp"
+            if members:
+                setNames[name] = cmds.sets(members, name=setName)
+            else:
+                setNames[name] = cmds.sets(name=setName, empty=True)
+        for parentGroup, subgroups in children.items():
+            if subgroups:
+                cmds.sets([setNames[sg] for sg in subgroups],
+                          add=setNames[parentGroup])
+
+        # Create master set to group all the groups
+        masterSet = cmds.sets(name=prefix + "sets_grp", empty=True)
+        if topLevel:
+            cmds.sets([setNames[name] for name in topLevel], add=masterSet)
+
+        rigGroups = self.model.longName() + ".rigGroups[{}]"
+        cmds.connectAttr(masterSet + ".message", rigGroups.format(0))
+        for groupIdx, name in enumerate(self.groups, 1):
+            cmds.connectAttr(setNames[name] + ".message",
+                             rigGroups.format(groupIdx))
+
+        return setNames
+
     def addCtl(self, parent, name, m, color, iconShape, **kwargs):
         """Create the control and apply the shape, if this is alrealdy stored
         in the guide controllers grp.
@@ -503,16 +885,14 @@ class Rig(object):
             dagNode: The Control.
 
         """
-        if "degree" not in kwargs.keys():
+        if "degree" not in kwargs:
             kwargs["degree"] = 1
 
-        bufferName = name + "_controlBuffer"
-        if bufferName in self.guide.controllers.keys():
-            ctl_ref = self.guide.controllers[bufferName]
+        bufferName = name + control_buffers.BUFFER_SUFFIX
+        if bufferName in self.guide.controlBuffers:
             ctl = primitive.addTransform(parent, name, m)
-            for shape in ctl_ref.getShapes():
-                ctl.addChild(shape, shape=True, add=True)
-                pm.rename(shape, name + "Shape")
+            self.guide.controlBuffers.create_shapes(
+                ctl, bufferName, name + "Shape")
         else:
             ctl = icon.create(parent, name, m, color, iconShape, **kwargs)
 
@@ -545,11 +925,7 @@ class Rig(object):
         if not isinstance(objects, list):
             objects = [objects]
 
-        for name in names:
-            if name not in self.groups.keys():
-                self.groups[name] = []
-
-            self.groups[name].extend(objects)
+        build_groups.add_to_groups(self.groups, objects, names)
 
     def addToSubGroup(self, subGroups, parentGroups=["hidden"]):
         """Add the object in a collection for later SubGroup creation.
@@ -568,17 +944,18 @@ class Rig(object):
         if not isinstance(subGroups, list):
             subGroups = [subGroups]
 
-        for pg in parentGroups:
-            if pg not in self.subGroups.keys():
-                self.subGroups[pg] = []
-            self.subGroups[pg].extend(subGroups)
+        build_groups.add_to_groups(self.subGroups, subGroups, parentGroups)
 
     def add_controller_tag(self, ctl, tagParent):
-        ctt = node.add_controller_tag(ctl, tagParent)
-        if ctt:
-            ni = attribute.get_next_available_index(self.model.rigCtlTags)
-            pm.connectAttr(ctt.message,
-                           self.model.attr("rigCtlTags[{}]".format(str(ni))))
+        """Create the controller tag of a control.
+
+        The tag is connected to the rig model at the finalize.
+
+        Args:
+            ctl (dagNode): The control
+            tagParent (dagNode): The parent control of the tag
+        """
+        self.controllerTags.add(ctl, tagParent)
 
     def getLocalName(self, guideName):
         """This function return the local name, cutting the Maya fullname
@@ -657,7 +1034,7 @@ class Rig(object):
         comp_name = self.getComponentName(guideName)
         relative_name = self.getRelativeName(guideName)
 
-        if comp_name not in self.components.keys():
+        if comp_name not in self.components:
             return self.global_ctl
         return self.components[comp_name].getRelation(relative_name)
 
@@ -679,7 +1056,7 @@ class Rig(object):
         comp_name = self.getComponentName(guideName)
         relative_name = self.getRelativeName(guideName)
 
-        if comp_name not in self.components.keys():
+        if comp_name not in self.components:
             return self.global_ctl
         return self.components[comp_name].getControlRelation(relative_name)
 
@@ -701,7 +1078,7 @@ class Rig(object):
         comp_name = self.getComponentName(guideName, False)
         # comp_name = "_".join(guideName.split("_")[:2])
 
-        if comp_name not in self.components.keys():
+        if comp_name not in self.components:
             return None
 
         return self.components[comp_name]
@@ -723,7 +1100,7 @@ class Rig(object):
         comp_name = self.getComponentName(guideName, False)
         # comp_name = "_".join(guideName.split("_")[:2])
 
-        if comp_name not in self.components.keys():
+        if comp_name not in self.components:
             return self.ui
 
         if self.components[comp_name].ui is None:
@@ -6,6 +6,8 @@ bipded and other types of morphology.
 Attributes:
     AFB_FILE_EXTENSION (str): Auto fit biped desired extension name
     DANCE_EMOTICON (list): emoticon for loading animation
+    RELATIVE_COMPACT_FILE_EXTENSION (str): extension name for compact
+        relative guide placement
     RELATIVE_FILE_EXTENSION (str): extension name for relative guide placement
     WINDOW_TITLE (str): Name of the ui housing both tabs
 
@@ -37,6 +39,7 @@ from mgear.core import utils
 from mgear.core import callbackManager
 from mgear.shifter import io
 from mgear.shifter import afg_tools
+from mgear.shifter import placement_file
 from mgear.shifter import relative_guide_placement
 from mgear.vendor.Qt import QtCore
 from mgear.vendor.Qt import QtWidgets
@@ -52,6 +55,7 @@ from mgear.vendor.Qt import QtWidgets
 WINDOW_TITLE = "Auto Fit Guide Tools (AFG) (BETA)"
 AFB_FILE_EXTENSION = "afg"
 RELATIVE_FILE_EXTENSION = "rgp"
+RELATIVE_COMPACT_FILE_EXTENSION = "rgpc"
 DANCE_EMOTICON = ["v(._.)v",
                   "<(*-* <)",
                   "^(*-*)^",
@@ -1016,6 +1020,7 @@ class RelativeGuidePlacementWidget(QtWidgets.QWidget):
         # self.cb_manager = callbackManager.CallbackManager()
         self.ordered_hierarchy = []
         self.relativeGuide_dict = {}
+        self.placement_data = None
         self.mainLayout.addWidget(self.ui())
         self.mainLayout.addStretch(1)
         self.connectSignals()
@@ -1130,6 +1135,8 @@ class RelativeGuidePlacementWidget(QtWidgets.QWidget):
 
         self.relativeGuide_dict = relativeGuide_dict
         self.ordered_hierarchy = ordered_hierarchy
+        self.placement_data = placement_file.PlacementData.from_dict(
+            relativeGuide_dict, ordered_hierarchy)
         msg = "Initial Guide Placement Recorded!"
         self.window().statusBar().showMessage(msg, 3000)
 
@@ -1142,36 +1149,41 @@ class RelativeGuidePlacementWidget(QtWidgets.QWidget):
         Raises:
             ValueError: raise error if no guide placement is loaded
         """
-        if not self.ordered_hierarchy:
+        if not self.ordered_hierarchy or self.placement_data is None:
             msg = "Record initial Placement first!"
             self.window().statusBar().showMessage(msg, 3000)
             raise ValueError(msg)
 
-        increment_value = 100 / len(self.ordered_hierarchy)
-        starting_val = 0
-        dance = itertools.cycle(DANCE_EMOTICON)
+        # the placement of an imported compact file is only applied if the
+        # topology of the reference mesh didn't change
+        if not relative_guide_placement.checkPlacementTopology(
+                self.placement_data):
+            msg = "Reference mesh topology changed!"
+            self.window().statusBar().showMessage(msg, 3000)
+            raise ValueError(msg)
+
         reset_scale = self.rgp_scale_cb.isChecked()
-        for x in relative_guide_placement.updateGuidePlacement(
-                self.ordered_hierarchy,
-                self.relativeGuide_dict,
-                reset_scale=reset_scale):
-            msg = "{}% completed... {}".format(int(starting_val), dance.next())
-            self.window().statusBar().showMessage(msg)
-            starting_val = starting_val + increment_value
+        relative_guide_placement.updateGuidePlacementFromData(
+            self.placement_data, reset_scale=reset_scale)
 
         self.window().statusBar().showMessage("Guides plcement updated!", 3000)
 
     def _importGuidePlacement(self):
         """Fildialog for importing initial guide placement files
         """
-        tmp = " ".join(["*.{}".format(x) for x in [RELATIVE_FILE_EXTENSION]])
+        tmp = " ".join(["*.{}".format(x) for x in [
+            RELATIVE_FILE_EXTENSION, RELATIVE_COMPACT_FILE_EXTENSION]])
         # TODO Make the file extension here more verbose
         all_exts = ["Relative Placement Guides Files ({})".format(
             tmp), "All Files (*.*)"]
         all_exts = ";;".join(all_exts)
         file_path = fileDialog("/", ext=all_exts, mode=1)
-        (self.relativeGuide_dict,
-         self.ordered_hierarchy) = relative_guide_placement.importGuidePlacement(file_path)
+        if not file_path:
+            return
+        self.placement_data = relative_guide_placement.importPlacementData(
+            file_path)
+        self.relativeGuide_dict = self.placement_data.to_dict()
+        self.ordered_hierarchy = self.placement_data.ordered_hierarchy
         print("Relative Guide Placement Imported: {}".format(file_path))
 
     def _exportGuidePlacement(self):
@@ -1184,22 +1196,24 @@ class RelativeGuidePlacementWidget(QtWidgets.QWidget):
         Raises:
             ValueError: Raise error if no initial guide placement recorded
         """
-        tmp = " ".join(["*.{}".format(x) for x in [RELATIVE_FILE_EXTENSION]])
+        tmp = " ".join(["*.{}".format(x) for x in [
+            RELATIVE_FILE_EXTENSION, RELATIVE_COMPACT_FILE_EXTENSION]])
         # TODO Make the file extension here more verbose
         all_exts = ["Relative Placement Guides Files ({})".format(tmp),
                     "All Files (*.*)"]
         all_exts = ";;".join(all_exts)
         file_path = fileDialog("/", ext=all_exts, mode=0)
+        if not file_path:
+            return
         # relative_guide_placement.importGuidePlacement(file_path)
         if not self.relativeGuide_dict or not self.ordered_hierarchy:
             msg = "Record Placement!"
             self.window().statusBar().showMessage(msg)
             raise ValueError(msg)
             return
-        data = {}
-        data["relativeGuide_dict"] = self.relativeGuide_dict
-        data["ordered_hierarchy"] = self.ordered_hierarchy
-        relative_guide_placement._exportData(data, file_path)
+        relative_guide_placement.exportPlacementData(file_path,
+                                                     self.relativeGuide_dict,
+                                                     self.ordered_hierarchy)
         msg = "Relative Guide position exported: {}".format(file_path)
         print(msg)
         self.window().statusBar().showMessage(msg)
@@ -0,0 +1,327 @@
+"""Shifter headless batch build.
+
+Build rigs from guide templates without UI, each one in a new scene, and
+save the result. A JSON report is written for each rig with the timings,
+the warnings and errors and the custom steps that failed. The custom step
+failures don't open the confirm dialog, the build of the rig is stopped
+and the error is reported.
+
+The templates can be sharded across several mayapy processes.
+
+Usage:
+    mayapy -m mgear.shifter.batch_build "templates/*.sgt" -o /rigs -j 4
+
+Example:
+    from mgear.shifter import batch_build
+    reports = batch_build.build_templates(["/path/biped.sgt"], "/rigs")
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import subprocess
+import sys
+import timeit
+import traceback
+
+import maya.api.OpenMaya as om
+from maya import cmds
+
+import mgear
+from mgear.shifter import io
+from mgear.shifter import guide
+from mgear.shifter import build_profiler
+
+REPORT_SUFFIX = "_report.json"
+SUMMARY_NAME = "batch_report.json"
+
+
+def expand_templates(patterns):
+    """Get the template files from a list of paths or glob patterns.
+
+    Args:
+        patterns (list of str): Paths or glob patterns
+
+    Returns:
+        list of str: Template file paths, without duplicates
+    """
+    filePaths = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            path = os.path.abspath(path)
+            if path not in filePaths:
+                filePaths.append(path)
+    return filePaths
+
+
+def get_rig_name(templatePath):
+    """Get the name of the rig and report files of a template.
+
+    Args:
+        templatePath (str): Guide template file path
+
+    Returns:
+        str: The name
+    """
+    return os.path.splitext(os.path.basename(templatePath))[0]
+
+
+def check_rig_names(templatePaths):
+    """Check that the templates don't save their rigs to the same files.
+
+    Args:
+        templatePaths (list of str): Guide template file paths
+
+    Raises:
+        ValueError: Templates from different folders have the same name
+    """
+    paths = {}
+    for path in templatePaths:
+        paths.setdefault(get_rig_name(path).lower(), []).append(path)
+    collisions = [p for p in paths.values() if len(p) > 1]
+    if collisions:
+        raise ValueError(
+            "Templates with the same name would overwrite their rigs and "
+            "reports: {}".format("; ".join(", ".join(p)
+                                           for p in collisions)))
+
+
+class MessageRecorder(object):
+    """Record the warnings and errors displayed while is active."""
+
+    def __init__(self):
+        self.warnings = []
+        self.errors = []
+        self.callback_id = None
+
+    def _callback(self, message, messageType, clientData):
+        if messageType == om.MCommandMessage.kWarning:
+            self.warnings.append(message.strip())
+        elif messageType == om.MCommandMessage.kError:
+            self.errors.append(message.strip())
+
+    def __enter__(self):
+        self.callback_id = om.MCommandMessage.addCommandOutputCallback(
+            self._callback)
+        return self
+
+    def __exit__(self, *args):
+        om.MMessage.removeCallback(self.callback_id)
+        self.callback_id = None
+
+
+def build_template(templatePath, outputDir, fileType="mayaBinary"):
+    """Build a rig from a template in a new scene and save it.
+
+    Args:
+        templatePath (str): Guide template file path
+        outputDir (str): Folder to save the rig and the report
+        fileType (str, optional): "mayaBinary" or "mayaAscii"
+
+    Returns:
+        dict: The build report
+    """
+    name = get_rig_name(templatePath)
+    ext = ".ma" if fileType == "mayaAscii" else ".mb"
+    report = {"template": templatePath,
+              "output": os.path.join(outputDir, name + ext),
+              "date": str(datetime.datetime.now()),
+              "success": False,
+              "stopped": False,
+              "times": {},
+              "warnings": [],
+              "errors": [],
+              "custom_step_failures": []}
+
+    # the custom step failures are recorded instead of asking the user,
+    # the session options are restored after the build
+    interactive = guide.HelperSlots.interactive
+    failed_steps = guide.HelperSlots.failed_steps
+    guide.HelperSlots.interactive = False
+    guide.HelperSlots.failed_steps = []
+    startTime = timeit.default_timer()
+    with MessageRecorder() as recorder:
+        try:
+            cmds.file(new=True, force=True)
+            rig = io.build_from_file(templatePath)
+            report["times"]["build"] = timeit.default_timer() - startTime
+            if rig is None:
+                raise RuntimeError("Can't read the template")
+            report["stopped"] = bool(rig.stopBuild)
+            if rig.profiler.enabled:
+                report["profile"] = rig.profiler.as_dict()
+
+            saveTime = timeit.default_timer()
+            cmds.file(rename=report["output"])
+            cmds.file(save=True, type=fileType, force=True)
+            report["times"]["save"] = timeit.default_timer() - saveTime
+            report["success"] = not report["stopped"]
+        except Exception:
+            report["errors"].append(traceback.format_exc())
+        finally:
+            report["custom_step_failures"] = list(
+                guide.HelperSlots.failed_steps)
+            guide.HelperSlots.interactive = interactive
+            guide.HelperSlots.failed_steps = failed_steps
+
+    report["times"]["total"] = timeit.default_timer() - startTime
+    report["warnings"].extend(recorder.warnings)
+    report["errors"].extend(recorder.errors)
+    if report["custom_step_failures"]:
+        report["success"] = False
+
+    with open(os.path.join(outputDir, name + REPORT_SUFFIX), "w") as f:
+        f.write(json.dumps(report, indent=4))
+
+    mgear.log("Batch build {}: {} [ {:.2f}s ]".format(
+        name,
+        "OK" if report["success"] else "FAILED",
+        report["times"]["total"]))
+
+    return report
+
+
+def build_templates(templatePaths, outputDir, fileType="mayaBinary"):
+    """Build the templates one by one in this process.
+
+    Args:
+        templatePaths (list of str): Guide template file paths
+        outputDir (str): Folder to save the rigs and the reports
+        fileType (str, optional): "mayaBinary" or "mayaAscii"
+
+    Returns:
+        list of dict: The build reports
+
+    Raises:
+        ValueError: Templates from different folders have the same name
+    """
+    check_rig_names(templatePaths)
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    return [build_template(p, outputDir, fileType) for p in templatePaths]
+
+
+def build_sharded(templatePaths, outputDir, jobs, fileType="mayaBinary",
+                  mayapy=None, profile=False):
+    """Build the templates sharded across several mayapy processes.
+
+    Args:
+        templatePaths (list of str): Guide template file paths
+        outputDir (str): Folder to save the rigs and the reports
+        jobs (int): Number of processes
+        fileType (str, optional): "mayaBinary" or "mayaAscii"
+        mayapy (str, optional): mayapy executable. Default is the current
+            python executable
+        profile (bool, optional): Profile the builds
+
+    Returns:
+        list of dict: The build reports, in the templates order
+
+    Raises:
+        ValueError: Templates from different folders have the same name
+    """
+    check_rig_names(templatePaths)
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    shards = [templatePaths[i::jobs] for i in range(jobs)]
+    processes = []
+    for shard in shards:
+        if not shard:
+            continue
+        cmd = [mayapy or sys.executable, "-m", "mgear.shifter.batch_build",
+               "--output", outputDir,
+               "--file-type", fileType,
+               "--jobs", "1",
+               "--no-summary"]
+        if profile:
+            cmd.append("--profile")
+        processes.append(subprocess.Popen(cmd + shard))
+    for process in processes:
+        process.wait()
+
+    reports = []
+    for path in templatePaths:
+        reportPath = os.path.join(outputDir,
+                                  get_rig_name(path) + REPORT_SUFFIX)
+        try:
+            with open(reportPath, "r") as f:
+                reports.append(json.load(f))
+        except (IOError, OSError, ValueError):
+            reports.append({"template": path,
+                            "success": False,
+                            "errors": ["The worker process didn't write "
+                                       "the report"]})
+    return reports
+
+
+def write_summary(reports, outputDir):
+    """Write the summary of the batch build.
+
+    Args:
+        reports (list of dict): The build reports
+        outputDir (str): Folder to save the summary
+
+    Returns:
+        str: The summary file path
+    """
+    summary = {"date": str(datetime.datetime.now()),
+               "total": len(reports),
+               "failed": [r["template"] for r in reports if not r["success"]],
+               "reports": reports}
+    path = os.path.join(outputDir, SUMMARY_NAME)
+    with open(path, "w") as f:
+        f.write(json.dumps(summary, indent=4))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build Shifter rigs from guide templates without UI")
+    parser.add_argument("templates", nargs="+",
+                        help="Template files or glob patterns")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Folder to save the rigs and the reports")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of mayapy processes")
+    parser.add_argument("--file-type", default="mayaBinary",
+                        choices=["mayaBinary", "mayaAscii"])
+    parser.add_argument("--mayapy", help="mayapy executable for the jobs")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the builds")
+    parser.add_argument("--no-summary", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    outputDir = os.path.abspath(args.output)
+    templatePaths = expand_templates(args.templates)
+    try:
+        check_rig_names(templatePaths)
+    except ValueError as e:
+        print(e)
+        return 1
+    if args.profile:
+        os.environ[build_profiler.SHIFTER_PROFILE_ENV_KEY] = "1"
+        os.environ[build_profiler.SHIFTER_PROFILE_PATH_ENV_KEY] = outputDir
+
+    if args.jobs > 1 and len(templatePaths) > 1:
+        reports = build_sharded(templatePaths,
+                                outputDir,
+                                args.jobs,
+                                args.file_type,
+                                args.mayapy,
+                                args.profile)
+    else:
+        reports = build_templates(templatePaths, outputDir, args.file_type)
+
+    if not args.no_summary:
+        summaryPath = write_summary(reports, outputDir)
+        print("Batch build summary: {}".format(summaryPath))
+
+    failed = [r for r in reports if not r["success"]]
+    print("{} rigs built, {} failed".format(len(reports), len(failed)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
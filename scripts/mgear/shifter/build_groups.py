@@ -0,0 +1,89 @@
+"""Shifter build groups bookkeeping.
+
+The rig and the components collect the objects of each group (Maya sets
+created at the end of the build) while building. The groups can have
+thousands of objects, so the membership test must not scan the list.
+
+This module only uses the python standard library.
+"""
+
+
+class MemberList(list):
+    """List of unique objects, in insertion order, with constant time
+    membership test.
+
+    Adding an object already in the list does nothing. It can be used where
+    a list of group objects is expected.
+    """
+
+    def __init__(self, objects=()):
+        super(MemberList, self).__init__()
+        self.members = set()
+        self.extend(objects)
+
+    def append(self, obj):
+        if obj not in self.members:
+            self.members.add(obj)
+            super(MemberList, self).append(obj)
+
+    def extend(self, objects):
+        members = self.members
+        for obj in objects:
+            if obj not in members:
+                members.add(obj)
+                list.append(self, obj)
+
+    def remove(self, obj):
+        super(MemberList, self).remove(obj)
+        self.members.discard(obj)
+
+    def __contains__(self, obj):
+        return obj in self.members
+
+    def __iadd__(self, objects):
+        self.extend(objects)
+        return self
+
+
+def add_to_groups(groups, objects, names):
+    """Add objects to groups.
+
+    Args:
+        groups (dict): MemberList by group name. The missing groups are
+            created
+        objects (list): Objects to add
+        names (list of str): Group names
+    """
+    for name in names:
+        group = groups.get(name)
+        if group is None:
+            group = groups[name] = MemberList()
+        group.extend(objects)
+
+
+def get_set_hierarchy(groups, subGroups):
+    """Get the sets hierarchy of the rig groups.
+
+    Each group is a set. The sub groups are members of their parent groups
+    instead of the master set.
+
+    Args:
+        groups (dict): Objects by group name
+        subGroups (dict): Sub group names by parent group name
+
+    Returns:
+        tuple: The sub groups by parent group, the groups in the master set
+            and the missing parent groups. The missing parent groups sub
+            groups stay in the master set
+    """
+    children = {}
+    nested = set()
+    missing = []
+    for parent, subs in subGroups.items():
+        if parent not in groups:
+            missing.append(parent)
+            continue
+        children[parent] = [s for s in subs if s in groups]
+        nested.update(children[parent])
+    topLevel = [name for name in groups if name not in nested]
+    return children, topLevel, missing
@@ -0,0 +1,281 @@
+"""Shifter build profiler.
+
+Record the wall time, the scene node count delta and the call count of each
+build step for each component, plus the rig initial hierarchy and finalize.
+At the end of the build the data is dumped as JSON and as a text report
+sorted by time.
+
+A record made inside another one, like the finalize sub steps, is
+reported as a child of its parent and is not added again to the totals.
+The node count delta is tracked with Maya node added and removed callbacks
+while a record is open, the scene is not listed.
+
+The profiler is enabled setting the environment variable
+MGEAR_SHIFTER_PROFILE (to any value but "0", "false", "off" or "no") or the
+"profile" attribute of the rig before building.
+The reports are saved in MGEAR_SHIFTER_PROFILE_PATH if it is defined,
+otherwise in the system temporary folder.
+
+Example:
+    from mgear import shifter
+    rig = shifter.Rig()
+    rig.profile = True
+    rig.buildFromSelection()
+"""
+import contextlib
+import datetime
+import json
+import os
+import tempfile
+import timeit
+
+import maya.api.OpenMaya as om
+
+import mgear
+
+SHIFTER_PROFILE_ENV_KEY = "MGEAR_SHIFTER_PROFILE"
+SHIFTER_PROFILE_PATH_ENV_KEY = "MGEAR_SHIFTER_PROFILE_PATH"
+
+# Environment variable values that don't enable an option
+FALSE_ENV_VALUES = ("", "0", "false", "off", "no")
+
+
+def env_enabled(key):
+    """Check if an option is enabled by an environment variable.
+
+    Args:
+        key (str): The environment variable name
+
+    Returns:
+        bool: False if the variable is not set, empty, "0", "false", "off"
+            or "no"
+    """
+    return os.environ.get(key, "").strip().lower() not in FALSE_ENV_VALUES
+
+
+def get_profiler(enabled, rig_name="rig"):
+    """Get the profiler for a build.
+
+    Args:
+        enabled (bool): If False will return a profiler that records nothing
+        rig_name (str, optional): Name of the rig, used for the report files
+
+    Returns:
+        BuildProfiler or NullProfiler: the profiler
+    """
+    if enabled:
+        return BuildProfiler(rig_name)
+    return NullProfiler()
+
+
+class NullProfiler(object):
+    """Profiler used when the profiling mode is off. Records nothing."""
+
+    enabled = False
+
+    @contextlib.contextmanager
+    def record(self, name, step, comp_type=None):
+        yield
+
+    def add(self, name, step, elapsed, nodes=0, comp_type=None,
+            parent=None):
+        return
+
+    def report(self, path=None):
+        return
+
+
+class BuildProfiler(object):
+    """Collect the timing of each (component, step) pair of a build.
+
+    Attributes:
+        rig_name (str): Name of the rig
+        entries (dict): Entries by (name, step) key
+        order (list): Entry keys in recording order
+        stack (list): Keys of the open records
+        nodes (int): Nodes added minus nodes removed while a record is open
+    """
+
+    enabled = True
+
+    def __init__(self, rig_name="rig"):
+        self.rig_name = rig_name
+        self.date = str(datetime.datetime.now())
+        self.entries = {}
+        self.order = []
+        self.stack = []
+        self.nodes = 0
+        self.callback_ids = []
+
+    def _node_added(self, node, clientData):
+        self.nodes += 1
+
+    def _node_removed(self, node, clientData):
+        self.nodes -= 1
+
+    def _watch_nodes(self):
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self._node_added),
+            om.MDGMessage.addNodeRemovedCallback(self._node_removed)]
+
+    def _unwatch_nodes(self):
+        om.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = []
+
+    @contextlib.contextmanager
+    def record(self, name, step, comp_type=None):
+        """Context to record the wrapped code as a (name, step) entry.
+
+        Args:
+            name (str): Component full name or "rig"
+            step (str): Step name
+            comp_type (str, optional): Component type
+        """
+        parent = self.stack[-1] if self.stack else None
+        if parent is None:
+            self._watch_nodes()
+        self.stack.append((name, step))
+        start_nodes = self.nodes
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            elapsed = timeit.default_timer() - start
+            self.stack.pop()
+            if parent is None:
+                self._unwatch_nodes()
+            self.add(name,
+                     step,
+                     elapsed,
+                     self.nodes - start_nodes,
+                     comp_type,
+                     parent)
+
+    def add(self, name, step, elapsed, nodes=0, comp_type=None,
+            parent=None):
+        """Add time to a (name, step) entry.
+
+        Args:
+            name (str): Component full name or "rig"
+            step (str): Step name
+            elapsed (float): Seconds
+            nodes (int, optional): Scene node count delta
+            comp_type (str, optional): Component type
+            parent (tuple, optional): (name, step) key of the entry that
+                contains this one. The nested entries are not added to the
+                totals
+        """
+        key = (name, step)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {"name": name,
+                     "type": comp_type,
+                     "step": step,
+                     "parent": list(parent) if parent else None,
+                     "time": 0.0,
+                     "nodes": 0,
+                     "calls": 0}
+            self.entries[key] = entry
+            self.order.append(key)
+        entry["time"] += elapsed
+        entry["nodes"] += nodes
+        entry["calls"] += 1
+
+    def _totals(self, field):
+        totals = {}
+        for entry in self.entries.values():
+            if entry["parent"]:
+                continue
+            k = entry[field] or entry["name"]
+            totals[k] = totals.get(k, 0.0) + entry["time"]
+        return totals
+
+    def as_dict(self):
+        """Get the profile data in a JSON serializable dictionary.
+
+        The totals only add the entries without parent.
+
+        Returns:
+            dict: profile data
+        """
+        entries = [self.entries[k] for k in self.order]
+        top = [e for e in entries if not e["parent"]]
+        return {"rig_name": self.rig_name,
+                "date": self.date,
+                "total_time": sum(e["time"] for e in top),
+                "total_nodes": sum(e["nodes"] for e in top),
+                "steps": self._totals("step"),
+                "types": self._totals("type"),
+                "entries": entries}
+
+    def as_text(self):
+        """Get the profile report sorted by time.
+
+        Returns:
+            str: report
+        """
+        data = self.as_dict()
+        line = "{:<40} {:<24} {:<18} {:>10} {:>8} {:>6}"
+        lines = ["= SHIFTER BUILD PROFILE {} [ {} ]".format(
+                 self.rig_name, self.date),
+                 "Total time: {:.4f}s  Total nodes: {}".format(
+                     data["total_time"], data["total_nodes"]),
+                 "",
+                 "-- Time by step"]
+        for k, v in sorted(data["steps"].items(), key=lambda x: -x[1]):
+            lines.append("{:<40} {:>10.4f}".format(k, v))
+        lines.extend(["", "-- Time by component type"])
+        for k, v in sorted(data["types"].items(), key=lambda x: -x[1]):
+            lines.append("{:<40} {:>10.4f}".format(k, v))
+        lines.extend(["",
+                      "-- Entries",
+                      line.format("Name", "Type", "Step",
+                                  "Time", "Nodes", "Calls")])
+        children = {}
+        for e in data["entries"]:
+            parent = tuple(e["parent"]) if e["parent"] else None
+            children.setdefault(parent, []).append(e)
+
+        def add_lines(parent, indent):
+            entries = sorted(children.get(parent, []),
+                             key=lambda x: -x["time"])
+            for e in entries:
+                lines.append(line.format(e["name"],
+                                         e["type"] or "",
+                                         indent + e["step"],
+                                         "{:.4f}".format(e["time"]),
+                                         e["nodes"],
+                                         e["calls"]))
+                add_lines((e["name"], e["step"]), indent + "  ")
+
+        add_lines(None, "")
+        return "\n".join(lines)
+
+    def report(self, path=None):
+        """Save the JSON and the text report of the profile.
+
+        Args:
+            path (str, optional): Folder to save the reports. If None will
+                use MGEAR_SHIFTER_PROFILE_PATH or the temporary folder
+
+        Returns:
+            list of str: JSON and text report files paths
+        """
+        if not path:
+            path = os.environ.get(SHIFTER_PROFILE_PATH_ENV_KEY, "")
+        if not path or not os.path.isdir(path):
+            path = tempfile.gettempdir()
+
+        base = os.path.join(path, "{}_build_profile".format(self.rig_name))
+        json_path = base + ".json"
+        text_path = base + ".txt"
+        with open(json_path, "w") as f:
+            f.write(json.dumps(self.as_dict(), indent=4))
+        text = self.as_text()
+        with open(text_path, "w") as f:
+            f.write(text)
+
+        mgear.log("\n" + text)
+        mgear.log("Build profile saved: {}".format(json_path))
+
+        return [json_path, text_path]
@@ -17,6 +17,8 @@ from mgear.core import primitive, vector, transform
 from mgear.core import attribute, applyop, node, icon
 
 from mgear.shifter import naming
+from mgear.shifter import build_groups
+from mgear.shifter import control_buffers
 
 #############################################
 # COMPONENT
@@ -319,7 +321,7 @@ class Main(object):
                 self.active_jnt = newActiveJnt
             rule_name = self.getName(
                 str(name),
-                rule=self.options["joint_name_rule"],
+                rule=naming.get_name_rule(self.options["joint_name_rule"]),
                 ext="jnt",
                 letter_case=self.options["joint_description_letter_case"])
             # check that the name is a valid Maya name
@@ -635,7 +637,7 @@ class Main(object):
             dagNode: The Control.
 
         """
-        if "degree" not in kwargs.keys():
+        if "degree" not in kwargs:
             kwargs["degree"] = 1
 
         # print name
@@ -659,6 +661,7 @@ class Main(object):
             else:
                 # this ensure we always have name if the naming rule is custom
                 name = "control"
+        rule = naming.get_name_rule(rule)
 
         fullName = self.getName(
             name,
@@ -666,13 +669,11 @@ class Main(object):
             ext="ctl",
             letter_case=self.options["ctl_description_letter_case"])
 
-        bufferName = fullName + "_controlBuffer"
-        if bufferName in self.rig.guide.controllers.keys():
-            ctl_ref = self.rig.guide.controllers[bufferName]
+        bufferName = fullName + control_buffers.BUFFER_SUFFIX
+        if bufferName in self.rig.guide.controlBuffers:
             ctl = primitive.addTransform(parent, fullName, m)
-            for shape in ctl_ref.getShapes():
-                ctl.addChild(shape, shape=True, add=True)
-                pm.rename(shape, fullName + "Shape")
+            self.rig.guide.controlBuffers.create_shapes(
+                ctl, bufferName, fullName + "Shape")
             icon.setcolor(ctl, color)
         else:
             ctl = icon.create(
@@ -734,20 +735,10 @@ class Main(object):
 
         # set controller tag
         if versions.current() >= 201650:
-            try:
-                oldTag = pm.PyNode(ctl.name() + "_tag")
-                if not oldTag.controllerObject.connections():
-                    # NOTE:  The next line is comment out. Because this will
-                    # happend alot since core does't clean
-                    # controller tags after deleting the control Object of the
-                    # tag. This have been log to Autodesk.
-                    # If orphane tags are found, it will be clean in silence.
-                    # pm.displayWarning("Orphane Tag: %s  will be delete and
-                    # created new for: %s"%(oldTag.name(), ctl.name()))
-                    pm.delete(oldTag)
-
-            except TypeError:
-                pass
+            # NOTE: core doesn't clean controller tags after deleting the
+            # control Object of the tag. This have been log to Autodesk.
+            # If orphane tags are found, it will be clean in silence.
+            self.rig.controllerTags.delete_orphan(ctl)
 
             self.add_controller_tag(ctl, tp)
         self.controlers.append(ctl)
@@ -770,17 +761,9 @@ class Main(object):
         if not isinstance(objects, list):
             objects = [objects]
 
-        for name in names:
-            if name not in self.groups.keys():
-                self.groups[name] = []
-
-            self.groups[name].extend(objects)
-
-            if parentGrp:
-                if parentGrp not in self.subGroups.keys():
-                    self.subGroups[parentGrp] = []
-                if name not in self.subGroups[parentGrp]:
-                    self.subGroups[parentGrp].append(name)
+        build_groups.add_to_groups(self.groups, objects, names)
+        if parentGrp:
+            build_groups.add_to_groups(self.subGroups, names, [parentGrp])
 
     def add_match_ref(self, ctl, parent, name, cnx=True):
         """Add maching reference transform. This is use to track the positions
@@ -1075,7 +1058,7 @@ class Main(object):
             dagNode: The relational object.
 
         """
-        if name not in self.relatives.keys():
+        if name not in self.relatives:
             mgear.log("Can't find reference for object : "
                       + self.fullName + "." + name, mgear.sev_error)
             return False
@@ -1091,7 +1074,7 @@ class Main(object):
             dagNode: The relational object.
 
         """
-        if name not in self.controlRelatives.keys():
+        if name not in self.controlRelatives:
             mgear.log("Control tag relative: Can't find reference for "
                       " object : " + self.fullName + "." + name,
                       mgear.sev_error)
@@ -1114,7 +1097,7 @@ class Main(object):
         """
         comp_name = self.rig.getComponentName(name)
         rel_name = self.rig.getRelativeName(name)
-        if rel_name not in comp_relative.aliasRelatives.keys():
+        if rel_name not in comp_relative.aliasRelatives:
             return name
 
         return "{}_{}".format(comp_name,
@@ -1211,7 +1194,7 @@ class Main(object):
 
         """
 
-        if self.settings["connector"] not in self.connections.keys():
+        if self.settings["connector"] not in self.connections:
             # mgear.log("Unable to connect object", mgear.sev_error)
             # return False
             pm.displayWarning("Connector of type: {}, not found. Falling back "
@@ -1601,7 +1584,7 @@ class Main(object):
         Args:
             name (str): The name to concatenate to component name. (Optional)
             side (str): The side (Optional).
-            rule (None, optional): Description
+            rule (str or NameRule, optional): The naming rule
             ext (None, optional): Description
             letter_case (int, optional): Description
             short_name (bool, optional): will return the short name without
@@ -1712,5 +1695,51 @@ class Main(object):
     type = property(getType)
 
 
+class StubComponent(Main):
+    """Stub of a component, used in the partial builds.
+
+    Replaces the components that are not built but are needed by the built
+    ones, as parent or reference. Only creates a transform for each guide
+    object, at the guide position, so the built components can connect to
+    them. No controls, attributes, operators or joints are created.
+
+    """
+
+    def step_00(self):
+        self.initialHierarchy()
+        self.addObjects()
+        self.setRelation()
+
+    def step_01(self):
+        return
+
+    def step_02(self):
+        return
+
+    def step_03(self):
+        self.initConnector()
+        self.connect_standard()
+
+    def step_04(self):
+        return
+
+    def step_05(self):
+        return
+
+    def addObjects(self):
+        self.stubs = {}
+        for name, m in self.guide.tra.items():
+            if name == "root":
+                self.stubs[name] = self.root
+                continue
+            self.stubs[name] = primitive.addTransform(
+                self.root, self.getName("{}_stub".format(name)), m)
+
+    def setRelation(self):
+        for name, obj in self.stubs.items():
+            self.relatives[name] = obj
+            self.controlRelatives[name] = self.rig.global_ctl
+
+
 # Backwards compatibility alias
 MainComponent = Main
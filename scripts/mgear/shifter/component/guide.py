@@ -17,7 +17,9 @@ from mgear.core import node
 
 from mgear.core import dag, vector, transform, applyop, attribute, icon, pyqt
 
-from mgear.shifter import guide, guide_manager
+from mgear.shifter import guide, guide_manager, guide_index
+from mgear.shifter import guide_positions
+from mgear.shifter import transform_store
 from . import chain_guide_initializer
 
 import main_settings_ui as msui
@@ -48,6 +50,8 @@ class ComponentGuide(guide.Main):
             loading is up to date.
             If parameters or object are missing a warning message will be
                 display and the guide should be updated.
+        transforms (TransformStore): Values of tra, atra, pos, apos and
+            blades. The PyMEL objects are created on access
         tra (dic): dictionary of global transform
         atra (list): list of global transform
         pos (dic): dictionary of global postion
@@ -61,6 +65,8 @@ class ComponentGuide(guide.Main):
             be saved
         save_blade (list): Normal and BiNormal of object will be saved
         minmax (dic): Define the min and max object for multi location objects
+        guide_index (GuideIndex): Shared index of the guide nodes used while
+            parsing the hierarchy. If None, setFromHierarchy will create one.
 
     """
     compType = "component"  # Component type
@@ -95,6 +101,7 @@ class ComponentGuide(guide.Main):
 
         self.root = None
         self.id = None
+        self.guide_index = None
 
         # parent component identification
         self.parentComponent = None
@@ -104,12 +111,9 @@ class ComponentGuide(guide.Main):
         self.child_components = []
 
         # List and dictionary used during the creation of the component
-        self.tra = {}  # dictionary of global transform
-        self.atra = []  # list of global transform
-        self.pos = {}  # dictionary of global postion
-        self.apos = []  # list of global position
+        # tra, atra, pos, apos and blades
+        self.setTransformStore(transform_store.TransformStore())
         self.prim = {}  # dictionary of primitive
-        self.blades = {}
         self.size = .1
         # self.root_size = None
 
@@ -247,6 +251,10 @@ class ComponentGuide(guide.Main):
 
         self.setParamDefValuesFromProperty(self.root)
 
+        index = self.guide_index
+        if index is None:
+            index = guide_index.GuideIndex(self.model)
+
         # ---------------------------------------------------
         # Then get the objects
         for name in self.save_transform:
@@ -256,14 +264,12 @@ class ComponentGuide(guide.Main):
                         self.minmax[name].max:
                     localName = string.replaceSharpWithPadding(name, i)
 
-                    node = dag.findChild(self.model, self.getName(localName))
-                    if not node:
+                    nodeName = self.getName(localName)
+                    if nodeName not in index:
                         break
 
-                    self.tra[localName] = node.getMatrix(worldSpace=True)
-                    self.atra.append(node.getMatrix(worldSpace=True))
-                    self.pos[localName] = node.getTranslation(space="world")
-                    self.apos.append(node.getTranslation(space="world"))
+                    self.addTransform(
+                        localName, index.getMatrixValues(nodeName))
 
                     i += 1
 
@@ -275,17 +281,14 @@ class ComponentGuide(guide.Main):
                     continue
 
             else:
-                node = dag.findChild(self.model, self.getName(name))
-                if not node:
+                nodeName = self.getName(name)
+                if nodeName not in index:
                     mgear.log("Object missing : %s" % (
-                        self.getName(name)), mgear.sev_warning)
+                        nodeName), mgear.sev_warning)
                     self.valid = False
                     continue
 
-                self.tra[name] = node.getMatrix(worldSpace=True)
-                self.atra.append(node.getMatrix(worldSpace=True))
-                self.pos[name] = node.getTranslation(space="world")
-                self.apos.append(node.getTranslation(space="world"))
+                self.addTransform(name, index.getMatrixValues(nodeName))
 
         for name in self.save_blade:
             if "#" in name:
@@ -294,12 +297,12 @@ class ComponentGuide(guide.Main):
                         self.minmax_blade[name].max:
                     localName = string.replaceSharpWithPadding(name, i)
 
-                    node = dag.findChild(self.model, self.getName(localName))
-                    if not node:
+                    nodeName = self.getName(localName)
+                    if nodeName not in index:
                         break
 
-                    self.blades[localName] = vector.Blade(
-                        node.getMatrix(worldSpace=True))
+                    self.addBlade(
+                        localName, index.getMatrixValues(nodeName))
                     i += 1
 
                 if i < self.minmax_blade[name].min:
@@ -309,15 +312,14 @@ class ComponentGuide(guide.Main):
                     self.valid = False
                     continue
             else:
-                node = dag.findChild(self.model, self.getName(name))
-                if not node:
+                nodeName = self.getName(name)
+                if nodeName not in index:
                     mgear.log("Object missing : %s" % (
-                        self.getName(name)), mgear.sev_warning)
+                        nodeName), mgear.sev_warning)
                     self.valid = False
                     continue
 
-                self.blades[name] = vector.Blade(
-                    node.getMatrix(worldSpace=True))
+                self.addBlade(name, index.getMatrixValues(nodeName))
 
         self.size = self.getSize()
 
@@ -326,21 +328,8 @@ class ComponentGuide(guide.Main):
         self.setParamDefValuesFromDict(c_dict["param_values"])
         self.child_components = c_dict["child_components"]
 
-        temp_dict = {}
-        for k in c_dict["tra"].keys():
-            temp_dict[k] = datatypes.Matrix(c_dict["tra"][k])
-        self.tra = temp_dict
-
-        self.atra = [datatypes.Matrix(t) for t in c_dict["atra"]]
-
-        temp_dict = {}
-        for k in c_dict["pos"].keys():
-            temp_dict[k] = datatypes.Vector(c_dict["pos"][k])
-        self.pos = temp_dict
-
-        self.apos = [datatypes.Vector(v) for v in c_dict["apos"]]
-        for b in c_dict["blade"].keys():
-            self.blades[b] = vector.Blade(datatypes.Matrix(c_dict["blade"][b]))
+        self.setTransformStore(
+            transform_store.TransformStore.from_dict(c_dict))
 
         self.size = self.getSize()
 
@@ -351,18 +340,19 @@ class ComponentGuide(guide.Main):
         c_dict["child_components"] = []
         c_dict["param_values"] = self.get_param_values()
 
-        temp_dict = {}
-        for k in self.tra.keys():
-            temp_dict[k] = self.tra[k].get()
-        c_dict["tra"] = temp_dict
-
-        c_dict["atra"] = [t.get() for t in self.atra]
-        temp_dict = {}
-        for k in self.pos.keys():
-            temp_dict[k] = self.pos[k].get()
-        c_dict["pos"] = temp_dict
-
-        c_dict["apos"] = [p.get() for p in self.apos]
+        store = self.transforms
+        c_dict["tra"] = transform_store.get_values(
+            self.tra, lambda t: t.get())
+        if self._atra is None:
+            c_dict["atra"] = [store.matrix(r) for r in store.atra]
+        else:
+            c_dict["atra"] = [t.get() for t in self._atra]
+        c_dict["pos"] = transform_store.get_values(
+            self.pos, lambda p: p.get())
+        if self._apos is None:
+            c_dict["apos"] = [store.position(r) for r in store.apos]
+        else:
+            c_dict["apos"] = [p.get() for p in self._apos]
         c_dict["blade"] = self.get_blades_transform()
 
         # NOTE: what happens if there is more than 1 component children of the
@@ -377,11 +367,92 @@ class ComponentGuide(guide.Main):
         return c_dict
 
     def get_blades_transform(self):
-        b_tra = {}
-        for b in self.blades.keys():
-            b_tra[b] = self.blades[b].transform.get()
+        return transform_store.get_values(
+            self.blades, lambda blade: blade.transform.get())
+
+    def setTransformStore(self, store):
+        """Set the transform store and the tra, atra, pos, apos and blades
+        views of its values.
+
+        Args:
+            store (TransformStore): The store
+        """
+        self.transforms = store
+        self.tra = transform_store.LazyMap(
+            store.tra, store.matrix, datatypes.Matrix)
+        self.pos = transform_store.LazyMap(
+            store.pos, store.position, datatypes.Vector)
+        self.blades = transform_store.LazyMap(
+            store.blades,
+            store.matrix,
+            lambda m: vector.Blade(datatypes.Matrix(m)))
+        self._atra = None
+        self._apos = None
+
+    def addTransform(self, name, values):
+        """Add a transform read from the guide hierarchy.
+
+        Args:
+            name (str): The local name of the transform
+            values (list of float): The 16 values of the world matrix
+        """
+        self.transforms.add_transform(name, values)
+        transform_store.reset(self.tra, name)
+        transform_store.reset(self.pos, name)
+        if self._atra is not None:
+            self._atra.append(datatypes.Matrix(
+                self.transforms.matrix(self.transforms.atra[-1])))
+        if self._apos is not None:
+            self._apos.append(datatypes.Vector(
+                self.transforms.position(self.transforms.apos[-1])))
+
+    def addBlade(self, name, values):
+        """Add a blade read from the guide hierarchy.
 
-        return b_tra
+        Args:
+            name (str): The local name of the blade
+            values (list of float): The 16 values of the blade matrix
+        """
+        self.transforms.add_blade(name, values)
+        transform_store.reset(self.blades, name)
+
+    @property
+    def atra(self):
+        """list: Global transforms, created from the store on access."""
+        if self._atra is None:
+            store = self.transforms
+            self._atra = [datatypes.Matrix(store.matrix(r))
+                          for r in store.atra]
+        return self._atra
+
+    @atra.setter
+    def atra(self, value):
+        self._atra = value
+
+    @property
+    def apos(self):
+        """list: Global positions, created from the store on access."""
+        if self._apos is None:
+            store = self.transforms
+            self._apos = [datatypes.Vector(store.position(r))
+                          for r in store.apos]
+        return self._apos
+
+    @apos.setter
+    def apos(self, value):
+        self._apos = value
+
+    def get_positions(self):
+        """Get the global positions without creating the PyMEL vectors.
+
+        Returns:
+            list: The positions, as vectors if apos was accessed or as lists
+                of 3 floats
+        """
+        if self._apos is not None:
+            return self._apos
+        store = self.transforms
+        return [store.position(r) for r in store.apos]
 
     # ====================================================
     # DRAW
@@ -568,7 +639,7 @@ class ComponentGuide(guide.Main):
             dagNode: The root
 
         """
-        if "root" not in self.tra.keys():
+        if "root" not in self.tra:
             self.tra["root"] = transform.getTransformFromPos(
                 datatypes.Vector(0, 0, 0))
 
@@ -635,9 +706,9 @@ class ComponentGuide(guide.Main):
             dagNode: The locator object.
 
         """
-        if name not in self.tra.keys():
+        if name not in self.tra:
             self.tra[name] = transform.getTransformFromPos(position)
-        if name in self.prim.keys():
+        if name in self.prim:
             # this functionality is not implemented. The actual design from
             # softimage Gear should be review to fit in Maya.
             loc = self.prim[name].create(
@@ -677,7 +748,7 @@ class ComponentGuide(guide.Main):
         i = 0
         while True:
             localName = string.replaceSharpWithPadding(name, i)
-            if localName not in self.tra.keys():
+            if localName not in self.tra:
                 break
 
             loc = icon.guideLocatorIcon(parent, self.getName(
@@ -704,7 +775,7 @@ class ComponentGuide(guide.Main):
             dagNode:  The created blade curve.
 
         """
-        if name not in self.blades.keys():
+        if name not in self.blades:
             self.blades[name] = vector.Blade(
                 transform.getTransformFromPos(datatypes.Vector(0, 0, 0)))
             offset = False
@@ -852,10 +923,10 @@ class ComponentGuide(guide.Main):
 
         """
         size = .01
-        for pos in self.apos:
-            d = vector.getDistance(self.pos["root"], pos)
-            size = max(size, d)
-        size = max(size, .01)
+        positions = self.get_positions()
+        if positions:
+            size = max(size, guide_positions.max_distance(
+                positions, self.pos["root"]))
 
         return size
 
@@ -0,0 +1,193 @@
+"""Shifter control shape buffers.
+
+The custom control shapes are stored in the guide as curves under the
+controllers_org group, one transform per control named after the control
+with the "_controlBuffer" suffix. The buffers are indexed once when the
+guide is parsed and the curve data of each buffer is read only once. The
+control shapes are created from that data under the new controls, instead
+of reparenting the buffer shapes for each control.
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import mgear
+
+BUFFER_SUFFIX = "_controlBuffer"
+
+# Attributes of the shape color and display copied with the curve data
+COLOR_ATTRS = ("overrideEnabled", "overrideRGBColors", "overrideColor")
+RGB_ATTR = "overrideColorRGB"
+WIDTH_ATTR = "lineWidth"
+
+
+def get_curve_data(dagPath):
+    """Read the data of a nurbsCurve shape.
+
+    Args:
+        dagPath (MDagPath): The curve shape
+
+    Returns:
+        dict: degree, spans, form, knots, cvs (object space) and the color
+            attributes of the curve
+    """
+    fn = om.MFnNurbsCurve(dagPath)
+    data = {
+        "degree": fn.degree,
+        "spans": fn.numSpans,
+        # the nurbsCurve attribute form starts at 0, the API one at 1
+        "form": fn.form - 1,
+        "knots": list(fn.knots()),
+        "cvs": [(p.x, p.y, p.z)
+                for p in fn.cvPositions(om.MSpace.kObject)],
+        "attrs": {}}
+
+    for attr in COLOR_ATTRS:
+        if fn.hasAttribute(attr):
+            plug = fn.findPlug(attr, False)
+            data["attrs"][attr] = plug.asInt()
+    if fn.hasAttribute(RGB_ATTR):
+        plug = fn.findPlug(RGB_ATTR, False)
+        data["attrs"][RGB_ATTR] = tuple(
+            plug.child(i).asFloat() for i in range(3))
+    if fn.hasAttribute(WIDTH_ATTR):
+        data["attrs"][WIDTH_ATTR] = fn.findPlug(
+            WIDTH_ATTR, False).asFloat()
+
+    return data
+
+
+class ControlBufferCache(object):
+    """Control shape buffers of a guide, by buffer name.
+
+    Args:
+        controllers_org (dagNode or str): The controllers_org group of the
+            guide. None for a guide without buffers
+
+    Attributes:
+        buffers (dict): Buffer transform full path name by short name
+        shapes (dict): Shape full path names by buffer short name
+        data (dict): Shape data list by buffer short name. Filled the first
+            time each buffer is used
+    """
+
+    def __init__(self, controllers_org=None):
+        self.buffers = {}
+        self.shapes = {}
+        self.data = {}
+
+        if controllers_org:
+            self.build(controllers_org)
+
+    def __contains__(self, bufferName):
+        return bufferName in self.buffers
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def build(self, controllers_org):
+        """Index the buffers and their shapes.
+
+        Args:
+            controllers_org (dagNode or str): The controllers_org group
+        """
+        self.buffers = {}
+        self.shapes = {}
+        self.data = {}
+
+        children = cmds.listRelatives(str(controllers_org),
+                                      children=True,
+                                      type="transform",
+                                      fullPath=True) or []
+        for path in children:
+            self.buffers[path.split("|")[-1]] = path
+            self.shapes[path.split("|")[-1]] = []
+        if not children:
+            return
+
+        byPath = dict((path, path.split("|")[-1]) for path in children)
+        for shape in cmds.listRelatives(children,
+                                        shapes=True,
+                                        fullPath=True) or []:
+            name = byPath.get(shape.rsplit("|", 1)[0])
+            if name is not None:
+                self.shapes[name].append(shape)
+
+    def get(self, bufferName):
+        """Get the shapes data of a buffer.
+
+        The data is read from the scene the first time.
+
+        Args:
+            bufferName (str): The buffer name
+
+        Returns:
+            list of dict: The data of each shape. The shapes that are not
+                curves only have the shape path
+        """
+        if bufferName in self.data:
+            return self.data[bufferName]
+
+        shapes = self.shapes.get(bufferName, [])
+        data = []
+        if shapes:
+            selList = om.MSelectionList()
+            for shape in shapes:
+                selList.add(shape)
+            for i, shape in enumerate(shapes):
+                dagPath = selList.getDagPath(i)
+                if dagPath.hasFn(om.MFn.kNurbsCurve):
+                    data.append(get_curve_data(dagPath))
+                else:
+                    data.append({"shape": shape})
+        self.data[bufferName] = data
+        return data
+
+    def create_shapes(self, ctl, bufferName, shapeName):
+        """Create the buffer shapes under a control.
+
+        The curves are created from the buffer data. Other shape types are
+        instanced like the guide buffer.
+
+        Args:
+            ctl (dagNode or str): The control
+            bufferName (str): The buffer name
+            shapeName (str): The name of the new shapes
+
+        Returns:
+            list of str: The new shapes
+        """
+        parent = ctl.longName() if hasattr(ctl, "longName") else str(ctl)
+        newShapes = []
+        for data in self.get(bufferName):
+            if "shape" in data:
+                mgear.log("{} is not a curve, it is instanced".format(
+                    data["shape"]), mgear.sev_warning)
+                shape = cmds.parent(data["shape"], parent,
+                                    shape=True, add=True)[0]
+                newShapes.append(cmds.rename(shape, shapeName))
+                continue
+
+            shape = cmds.createNode("nurbsCurve",
+                                    name=shapeName,
+                                    parent=parent,
+                                    skipSelect=True)
+            shape = parent + "|" + shape.split("|")[-1]
+            cmds.setAttr(shape + ".cc",
+                         data["degree"],
+                         data["spans"],
+                         data["form"],
+                         False,
+                         3,
+                         data["knots"],
+                         len(data["knots"]),
+                         len(data["cvs"]),
+                         *data["cvs"],
+                         type="nurbsCurve")
+            for attr, value in data["attrs"].items():
+                if attr == RGB_ATTR:
+                    cmds.setAttr(shape + "." + attr, *value)
+                else:
+                    cmds.setAttr(shape + "." + attr, value)
+            newShapes.append(shape)
+
+        return newShapes
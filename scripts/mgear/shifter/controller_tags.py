@@ -0,0 +1,92 @@
+"""Shifter controller tags bookkeeping.
+
+The controller tags of the rig are connected to the rigCtlTags multi
+attribute of the rig model. The tags are queued while the components are
+built and connected in one batch at the end, tracking the next free index
+instead of searching it for each control.
+"""
+import maya.cmds as cmds
+
+from mgear.core import attribute, node
+
+
+class ControllerTagManager(object):
+    """Controller tags of a rig.
+
+    Args:
+        model (dagNode): The rig model, with the rigCtlTags attribute
+
+    Attributes:
+        queue (list): Tags waiting to be connected to the rig model
+        nextIndex (int): Next free index of rigCtlTags. None until the first
+            flush
+        orphans (set): Names of the tags without control, from one scene
+            query. None until the first orphan check
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.queue = []
+        self.nextIndex = None
+        self.orphans = None
+
+    def add(self, ctl, tagParent):
+        """Create the controller tag of a control and queue it.
+
+        Args:
+            ctl (dagNode): The control
+            tagParent (dagNode): The parent control of the tag
+
+        Returns:
+            controller: The tag or None
+        """
+        ctt = node.add_controller_tag(ctl, tagParent)
+        if ctt:
+            self.queue.append(ctt)
+        return ctt
+
+    def read_orphans(self):
+        """Find the tags without control in the scene."""
+        tags = cmds.ls(type="controller") or []
+        connected = set()
+        if tags:
+            cnx = cmds.listConnections(
+                [t + ".controllerObject" for t in tags],
+                source=True,
+                destination=False,
+                connections=True,
+                plugs=True) or []
+            # pairs of tag plug and control plug
+            connected = set(p.split(".")[0] for p in cnx[::2])
+        self.orphans = set(t for t in tags if t not in connected)
+
+    def delete_orphan(self, ctl):
+        """Delete the tag without control with the name of the control tag.
+
+        Maya doesn't delete the controller tag after deleting the control.
+        The orphan tag would take the name of the new one.
+
+        Args:
+            ctl (dagNode): The new control
+        """
+        if self.orphans is None:
+            self.read_orphans()
+        tagName = ctl.nodeName() + "_tag"
+        if tagName in self.orphans:
+            self.orphans.discard(tagName)
+            if cmds.objExists(tagName):
+                cmds.delete(tagName)
+
+    def flush(self):
+        """Connect the queued tags to the rig model."""
+        plug = self.model.longName() + ".rigCtlTags[{}]"
+        if self.nextIndex is None:
+            self.nextIndex = attribute.get_next_available_index(
+                self.model.rigCtlTags)
+        for ctt in self.queue:
+            if not ctt.exists():
+                continue
+            cmds.connectAttr(ctt.name() + ".message",
+                             plug.format(self.nextIndex))
+            self.nextIndex += 1
+        self.queue = []
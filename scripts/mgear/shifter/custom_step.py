@@ -1,5 +1,82 @@
+import imp
+import os
+import sys
+import timeit
+
 import pymel.core as pm
 
+# compiled custom steps by real path: (mtime, size), source, code
+_step_cache = {}
+
+
+def get_step_code(stepPath):
+    """Get the source and the compiled code of a custom step file.
+
+    The result is cached by real path and it is only read and compiled again
+    if the modification time or the size of the file change.
+
+    Args:
+        stepPath (str): Path to the custom step file
+
+    Returns:
+        tuple: source (str), code (code object), cached (bool)
+    """
+    realPath = os.path.realpath(stepPath)
+    stat = os.stat(realPath)
+    key = (stat.st_mtime, stat.st_size)
+    entry = _step_cache.get(realPath)
+    if entry and entry[0] == key:
+        return entry[1], entry[2], True
+
+    with open(realPath, "r") as f:
+        source = f.read()
+    code = compile(source, realPath, "exec")
+    _step_cache[realPath] = (key, source, code)
+    return source, code, False
+
+
+def get_step_source(stepPath):
+    """Get the source of a custom step file, using the step cache.
+
+    Args:
+        stepPath (str): Path to the custom step file
+
+    Returns:
+        str: The source
+    """
+    return get_step_code(stepPath)[0]
+
+
+def load_step(moduleName, stepPath):
+    """Load a custom step as a module, like imp.load_source but using the
+    cached compiled code. The module code is executed on each load.
+
+    Args:
+        moduleName (str): Name of the module
+        stepPath (str): Path to the custom step file
+
+    Returns:
+        module, float, bool: The module, the time in seconds to read and
+            compile the step (not including the module execution) and True
+            if the compiled code was cached
+    """
+    start = timeit.default_timer()
+    source, code, cached = get_step_code(stepPath)
+    loadTime = timeit.default_timer() - start
+
+    module = sys.modules.get(moduleName)
+    if module is None:
+        module = imp.new_module(moduleName)
+        sys.modules[moduleName] = module
+    module.__file__ = stepPath
+    exec(code, module.__dict__)
+    return module, loadTime, cached
+
+
+def clear_step_cache():
+    """Clear the compiled custom steps cache."""
+    _step_cache.clear()
+
 
 class customShifterMainStep(object):
     '''
@@ -0,0 +1,487 @@
+"""Shifter component dependency graph.
+
+The components of a guide depend on other components:
+
+    - parent: the component is connected to the parent objects. With
+        "useIndex" the joints are also parented to the parent joint at
+        "parentJointIndex".
+    - ui_host: the component adds its attributes to the UI host.
+    - refarray: the component uses the references of the space switch
+        arrays (ie. "ikrefarray", "upvrefarray").
+
+The graph is used to validate the guide before building it and to get the
+build order of the components. It can be exported as a dictionary or as a
+DOT graph to inspect big rigs.
+
+Example:
+    from mgear.shifter import dependency_graph
+    graph = dependency_graph.DependencyGraph.from_template(conf)
+    errors, warnings = graph.validate()
+    order = graph.schedule()
+    graph.write("/path/rig_graph.dot")
+"""
+import heapq
+import json
+
+from mgear.shifter import naming
+
+PARENT = "parent"
+JOINT = "joint"
+UI_HOST = "ui_host"
+REF_ARRAY = "refarray"
+
+
+def get_component_name(guideName):
+    """Get the component name of a guide object name.
+
+    Args:
+        guideName (str): Name of the guide object. ie. "arm_C0_root"
+
+    Returns:
+        str or None: The component name. ie. "arm_C0"
+    """
+    if not guideName:
+        return None
+    return naming.get_component_and_relative_name(
+        guideName.split("|")[-1])[0] or None
+
+
+def get_references(param_values):
+    """Get the references of the component parameters.
+
+    Args:
+        param_values (dict): The component parameters
+
+    Returns:
+        list: (component name, kind, parameter name) tuples
+    """
+    refs = []
+    for key, value in param_values.items():
+        if key == "ui_host":
+            kind = UI_HOST
+        elif key.lower().endswith("refarray"):
+            kind = REF_ARRAY
+        else:
+            continue
+        if not value or not isinstance(value, basestring):
+            continue
+        for guideName in value.split(","):
+            comp = get_component_name(guideName.strip())
+            if comp:
+                refs.append((comp, kind, key))
+    return refs
+
+
+class DependencyGraph(object):
+    """Dependency graph of the components of a guide.
+
+    Attributes:
+        order (list of str): Components full names in guide order
+        types (dict): Component type by full name
+        parents (dict): Parent component full name by full name
+        dependencies (dict): Kinds of the dependency by dependency name, by
+            component full name
+        users (dict): Set of the components depending on a component, by
+            component full name. Includes missing components
+        missing (list): (component, missing component, kind) tuples
+    """
+
+    def __init__(self):
+        self.order = []
+        self.types = {}
+        self.parents = {}
+        self.dependencies = {}
+        self.users = {}
+        self.missing = []
+        self._schedule = None
+
+    @classmethod
+    def from_template(cls, conf):
+        """Create the graph from a guide template dictionary.
+
+        Args:
+            conf (dict): The guide template dictionary
+
+        Returns:
+            DependencyGraph: The graph
+        """
+        graph = cls()
+        for name in conf["components_list"]:
+            c_dict = conf["components_dict"][name]
+            graph.add_component(name,
+                                c_dict["param_values"].get("comp_type"),
+                                c_dict["parent_fullName"],
+                                c_dict["param_values"])
+        graph.resolve()
+        return graph
+
+    @classmethod
+    def from_guide(cls, guide):
+        """Create the graph from a guide.
+
+        Args:
+            guide (guide.Rig): The guide, set from the scene or a template
+
+        Returns:
+            DependencyGraph: The graph
+        """
+        graph = cls()
+        for name in guide.componentsIndex:
+            comp_guide = guide.components.get(name)
+            if comp_guide is None:
+                continue
+            parent = None
+            if comp_guide.parentComponent is not None:
+                parent = comp_guide.parentComponent.fullName
+            graph.add_component(name,
+                                comp_guide.type,
+                                parent,
+                                comp_guide.values)
+        graph.resolve()
+        return graph
+
+    def add_component(self, name, comp_type, parent, param_values):
+        """Add a component to the graph.
+
+        The missing dependencies are only known after resolve.
+
+        Args:
+            name (str): Component full name
+            comp_type (str): Component type
+            parent (str or None): Parent component full name
+            param_values (dict): Component parameters
+        """
+        if name not in self.types:
+            self.order.append(name)
+        self.types[name] = comp_type
+        self.parents[name] = parent
+        deps = {}
+        if parent:
+            deps[parent] = set([PARENT])
+            if param_values.get("useIndex"):
+                deps[parent].add(JOINT)
+        for ref, kind, key in get_references(param_values):
+            if ref != name:
+                deps.setdefault(ref, set()).add(kind)
+        self.dependencies[name] = deps
+        self._schedule = None
+
+    def resolve(self):
+        """Update the users of each component and the missing components."""
+        self.users = dict((name, set()) for name in self.order)
+        self.missing = []
+        for name in self.order:
+            for dep, kinds in self.dependencies[name].items():
+                self.users.setdefault(dep, set()).add(name)
+                if dep not in self.types:
+                    for kind in sorted(kinds):
+                        self.missing.append((name, dep, kind))
+        self._schedule = None
+
+    def __contains__(self, name):
+        return name in self.types
+
+    def __len__(self):
+        return len(self.order)
+
+    # =====================================================
+    # QUERY
+    # =====================================================
+
+    def get_dependencies(self, names):
+        """Get the components and all their dependencies, recursively.
+
+        Args:
+            names (iterable of str): Components full names
+
+        Returns:
+            set: The components needed to build the given components
+        """
+        return self._walk(names, self.dependencies)
+
+    def get_dependents(self, names):
+        """Get the components and all the components depending on them,
+        recursively.
+
+        Args:
+            names (iterable of str): Components full names. Missing
+                components are valid, ie. removed components
+
+        Returns:
+            set: The components affected by a change on the given components
+        """
+        return self._walk(names, self.users)
+
+    def get_partial_build(self, names):
+        """Get the components needed to build some components of the guide.
+
+        The components use the objects of their parent and references, and
+        the parents need their own parents, up to the guide root. These are
+        the stubs of the partial build. The references of the stubs are not
+        needed, the stubs don't connect to them.
+
+        Args:
+            names (iterable of str): Components full names to build
+
+        Returns:
+            tuple: set of the components to build and set of the stubs
+        """
+        build = set(n for n in names if n in self.types)
+        needed = set(build)
+        for name in build:
+            needed.update(d for d in self.dependencies[name]
+                          if d in self.types)
+
+        stubs = set()
+        visited = set()
+        for name in needed:
+            while name in self.types and name not in visited:
+                visited.add(name)
+                if name not in build:
+                    stubs.add(name)
+                name = self.parents[name]
+        return build, stubs
+
+    def _walk(self, names, edges):
+        result = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in result:
+                continue
+            result.add(name)
+            stack.extend(edges.get(name, ()))
+        return result
+
+    def find_cycles(self):
+        """Find the dependency cycles.
+
+        Returns:
+            list of list: The components of each cycle, in guide order
+        """
+        index = dict((name, i) for i, name in enumerate(self.order))
+        # iterative Tarjan strongly connected components
+        counter = 0
+        lowlink = {}
+        visited = {}
+        onStack = set()
+        stack = []
+        cycles = []
+        for start in self.order:
+            if start in visited:
+                continue
+            work = [(start, iter(self._deps(start)))]
+            visited[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            onStack.add(start)
+            while work:
+                name, deps = work[-1]
+                for dep in deps:
+                    if dep not in visited:
+                        visited[dep] = lowlink[dep] = counter
+                        counter += 1
+                        stack.append(dep)
+                        onStack.add(dep)
+                        work.append((dep, iter(self._deps(dep))))
+                        break
+                    elif dep in onStack:
+                        lowlink[name] = min(lowlink[name], visited[dep])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[name])
+                    if lowlink[name] == visited[name]:
+                        scc = []
+                        while True:
+                            node = stack.pop()
+                            onStack.discard(node)
+                            scc.append(node)
+                            if node == name:
+                                break
+                        if len(scc) > 1:
+                            cycles.append(sorted(scc, key=index.get))
+        return sorted(cycles, key=lambda c: index[c[0]])
+
+    def _deps(self, name):
+        return [d for d in self.dependencies[name] if d in self.types]
+
+    def find_parent_cycles(self):
+        """Find the cycles in the parent links.
+
+        Returns:
+            list of list: The components of each cycle
+        """
+        cycles = []
+        done = set()
+        for name in self.order:
+            path = []
+            node = name
+            while node in self.types and node not in done:
+                if node in path:
+                    cycles.append(path[path.index(node):])
+                    break
+                path.append(node)
+                node = self.parents[node]
+            done.update(path)
+        return cycles
+
+    def validate(self):
+        """Validate the graph before building it.
+
+        The parent cycles and the missing parents are errors. The missing
+        references are warnings, the build skips them.
+
+        The cycles of the ui host and reference arrays are valid (ie. the
+        spine is the parent of its UI host component and uses it as UI
+        host). These references are only used after the objects of all the
+        components are created.
+
+        Returns:
+            tuple: errors and warnings lists of messages
+        """
+        errors = []
+        warnings = []
+        for name, dep, kind in self.missing:
+            if kind == PARENT:
+                errors.append("{}: parent component {} not found".format(
+                    name, dep))
+            elif kind != JOINT:
+                warnings.append("{}: {} reference {} not found".format(
+                    name, kind, dep))
+
+        for cycle in self.find_parent_cycles():
+            errors.append("Parent cycle: {}".format(" > ".join(cycle)))
+
+        return errors, warnings
+
+    # =====================================================
+    # SCHEDULE
+    # =====================================================
+
+    def schedule(self, names=None):
+        """Get the build order of the components.
+
+        The components are built step by step, each step for all the
+        components before the next step. So the only dependency inside a step
+        is the parent: the control tag and the joints of the component need
+        the parent ones. The ui host and the reference arrays are used in
+        later steps than the objects creation, so they don't change the
+        order.
+
+        The components are sorted so each one comes after its parent, keeping
+        the guide order between the rest.
+
+        Args:
+            names (iterable of str, optional): Components to sort. Default
+                is all the components
+
+        Returns:
+            list of str: The components in build order
+        """
+        if self._schedule is None:
+            self._schedule = self._sort()
+        if names is None:
+            return list(self._schedule)
+        names = set(names)
+        return [n for n in self._schedule if n in names]
+
+    def _sort(self):
+        index = dict((name, i) for i, name in enumerate(self.order))
+        children = {}
+        ready = []
+        for name in self.order:
+            parent = self.parents[name]
+            if parent in self.types:
+                children.setdefault(parent, []).append(name)
+            else:
+                ready.append(index[name])
+        heapq.heapify(ready)
+
+        result = []
+        done = set()
+        while len(result) < len(self.order):
+            if not ready:
+                # parent cycle, the guide is not valid
+                name = [n for n in self.order if n not in done][0]
+                heapq.heappush(ready, index[name])
+            name = self.order[heapq.heappop(ready)]
+            if name in done:
+                continue
+            done.add(name)
+            result.append(name)
+            for child in children.get(name, ()):
+                heapq.heappush(ready, index[child])
+        return result
+
+    # =====================================================
+    # EXPORT
+    # =====================================================
+
+    def to_dict(self):
+        """Get the graph as a dictionary.
+
+        Returns:
+            dict: The components, edges, missing references, cycles and build
+                order
+        """
+        edges = []
+        for name in self.order:
+            for dep in sorted(self.dependencies[name]):
+                edges.append({"from": dep,
+                              "to": name,
+                              "kinds": sorted(self.dependencies[name][dep])})
+        return {"components": [{"name": n,
+                                "type": self.types[n],
+                                "parent": self.parents[n]}
+                               for n in self.order],
+                "edges": edges,
+                "missing": [list(m) for m in self.missing],
+                "cycles": self.find_cycles(),
+                "schedule": self.schedule()}
+
+    def to_dot(self, name="shifter"):
+        """Get the graph in DOT format.
+
+        The edges go from the dependency to the component using it.
+
+        Args:
+            name (str, optional): Graph name
+
+        Returns:
+            str: The DOT graph
+        """
+        styles = {PARENT: "solid", UI_HOST: "dashed", REF_ARRAY: "dotted"}
+        lines = ['digraph "{}" {{'.format(name),
+                 "    rankdir=LR;",
+                 "    node [shape=box];"]
+        for comp in self.order:
+            lines.append('    "{}" [label="{}\\n{}"];'.format(
+                comp, comp, self.types[comp]))
+        for comp in self.order:
+            for dep in sorted(self.dependencies[comp]):
+                kinds = sorted(self.dependencies[comp][dep])
+                style = styles.get(kinds[0], "solid")
+                if PARENT in kinds:
+                    style = "solid"
+                attrs = 'label="{}", style={}'.format(",".join(kinds), style)
+                if dep not in self.types:
+                    attrs += ", color=red"
+                lines.append('    "{}" -> "{}" [{}];'.format(dep, comp, attrs))
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, filePath):
+        """Save the graph. DOT format if the extension is .dot or .gv,
+        JSON for other extensions.
+
+        Args:
+            filePath (str): Path to the file
+        """
+        if filePath.lower().endswith((".dot", ".gv")):
+            data = self.to_dot()
+        else:
+            data = json.dumps(self.to_dict(), indent=4)
+        with open(filePath, "w") as f:
+            f.write(data)
@@ -1,24 +1,23 @@
 # Built-in
 import datetime
 import getpass
-import imp
 import inspect
 import json
 import os
 import shutil
 import subprocess
 import sys
+import timeit
 import traceback
 from functools import partial
 
 
 # pymel
 import pymel.core as pm
-from pymel.core import datatypes
 
 # mgear
 import mgear
-from mgear.core import attribute, dag, vector, pyqt, skin, string, fcurve
+from mgear.core import attribute, dag, pyqt, skin, string, fcurve
 from mgear.core import utils, curve
 from mgear.vendor.Qt import QtCore, QtWidgets, QtGui
 from mgear.anim_picker.gui import MAYA_OVERRIDE_COLOR
@@ -27,6 +26,10 @@ from . import guide_ui as guui
 from . import custom_step_ui as csui
 from . import naming_rules_ui as naui
 from . import naming
+from . import guide_index
+from . import control_buffers
+from . import guide_positions
+from . import custom_step
 # pyside
 from maya.app.general.mayaMixin import MayaQDockWidget
 from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
@@ -92,7 +95,7 @@ class Main(object):
 
         """
 
-        if scriptName not in self.paramDefs.keys():
+        if scriptName not in self.paramDefs:
             mgear.log("Can't find parameter definition for : " + scriptName,
                       mgear.sev_warning)
             return False
@@ -258,12 +261,17 @@ class Rig(Main):
             loading is up to date. If parameters or object are missing a
             warning message will be display and the guide should be updated.
         controllers (dict): Dictionary of controllers.
+        controlBuffers (ControlBufferCache): The control shape buffers of
+            the guide, indexed by name with their curve data
+        positions (PositionStore): The positions of all the components
         components (dict): Dictionary of component. Keys are the component
             fullname (ie. 'arm_L0')
         componentsIndex (list): List of component name sorted by order
             creation (hierarchy order)
         parents (list): List of the parent of each component, in same order
             as self.components
+        guide_index (GuideIndex): Index of the guide nodes, only available
+            while parsing the hierarchy
     """
 
     def __init__(self):
@@ -275,8 +283,11 @@ class Rig(Main):
         self.valid = True
 
         self.controllers = {}
+        self.controlBuffers = control_buffers.ControlBufferCache()
+        self.positions = guide_positions.PositionStore()
         self.components = {}  # Keys are the component fullname (ie. 'arm_L0')
         self.componentsIndex = []
+        self.guide_index = None
         self.parents = []
 
         self.guide_template_dict = {}  # guide template dict to export guides
@@ -441,15 +452,19 @@ class Rig(Main):
         # ---------------------------------------------------
         # Get the controllers
         mgear.log("Get controllers")
-        self.controllers_org = dag.findChild(self.model, "controllers_org")
+        self.guide_index = guide_index.GuideIndex(self.model)
+        self.controllers_org = self.guide_index.find("controllers_org")
         if self.controllers_org:
-            for child in self.controllers_org.getChildren():
+            self.controlBuffers.build(self.controllers_org)
+            buffers = self.controlBuffers.buffers
+            for child in pm.ls(list(buffers.values())):
                 self.controllers[child.name().split("|")[-1]] = child
 
         # ---------------------------------------------------
         # Components
         mgear.log("Get components")
         self.findComponentRecursive(root, branch)
+        self.guide_index = None
         endTime = datetime.datetime.now()
         finalTime = endTime - startTime
         mgear.log("Find recursive in  [ " + str(finalTime) + " ]")
@@ -598,14 +613,9 @@ class Rig(Main):
 
         """
         # Get rig size to adapt size of object to the scale of the character
-        maximum = 1
-        v = datatypes.Vector()
-        for comp in self.components.values():
-            for pos in comp.apos:
-                d = vector.getDistance(v, pos)
-                maximum = max(d, maximum)
-
-        self.values["size"] = max(maximum * .05, .1)
+        self.positions = guide_positions.PositionStore.from_components(
+            self.components.values())
+        self.values["size"] = self.positions.rig_size()
 
     def findComponentRecursive(self, node, branch=True):
         """Finds components by recursive search.
@@ -620,7 +630,9 @@ class Rig(Main):
             comp_guide = self.getComponentGuide(comp_type)
 
             if comp_guide:
+                comp_guide.guide_index = self.guide_index
                 comp_guide.setFromHierarchy(node)
+                comp_guide.guide_index = None
                 mgear.log(comp_guide.fullName + " (" + comp_type + ")")
                 if not comp_guide.valid:
                     self.valid = False
@@ -972,6 +984,12 @@ class Rig(Main):
 
 class HelperSlots(object):
 
+    # If False or in Maya batch mode, a failing custom step doesn't open the
+    # confirm dialog. The build is stopped and the error is stored in
+    # failed_steps
+    interactive = True
+    failed_steps = []
+
     def updateHostUI(self, lEdit, targetAttr):
         oType = pm.nodetypes.Transform
 
@@ -1258,10 +1276,7 @@ class HelperSlots(object):
         stepsDict = {}
         stepsDict["itemsList"] = itemsList
         for item in itemsList:
-            step = open(item, "r")
-            data = step.read()
-            stepsDict[item] = data
-            step.close()
+            stepsDict[item] = custom_step.get_step_source(item)
 
         return stepsDict
 
@@ -1284,7 +1299,9 @@ class HelperSlots(object):
                 else:
                     runPath = stepPath
 
-                customStep = imp.load_source(fileName, runPath)
+                startTime = timeit.default_timer()
+                customStep, loadTime, cached = custom_step.load_step(
+                    fileName, runPath)
                 if hasattr(customStep, "CustomShifterStep"):
                     argspec = inspect.getargspec(customStep.CustomShifterStep.__init__)
                     if "stored_dict" in argspec.args:
@@ -1302,6 +1319,13 @@ class HelperSlots(object):
                     pm.displayInfo(
                         "SUCCEED: Custom Step simple script: %s. "
                         "Succeed!!" % stepPath)
+                runTime = timeit.default_timer() - startTime - loadTime
+                mgear.log(
+                    "Custom step: {} load: {:.4f}s{} run: {:.4f}s".format(
+                        fileName,
+                        loadTime,
+                        " (cached)" if cached else "",
+                        runTime))
 
         except Exception as ex:
             template = "An exception of type {0} occurred. "
@@ -1309,6 +1333,11 @@ class HelperSlots(object):
             message = template.format(type(ex).__name__, ex.args)
             pm.displayError(message)
             pm.displayError(traceback.format_exc())
+            if not self.interactive or pm.about(batch=True):
+                self.failed_steps.append({"step": stepPath,
+                                          "error": message,
+                                          "traceback": traceback.format_exc()})
+                return True
             cont = pm.confirmBox(
                 "FAIL: Custom Step Fail",
                 "The step:%s has failed. Continue with next step?"
@@ -0,0 +1,137 @@
+"""Shifter guide node index.
+
+One pass index of the guide hierarchy, used to resolve the component guide
+locators and blades by name without walking the whole hierarchy for each of
+them. The world matrices of all the indexed nodes are read in one bulk query.
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import pymel.core as pm
+from pymel.core import datatypes
+
+
+class GuideIndex(object):
+    """Name to node index of a guide model.
+
+    The index is a snapshot of the hierarchy at creation time. It should be
+    used while parsing the guide and discarded after.
+
+    Attributes:
+        model (dagNode): The guide model
+        nodes (dict): Transform full path name by short name
+        matrices (dict): World matrix as a flat list of 16 floats by short
+            name. None until the first matrix query
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.nodes = {}
+        self.pynodes = {}
+        self.matrices = None
+
+        self.build()
+
+    def build(self):
+        """Index all the transforms under the model.
+
+        If the same short name exists more than once, the first one in the
+        listRelatives order is kept. Same as dag.findChild.
+        """
+        self.nodes = {}
+        self.pynodes = {}
+        self.matrices = None
+        descendents = cmds.listRelatives(self.model.longName(),
+                                         allDescendents=True,
+                                         type="transform",
+                                         fullPath=True) or []
+        for longName in descendents:
+            shortName = longName.split("|")[-1]
+            if shortName not in self.nodes:
+                self.nodes[shortName] = longName
+
+    def find(self, name):
+        """Find a transform under the model by name.
+
+        Args:
+            name (str): Short name of the node
+
+        Returns:
+            dagNode or bool: The node or False if not found
+        """
+        node = self.pynodes.get(name)
+        if node is None:
+            longName = self.nodes.get(name)
+            if longName is None:
+                return False
+            node = pm.PyNode(longName)
+            self.pynodes[name] = node
+        return node
+
+    def read_matrices(self):
+        """Read the world matrix of all the indexed nodes in one pass."""
+        items = list(self.nodes.items())
+        selList = om.MSelectionList()
+        for shortName, longName in items:
+            selList.add(longName)
+
+        self.matrices = {}
+        for i, item in enumerate(items):
+            self.matrices[item[0]] = list(
+                selList.getDagPath(i).inclusiveMatrix())
+
+    def getMatrix(self, name):
+        """Get the world matrix of a node.
+
+        Each call returns a new matrix, so it can be modified safely.
+
+        Args:
+            name (str): Short name of the node
+
+        Returns:
+            matrix: The world matrix or None if the node is not indexed
+        """
+        if self.matrices is None:
+            self.read_matrices()
+        m = self.matrices.get(name)
+        if m is None:
+            return None
+        return datatypes.Matrix([m[0:4], m[4:8], m[8:12], m[12:16]])
+
+    def getMatrixValues(self, name):
+        """Get the world matrix of a node as a list of 16 floats.
+
+        Args:
+            name (str): Short name of the node
+
+        Returns:
+            list of float: The world matrix or None if the node is not
+                indexed
+        """
+        if self.matrices is None:
+            self.read_matrices()
+        m = self.matrices.get(name)
+        if m is None:
+            return None
+        return list(m)
+
+    def getTranslation(self, name):
+        """Get the world position of a node, from its world matrix.
+
+        Args:
+            name (str): Short name of the node
+
+        Returns:
+            vector: The world position or None if the node is not indexed
+        """
+        if self.matrices is None:
+            self.read_matrices()
+        m = self.matrices.get(name)
+        if m is None:
+            return None
+        return datatypes.Vector(m[12], m[13], m[14])
+
+    def __contains__(self, name):
+        return name in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
@@ -62,6 +62,19 @@ def build_from_selection(*args):
     rg.buildFromSelection()
 
 
+def incremental_build_from_selection(*args):
+    """Build rig from current selection, only rebuilding the components with
+    changes in the guide if the rig was built before in this session.
+
+    Args:
+        *args: None
+    """
+    shifter.log_window()
+    rg = shifter.Rig()
+    rg.incremental = True
+    rg.buildFromSelection()
+
+
 def inspect_settings(tabIdx=0, *args):
     """Open the component or root setting UI.
 
@@ -0,0 +1,185 @@
+"""Shifter guide positions store.
+
+The positions of the guide components (the apos lists) are stored in one
+contiguous array, each component having a slice of it, to compute the rig
+size, the component sizes and the bounding boxes in one pass.
+
+NumPy is used if available. Without it the same computations are done in
+pure python. Both give the same values as vector.getDistance: the distance
+is sqrt(x * x + y * y + z * z), computed in double precision in the same
+order.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Below this number of points the pure python loop is faster than numpy
+NUMPY_MIN_POINTS = 64
+
+
+def _as_points(positions):
+    """Get the positions as a list of 3 floats tuples.
+
+    Args:
+        positions (list): Vectors or sequences of 3 floats
+
+    Returns:
+        list of tuple: The positions
+    """
+    return [(float(p[0]), float(p[1]), float(p[2])) for p in positions]
+
+
+def _distances(points, origin):
+    """Distances of the points to the origin, as a numpy array or a list."""
+    ox, oy, oz = float(origin[0]), float(origin[1]), float(origin[2])
+    if numpy is not None and len(points) >= NUMPY_MIN_POINTS:
+        array = numpy.asarray(points, dtype=numpy.float64)
+        dx = array[:, 0] - ox
+        dy = array[:, 1] - oy
+        dz = array[:, 2] - oz
+        return numpy.sqrt(dx * dx + dy * dy + dz * dz)
+
+    sqrt = math.sqrt
+    return [sqrt((x - ox) * (x - ox) + (y - oy) * (y - oy)
+                 + (z - oz) * (z - oz))
+            for x, y, z in points]
+
+
+def max_distance(positions, origin=(0.0, 0.0, 0.0)):
+    """Get the largest distance of the positions to an origin.
+
+    Args:
+        positions (list): Vectors or sequences of 3 floats
+        origin (vector or list of float): The origin
+
+    Returns:
+        float: The distance. 0.0 without positions
+    """
+    if not len(positions):
+        return 0.0
+    if numpy is None or not isinstance(positions, numpy.ndarray):
+        positions = _as_points(positions)
+    distances = _distances(positions, origin)
+    if isinstance(distances, list):
+        return max(distances)
+    return float(distances.max())
+
+
+def bounding_box(positions):
+    """Get the bounding box of the positions.
+
+    Args:
+        positions (list): Vectors or sequences of 3 floats
+
+    Returns:
+        tuple: The minimum and maximum corners as 3 floats tuples. None
+            without positions
+    """
+    if not len(positions):
+        return None
+    if numpy is not None and len(positions) >= NUMPY_MIN_POINTS:
+        array = numpy.asarray(positions, dtype=numpy.float64)
+        return (tuple(float(v) for v in array.min(axis=0)),
+                tuple(float(v) for v in array.max(axis=0)))
+
+    points = _as_points(positions)
+    xs, ys, zs = zip(*points)
+    return (min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs))
+
+
+class PositionStore(object):
+    """Positions of all the components of a guide.
+
+    Attributes:
+        points (numpy.ndarray or list): The positions of all the components,
+            as a Nx3 float64 array or a list of 3 floats tuples without
+            NumPy
+        ranges (dict): Start and end index in points by component name
+    """
+
+    def __init__(self):
+        self.points = []
+        self.ranges = {}
+
+    @classmethod
+    def from_components(cls, components):
+        """Create the store from component guides.
+
+        Args:
+            components (list of ComponentGuide): The components
+
+        Returns:
+            PositionStore: The store
+        """
+        store = cls()
+        points = []
+        for comp in components:
+            start = len(points)
+            if hasattr(comp, "get_positions"):
+                points.extend(_as_points(comp.get_positions()))
+            else:
+                points.extend(_as_points(comp.apos))
+            store.ranges[comp.fullName] = (start, len(points))
+        if numpy is not None:
+            store.points = numpy.array(points,
+                                       dtype=numpy.float64).reshape(-1, 3)
+        else:
+            store.points = points
+        return store
+
+    def __len__(self):
+        return len(self.points)
+
+    def get(self, name=None):
+        """Get the positions of a component.
+
+        The NumPy array of a component is a view of the store array.
+
+        Args:
+            name (str): The component name. None for all the positions
+
+        Returns:
+            numpy.ndarray or list: The positions
+        """
+        if name is None:
+            return self.points
+        start, end = self.ranges[name]
+        return self.points[start:end]
+
+    def max_distance(self, name=None, origin=(0.0, 0.0, 0.0)):
+        """Get the largest distance to an origin.
+
+        Args:
+            name (str): The component name. None for all the positions
+            origin (vector or list of float): The origin
+
+        Returns:
+            float: The distance. 0.0 without positions
+        """
+        return max_distance(self.get(name), origin)
+
+    def bounding_box(self, name=None):
+        """Get the bounding box of the positions.
+
+        Args:
+            name (str): The component name. None for all the positions
+
+        Returns:
+            tuple: The minimum and maximum corners. None without positions
+        """
+        return bounding_box(self.get(name))
+
+    def rig_size(self):
+        """Get the rig size option value.
+
+        Same as the guide Rig addOptionsValues: 5% of the largest distance
+        to the world origin, at least 1, with a 0.1 minimum.
+
+        Returns:
+            float: The size
+        """
+        maximum = max(self.max_distance(), 1)
+        return max(maximum * .05, .1)
@@ -0,0 +1,234 @@
+"""Compact binary format for Shifter guide templates (.sgtb).
+
+The template dictionary is stored as a JSON header where the float arrays
+(matrices, positions and curve points) are replaced by references to
+packed float64 arrays. Identical arrays are only stored once, so the
+duplicated data (ie. "atra" and "apos" versus "tra" and "pos") doesn't
+increase the size. The round trip to the template dictionary is lossless.
+
+File layout:
+    magic (4 bytes) "SGTB"
+    version (uint16)
+    flags (uint16) FLAG_ZLIB if the payload is compressed
+    arrays table size (uint32) in bytes, uncompressed
+    template size (uint32) in bytes, uncompressed
+    payload: arrays table JSON, template JSON (utf-8) and float64 little
+        endian data
+
+This module only uses the python standard library.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b"SGTB"
+VERSION = 1
+FLAG_ZLIB = 1
+COMPACT_EXT = ".sgtb"
+
+_PREFIX = struct.Struct("<4sHHII")
+_ARRAY_KEY = "__array__"
+
+
+def _float_array_shape(value):
+    """Get the shape of a float vector or a float matrix.
+
+    Only lists where all the elements are floats are packed. The int values
+    must stay as JSON to keep the round trip lossless. The tuples, ie. the
+    values of the PyMEL get(), are packed as lists, like JSON does.
+
+    Args:
+        value (list or tuple): list to check
+
+    Returns:
+        tuple or None: shape of the array or None if is not a float array
+    """
+    if not value:
+        return None
+    first = value[0]
+    if type(first) is float:
+        for v in value:
+            if type(v) is not float:
+                return None
+        return (len(value),)
+    if type(first) in (list, tuple) and first:
+        n = len(first)
+        for row in value:
+            if type(row) not in (list, tuple) or len(row) != n:
+                return None
+            for v in row:
+                if type(v) is not float:
+                    return None
+        return (len(value), n)
+    return None
+
+
+class _Encoder(object):
+
+    def __init__(self):
+        self.data = array("d")
+        self.arrays = []
+        self.indexes = {}
+
+    def add_array(self, flat, shape):
+        values = array("d", flat)
+        key = (shape, _tobytes(values))
+        index = self.indexes.get(key)
+        if index is None:
+            index = len(self.arrays)
+            self.arrays.append([len(self.data)] + list(shape))
+            self.data.extend(values)
+            self.indexes[key] = index
+        return {_ARRAY_KEY: index}
+
+    def encode(self, value):
+        if isinstance(value, dict):
+            return dict((k, self.encode(v)) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            shape = _float_array_shape(value)
+            if shape is None:
+                return [self.encode(v) for v in value]
+            if len(shape) == 1:
+                return self.add_array(value, shape)
+            return self.add_array([v for row in value for v in row], shape)
+        return value
+
+
+def _tobytes(values):
+    if sys.byteorder != "little":
+        values = array("d", values)
+        values.byteswap()
+    try:
+        return values.tobytes()
+    except AttributeError:
+        return values.tostring()
+
+
+def _frombytes(data):
+    values = array("d")
+    try:
+        values.frombytes(data)
+    except AttributeError:
+        values.fromstring(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def dumps(conf, compress=True):
+    """Serialize a guide template dictionary to the compact format.
+
+    Args:
+        conf (dict): The guide template dictionary
+        compress (bool, optional): If True, compress the payload with zlib
+
+    Returns:
+        bytes: The compact template
+    """
+    encoder = _Encoder()
+    root = json.dumps(encoder.encode(conf),
+                      separators=(",", ":")).encode("utf-8")
+    table = json.dumps(encoder.arrays,
+                       separators=(",", ":")).encode("utf-8")
+    payload = table + root + _tobytes(encoder.data)
+
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+
+    return _PREFIX.pack(
+        MAGIC, VERSION, flags, len(table), len(root)) + payload
+
+
+def loads(data):
+    """Deserialize a compact guide template.
+
+    Args:
+        data (bytes): The compact template
+
+    Returns:
+        dict: The guide template dictionary
+
+    Raises:
+        ValueError: If the data is not a supported compact template
+    """
+    if not is_compact(data):
+        raise ValueError("Not a compact guide template")
+    magic, version, flags, table_size, root_size = _PREFIX.unpack_from(data)
+    if version > VERSION:
+        raise ValueError(
+            "Compact guide template version {} is not supported".format(
+                version))
+
+    payload = data[_PREFIX.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    table = json.loads(payload[:table_size].decode("utf-8"))
+    root = payload[table_size:table_size + root_size].decode("utf-8")
+    values = _frombytes(payload[table_size + root_size:])
+
+    def object_hook(obj):
+        if len(obj) != 1 or _ARRAY_KEY not in obj:
+            return obj
+        entry = table[obj[_ARRAY_KEY]]
+        offset = entry[0]
+        if len(entry) == 2:
+            return values[offset:offset + entry[1]].tolist()
+        rows, cols = entry[1], entry[2]
+        flat = values[offset:offset + rows * cols].tolist()
+        return [flat[i:i + cols] for i in range(0, rows * cols, cols)]
+
+    return json.loads(root, object_hook=object_hook)
+
+
+def is_compact(data):
+    """Check if the data starts with the compact template magic number.
+
+    Args:
+        data (bytes): The file content or the first bytes of it
+
+    Returns:
+        bool: True if is a compact template
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def is_compact_file(filePath):
+    """Check if a file is a compact template.
+
+    Args:
+        filePath (str): Path to the file
+
+    Returns:
+        bool: True if is a compact template
+    """
+    with open(filePath, "rb") as f:
+        return is_compact(f.read(len(MAGIC)))
+
+
+def dump(conf, filePath, compress=True):
+    """Save a guide template dictionary in the compact format.
+
+    Args:
+        conf (dict): The guide template dictionary
+        filePath (str): Path to the file
+        compress (bool, optional): If True, compress the payload with zlib
+    """
+    with open(filePath, "wb") as f:
+        f.write(dumps(conf, compress))
+
+
+def load(filePath):
+    """Load a compact guide template file.
+
+    Args:
+        filePath (str): Path to the file
+
+    Returns:
+        dict: The guide template dictionary
+    """
+    with open(filePath, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,776 @@
+"""Guide template differences.
+
+Compare guide templates (.sgt dictionaries) without Maya. The templates are
+never modified: the transforms are compared with an absolute tolerance on
+flattened copies of the values, instead of truncating the values of the
+templates in place.
+
+A guide can be compared with several master guides in one pass with
+guide_diff_masters. The guide values are flattened once and reused for
+all the masters. The reports are json serializable.
+
+This module only uses the python standard library. NumPy is used if
+available to compare the transforms of a component in one operation. The
+templates can be .sgt or compact .sgtb files.
+
+    python guide_template_diff.py guide.sgt master_a.sgtb master_b.sgt
+"""
+import argparse
+import copy
+import json
+import sys
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from mgear.shifter import guide_template_binary
+except ImportError:
+    # run as a script, without Maya
+    import guide_template_binary
+
+# Two transform values match if they differ by less than the tolerance.
+# Same precision as the 6 decimals truncation of the previous comparison
+TOLERANCE = 1e-6
+
+# Guide root parameters not compared: information and custom steps
+NOT_CHECK_ROOT_PARAMS = ("date",
+                         "user",
+                         "ismodel",
+                         "maya_version",
+                         "gear_version",
+                         "preCustomStep",
+                         "postCustomStep")
+
+
+# helper functions
+def to_list(item):
+    """Convert items to list
+
+    Args:
+        item (var): item to convert to list, if it is not list
+
+    Returns:
+        list: list with the items
+    """
+    if not isinstance(item, list):
+        return list(item)
+    else:
+        return item
+
+
+def to_list_AB(componentA, componentB):
+    """Conver to list  and copy list A to B if B is None
+
+    Args:
+        componentA (list): Components list
+        componentB (list): Components list
+
+    Returns:
+        list, list: componentA, componentB
+    """
+    componentA = to_list(componentA)
+    if not componentB:
+        componentB = componentA
+    componentB = to_list(componentB)
+
+    return componentA, componentB
+
+
+def flatten(values):
+    """Flatten a matrix or a position to a tuple of floats.
+
+    Args:
+        values (list): Matrix as a list of rows, or list of floats
+
+    Returns:
+        tuple: The values
+    """
+    flat = []
+    for v in values:
+        if isinstance(v, (list, tuple)):
+            flat.extend(v)
+        else:
+            flat.append(v)
+    return tuple(flat)
+
+
+def values_match(valuesA, valuesB, tolerance=TOLERANCE):
+    """Compare 2 flattened transforms.
+
+    Args:
+        valuesA (tuple): Flattened values
+        valuesB (tuple): Flattened values
+        tolerance (float): Absolute tolerance
+
+    Returns:
+        bool: True if all the values match
+    """
+    if len(valuesA) != len(valuesB):
+        return False
+    for a, b in zip(valuesA, valuesB):
+        if abs(a - b) > tolerance:
+            return False
+    return True
+
+
+def rows_match(rowsA, rowsB, tolerance=TOLERANCE):
+    """Compare lists of flattened transforms.
+
+    Args:
+        rowsA (list of tuple): Flattened values
+        rowsB (list of tuple): Flattened values, same number of rows
+        tolerance (float): Absolute tolerance
+
+    Returns:
+        list of bool: True for each matching row
+    """
+    if not rowsA:
+        return []
+    size = len(rowsA[0])
+    if (numpy is not None
+            and len(rowsA) > 1
+            and all(len(r) == size for r in rowsA)
+            and all(len(r) == size for r in rowsB)):
+        arrayA = numpy.array(rowsA, dtype=numpy.float64)
+        arrayB = numpy.array(rowsB, dtype=numpy.float64)
+        bad = (numpy.abs(arrayA - arrayB) > tolerance).any(axis=1)
+        return [not b for b in bad.tolist()]
+    return [values_match(a, b, tolerance) for a, b in zip(rowsA, rowsB)]
+
+
+class FlatCache(object):
+    """Flattened transform values of templates.
+
+    Each transform dictionary is flattened once, so a guide compared with
+    several masters is only flattened once.
+    """
+
+    def __init__(self):
+        self.flat = {}
+        self.refs = []
+
+    def get(self, tra_dict):
+        """Get the flattened values of a transform dictionary.
+
+        Args:
+            tra_dict (dict): Transform or position dictionary
+
+        Returns:
+            dict: Flattened values by name
+        """
+        key = id(tra_dict)
+        flat = self.flat.get(key)
+        if flat is None:
+            flat = dict((k, flatten(v)) for k, v in tra_dict.items())
+            self.flat[key] = flat
+            # keep the dictionary alive while its id is used as key
+            self.refs.append(tra_dict)
+        return flat
+
+
+def dict_diff(dictA, dictB):
+    """Return key and value differences from 2 given dictionaries
+
+    Args:
+        dictA (dict): Dictionary A
+        dictB (dict): Dictionary B
+
+    Returns:
+        list, lit: Not found keys, not matching values
+    """
+    keysB = set(dictB)
+    not_found_key = [k for k in dictA if k not in keysB]
+    not_match_value = [[k, copy.deepcopy(dictA[k]), copy.deepcopy(dictB[k])]
+                       for k in dictA
+                       if k in keysB and dictA[k] != dictB[k]]
+
+    return not_found_key, not_match_value
+
+
+def tra_diff(tra_dictA, tra_dictB, tolerance=TOLERANCE, cache=None):
+    """Check the differences between 2 transform dictionary
+
+    The values are compared with an absolute tolerance. The dictionaries
+    are not modified.
+
+    Args:
+        tra_dictA (dict): Transform or position dictionary
+        tra_dictB (dict): Transform or position dictionary
+        tolerance (float, optional): Absolute tolerance
+        cache (FlatCache, optional): Flattened values cache
+
+    Returns:
+        list, list: Not found transforms, not matching transforms
+    """
+    if cache is None:
+        cache = FlatCache()
+    flatA = cache.get(tra_dictA)
+    flatB = cache.get(tra_dictB)
+
+    not_found = [k for k in tra_dictA if k not in flatB]
+    shared = [k for k in tra_dictA if k in flatB]
+    match = rows_match([flatA[k] for k in shared],
+                       [flatB[k] for k in shared],
+                       tolerance)
+    not_match = [[k,
+                  copy.deepcopy(tra_dictA[k]),
+                  copy.deepcopy(tra_dictB[k])]
+                 for k, m in zip(shared, match) if not m]
+
+    return not_found, not_match
+
+
+def param_diff(pvA, pvB):
+    """Compare the parameter differences
+
+    Args:
+        pvA (dict): parameter values dictionary
+        pvB (dict): parameter values dictionary
+
+    Returns:
+        dict: Not matching settings
+    """
+
+    not_match = {}
+    not_found_param, not_match_param = dict_diff(pvA, pvB)
+    if not_found_param or not_match_param:
+        not_match = {"not_found_param": not_found_param,
+                     "not_match_param": not_match_param}
+    return not_match
+
+
+def custom_step_values(customStep_val):
+    cs_names = []
+    cs_path = {}
+    # if the custom step is on/off
+    cs_status = {}
+    if customStep_val:
+        cs_val = customStep_val.split(",")
+
+        for cs in cs_val:
+            cs_parts = cs.split("|")
+            name = cs_parts[0][:-1]
+            if name.startswith("*"):
+                name = name[1:]
+                cs_status[name] = False
+            else:
+                cs_status[name] = True
+            cs_names.append(name)
+            cs_path[name] = cs_parts[1][0:]
+
+    return {"names": cs_names, "path": cs_path, "status": cs_status}
+
+
+# guide differences checkers
+##################################
+
+
+def guide_component_diff(guideA, guideB):
+    """Components matching report.
+
+    Compare guide "A" components, against guide "B" components. Considering A
+    the guide that we want to check and B the guide used as a checker.
+
+    Return a dictionary with marching components, missing components and
+    extra components.
+
+    dictionary keys = match, miss, extra
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+
+    Returns:
+        dict: Component matching report in dict format.
+
+    """
+    compA = guideA["components_list"]
+    compB = guideB["components_list"]
+    setA = set(compA)
+    setB = set(compB)
+
+    match = [c for c in compA if c in setB]
+    miss = [c for c in compB if c not in setA]
+    extra = [c for c in compA if c not in setB]
+
+    diff_dict = {"match": match, "miss": miss, "extra": extra}
+
+    return diff_dict
+
+
+def guide_transform_diff(guideA,
+                         guideB,
+                         pos=False,
+                         tolerance=TOLERANCE,
+                         cache=None):
+    """Return guide transform differences
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        pos (bool, optional): If True, will check the positions, instead of
+            the full transform.
+        tolerance (float, optional): Absolute tolerance
+        cache (FlatCache, optional): Flattened values cache
+
+    Returns:
+        list, list: not_match_tra, root_tra_match
+    """
+    # get matching components
+    match_comp = guide_component_diff(guideA, guideB)["match"]
+
+    # check matching components transform
+    not_match_tra = component_transform_diff(guideA,
+                                             guideB,
+                                             match_comp,
+                                             componentB=None,
+                                             pos=pos,
+                                             tolerance=tolerance,
+                                             cache=cache)
+
+    # check root position
+    root_tra_A = guideA["guide_root"]['tra']
+    root_tra_B = guideB["guide_root"]['tra']
+    root_tra_match = values_match(flatten(root_tra_A),
+                                  flatten(root_tra_B),
+                                  tolerance)
+
+    return not_match_tra, root_tra_match
+
+
+def guide_root_settings_diff(guideA, guideB):
+    """Summary
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+
+    Returns:
+        dict: not matching elements
+    """
+    pvA = guideA["guide_root"]['param_values']
+    pvB = guideB["guide_root"]['param_values']
+
+    pdiff = param_diff(pvA, pvB)
+    if pdiff:
+        not_found_param = pdiff["not_found_param"]
+        # need to separate the configuration parameter settings from the pure
+        # information parameters and custom step
+        not_match_param = [p for p in pdiff["not_match_param"]
+                           if p[0] not in NOT_CHECK_ROOT_PARAMS]
+
+        not_match = {}
+        if not_found_param or not_match_param:
+            not_match = {"not_found_param": not_found_param,
+                         "not_match_param": not_match_param}
+        return not_match
+
+
+def guide_component_settings_diff(guideA, guideB, comp_diff=None):
+    """Summary
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        comp_diff (None, dict): Component difference dictionary
+
+    Returns:
+        list: the not matching settings dict and the missing comonent list
+    """
+    if not comp_diff:
+        comp_diff = guide_component_diff(guideA, guideB)
+
+    match = comp_diff["match"]
+    miss = comp_diff["miss"]
+    comp_sett_diff = component_settings_diff(guideA, guideB, match)
+
+    return [comp_sett_diff, miss]
+
+
+def pre_custom_step_diff(guideA, guideB):
+    """Check pre custom steps list differences.
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+
+    Returns:
+        list: missing custom steps, diff path, diff statatus, match order bool
+    """
+    return custom_step_diff(guideA, guideB, "preCustomStep")
+
+
+def post_custom_step_diff(guideA, guideB):
+    """Check post custom steps list differences.
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+
+    Returns:
+        list: missing custom steps, diff path, diff statatus, match order bool
+    """
+    return custom_step_diff(guideA, guideB, "postCustomStep")
+
+
+def custom_step_diff(guideA, guideB, customStep_param):
+    """Check custom steps list differences.
+
+    The function will check for missing custom steps, matching custon steps
+    but with different path, different status and general order of execution
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        customStep_param (str): Custom step parameter name
+
+    Returns:
+        dict: missing custom steps, diff path, diff statatus, match order bool
+    """
+    cs_valA = guideA["guide_root"]["param_values"][customStep_param]
+    csA = custom_step_values(cs_valA)
+    cs_valB = guideB["guide_root"]["param_values"][customStep_param]
+    csB = custom_step_values(cs_valB)
+    namesA = set(csA["names"])
+    namesB = set(csB["names"])
+    # find if any custom step from B is missing in A
+    miss = [cs for cs in csB["names"] if cs not in namesA]
+    # same custom steps with diff path
+    match = [cs for cs in csA["names"] if cs in namesB]
+    diff_path = [cs for cs in match if csA["path"][cs] != csB["path"][cs]]
+    diff_stat = [cs for cs in match if csA["status"][cs] != csB["status"][cs]]
+    # custom step order
+    matchB = [cs for cs in csB["names"] if cs in namesA]
+    match_order = match == matchB
+
+    return {"miss": miss,
+            "path": diff_path,
+            "status": diff_stat,
+            "order": match_order}
+
+
+# component difference checkers
+##################################
+
+
+def componentAB_type_diff(guideA, guideB, componentA, componentB=None):
+    """Return list of not matching types components and the types found
+
+    Usually componentA list and componentB list is the same list. But keeping
+    this separated we can check an arbitrary list with not matching names.
+    In this case the componentB list should match the order and number of
+    componentA types
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        componentA (str or str list): Names of the components to check
+        componentB (None, optional): If None will use the component A list in
+            both guides
+
+    Returns:
+        list: Not matching components
+    """
+    componentA, componentB = to_list_AB(componentA, componentB)
+
+    not_match = []
+    for ca, cb in zip(componentA, componentB):
+        typeA = guideA["components_dict"][ca]['param_values']['comp_type']
+        typeB = guideB["components_dict"][cb]['param_values']['comp_type']
+        if typeA != typeB:
+            not_match.append([ca, cb, typeA, typeB])
+    return not_match
+
+
+def component_type_diff(guideA, guideB, component):
+    """Return Dictionary with not maching components and types
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        componentA (str or str list): Names of the components to check
+
+    Returns:
+        dict: Not matching components
+    """
+    not_match = componentAB_type_diff(guideA, guideB, component)
+    not_match_dict = {}
+    for c in not_match:
+        not_match_dict[c[0]] = [c[2], c[3]]
+
+    return not_match_dict
+
+
+def component_transform_diff(guideA,
+                             guideB,
+                             componentA,
+                             componentB=None,
+                             pos=False,
+                             tolerance=TOLERANCE,
+                             cache=None):
+    """Return a dictionary with the not matching transform and blades
+
+    If the position information is miss or missmatch the report
+    will inform
+
+    Usually componentA list and componentB list is the same list. But keeping
+    this separated we can check an arbitrary list with not matching names.
+    In this case the componentB list should match the order and number of
+    componentA types
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        componentA (str or str list): Names of the components to check
+        componentB (None, optional): If None will use the component A list in
+            both guides
+        pos (bool, optional): If True will check only the position not the full
+            transformation of the componet locators
+        tolerance (float, optional): Absolute tolerance
+        cache (FlatCache, optional): Flattened values cache
+
+    Returns:
+        dict: Not matching components transform
+    """
+    if pos:
+        check = "pos"
+    else:
+        check = "tra"
+    if cache is None:
+        cache = FlatCache()
+
+    componentA, componentB = to_list_AB(componentA, componentB)
+    not_match_dict = {}
+    for ca, cb in zip(componentA, componentB):
+        # check transform
+        traA_dict = guideA["components_dict"][ca][check]
+        traB_dict = guideB["components_dict"][cb][check]
+        not_found_tra, not_match_tra = tra_diff(
+            traA_dict, traB_dict, tolerance, cache)
+
+        # check blades
+        bladesA = guideA["components_dict"][ca]['blade']
+        bladesB = guideB["components_dict"][cb]['blade']
+        not_found_blades, not_match_blades = tra_diff(
+            bladesA, bladesB, tolerance, cache)
+
+        if (not_found_tra
+                or not_match_tra
+                or not_found_blades
+                or not_match_blades):
+            not_match_dict[ca] = {"not_found_tra": not_found_tra,
+                                  "not_match_tra": not_match_tra,
+                                  "not_found_blades": not_found_blades,
+                                  "not_match_blades": not_match_blades}
+
+    return not_match_dict
+
+
+def component_settings_diff(guideA, guideB, componentA, componentB=None):
+    """Return list of not matching types components and the types found
+
+    Usually componentA list and componentB list is the same list. But keeping
+    this separated we can check an arbitrary list with not matching names.
+    In this case the componentB list should match the order and number of
+    componentA types
+
+    Args:
+        guideA (dict): Guide dictionary template
+        guideB (dict): Guide dictionary template
+        componentA (str or str list): Names of the components to check
+        componentB (None, optional): If None will use the component A list in
+            both guides
+
+    Returns:
+        dict: Not matching components settings
+    """
+    componentA, componentB = to_list_AB(componentA, componentB)
+    not_match = {}
+    for ca, cb in zip(componentA, componentB):
+        pvA = guideA["components_dict"][ca]['param_values']
+        pvB = guideB["components_dict"][cb]['param_values']
+        cp_not_match = param_diff(pvA, pvB)
+        if cp_not_match:
+            not_match[ca] = cp_not_match
+
+    return not_match
+
+
+# Guide difference Report
+def guide_diff(guide,
+               master_guide,
+               check_missing_guide_component_diff=True,
+               check_extra_guide_component_diff=False,
+               check_guide_transform_diff=True,
+               check_guide_root_settings_diff=True,
+               check_component_settings_diff=True,
+               check_guide_custom_step_diff=True,
+               tolerance=TOLERANCE,
+               cache=None):
+    """Compare a guide agaisnt a master guide. This check will return false,
+    if the guide match the elments found in master_guide.
+
+    Args:
+        guide (dict): Guide dictionary template
+        master_guide (dict): Guide dictionary template
+        check_missing_guide_component_diff (bool, optional):
+            If true, will check missing components diff
+        check_extra_guide_component_diff (bool, optional):
+            If true, will check extra components diff
+        check_guide_transform_diff (bool, optional):
+            If true, will check the transform differences
+        check_guide_root_settings_diff (bool, optional):
+            If true, will check the root parameter settings differences
+        check_component_settings_diff (bool, optional):
+            If true, will check the component settings differences
+        check_guide_custom_step_diff (bool, optional):
+            If true, will chekc the custom steps differences
+        tolerance (float, optional): Absolute tolerance of the transforms
+        cache (FlatCache, optional): Flattened values cache
+
+
+    Returns:
+        dict: Differences dictionary. None if the test pass
+    """
+    gdiff = {}
+    comp_diff = None
+    if check_missing_guide_component_diff or check_extra_guide_component_diff:
+        comp_diff = guide_component_diff(guide, master_guide)
+    if check_missing_guide_component_diff:
+        if comp_diff and comp_diff["miss"]:
+            gdiff["components_miss"] = comp_diff["miss"]
+
+    if check_extra_guide_component_diff:
+        if comp_diff and comp_diff["extra"]:
+            gdiff["components_extra"] = comp_diff["extra"]
+
+    if check_guide_transform_diff:
+        not_match_tra, root_tra = guide_transform_diff(guide,
+                                                       master_guide,
+                                                       tolerance=tolerance,
+                                                       cache=cache)
+        if not_match_tra:
+            gdiff["component_transform_diff"] = not_match_tra
+        if not root_tra:
+            gdiff["root_transform_not_match"] = root_tra
+
+    if check_guide_root_settings_diff:
+        root_sett_diff = guide_root_settings_diff(guide, master_guide)
+        if root_sett_diff:
+            if (root_sett_diff["not_found_param"]
+                    or root_sett_diff["not_match_param"]):
+                gdiff["root_settings_diff"] = root_sett_diff
+
+    if check_component_settings_diff:
+        comp_sett_diff = guide_component_settings_diff(guide,
+                                                       master_guide,
+                                                       comp_diff)
+        if comp_sett_diff and comp_sett_diff[0]:
+            gdiff["component_settings_diff"] = comp_sett_diff[0]
+
+    if check_guide_custom_step_diff:
+        pre_diff = pre_custom_step_diff(guide, master_guide)
+        if (pre_diff["miss"]
+                or pre_diff["path"]
+                or pre_diff["status"]
+                or not pre_diff["order"]):
+            gdiff["pre_diff"] = pre_diff
+
+        post_diff = post_custom_step_diff(guide, master_guide)
+        if (post_diff["miss"]
+                or post_diff["path"]
+                or post_diff["status"]
+                or not post_diff["order"]):
+            gdiff["post_diff"] = post_diff
+
+    if gdiff:
+        return gdiff
+
+
+def guide_diff_masters(guide, masters, tolerance=TOLERANCE, **kwargs):
+    """Compare a guide against several master guides in one pass.
+
+    Args:
+        guide (dict): Guide dictionary template
+        masters (dict or list): Master guide templates by name, or list of
+            master guide templates. The names are the list indexes
+        tolerance (float, optional): Absolute tolerance of the transforms
+        **kwargs: The guide_diff check options
+
+    Returns:
+        OrderedDict: The guide_diff report of each master by name, None if
+            the guide match the master
+    """
+    if not isinstance(masters, dict):
+        masters = OrderedDict(enumerate(masters))
+    cache = FlatCache()
+    reports = OrderedDict()
+    for name, master in masters.items():
+        reports[name] = guide_diff(guide,
+                                   master,
+                                   tolerance=tolerance,
+                                   cache=cache,
+                                   **kwargs)
+    return reports
+
+
+def load_template(filePath):
+    """Load a .sgt or a compact .sgtb guide template file.
+
+    Args:
+        filePath (str): Path to the template
+
+    Returns:
+        dict: The guide template dictionary
+    """
+    if guide_template_binary.is_compact_file(filePath):
+        return guide_template_binary.load(filePath)
+    with open(filePath, "r") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare a Shifter guide template with master templates")
+    parser.add_argument("guide", help="Guide template file")
+    parser.add_argument("masters", nargs="+", help="Master template files")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Transforms absolute tolerance")
+    parser.add_argument("--extra", action="store_true",
+                        help="Report the extra components of the guide")
+    parser.add_argument("--json", dest="json_path",
+                        help="Save the reports to a json file")
+    args = parser.parse_args(argv)
+
+    guide = load_template(args.guide)
+    masters = OrderedDict()
+    for path in args.masters:
+        masters[path] = load_template(path)
+
+    reports = guide_diff_masters(
+        guide,
+        masters,
+        tolerance=args.tolerance,
+        check_extra_guide_component_diff=args.extra)
+
+    different = 0
+    for path, report in reports.items():
+        if report:
+            different += 1
+        print("{} : {}".format(path, "DIFFERENT" if report else "MATCH"))
+        for key in sorted(report or []):
+            print("    {}".format(key))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            f.write(json.dumps(reports, indent=4))
+
+    return 1 if different else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
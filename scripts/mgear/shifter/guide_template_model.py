@@ -0,0 +1,627 @@
+"""Pure python guide template model and validation.
+
+Load and validate Shifter guide templates (.sgt) without Maya or PyMEL.
+The templates are validated against the component parameter schemas, which
+are exported once from Maya with export_component_schemas().
+
+This module only uses the python standard library, so it can be run as a
+script on machines without Maya:
+
+    python guide_template_model.py --schemas schemas.json --jobs 8 *.sgt
+
+Example:
+    # in Maya
+    from mgear.shifter import guide_template_model
+    guide_template_model.export_component_schemas("/path/schemas.json")
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import re
+import sys
+from collections import OrderedDict
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+SCHEMA_VERSION = 1
+
+SEV_ERROR = "error"
+SEV_WARNING = "warning"
+
+TEMPLATE_KEYS = ["components_dict", "components_list", "guide_root"]
+
+INT_TYPES = ["long", "short", "byte", "enum"]
+FLOAT_TYPES = ["double", "float", "doubleLinear", "doubleAngle"]
+
+
+##########################################################
+# SCHEMAS
+##########################################################
+
+def _get_param_schema(guide):
+    """Get the parameters schema of a guide object.
+
+    Args:
+        guide (guide.Main): Rig guide or component guide instance
+
+    Returns:
+        dict: Parameter definitions by script name
+    """
+    params = {}
+    for name in guide.paramNames:
+        paramDef = guide.paramDefs[name]
+        params[name] = {"valueType": paramDef.valueType,
+                        "value": paramDef.value,
+                        "minimum": getattr(paramDef, "minimum", None),
+                        "maximum": getattr(paramDef, "maximum", None),
+                        "enum": getattr(paramDef, "enum", None)}
+    return params
+
+
+def get_component_schemas():
+    """Get the schemas of the guide root and all the available components.
+
+    Note:
+        This function needs Maya. The rest of the module doesn't.
+
+    Returns:
+        dict: The schemas
+    """
+    from mgear import shifter
+
+    schemas = {"version": SCHEMA_VERSION,
+               "guide_root": {"params": _get_param_schema(
+                   shifter.guide.Rig())},
+               "components": {}}
+
+    for comps in shifter.getComponentDirectories().values():
+        for comp_type in comps:
+            try:
+                comp_guide = shifter.component_registry.get_guide_class(
+                    comp_type)()
+            except (ImportError, AttributeError):
+                continue
+
+            schemas["components"][comp_type] = {
+                "params": _get_param_schema(comp_guide),
+                "save_transform": list(comp_guide.save_transform),
+                "save_blade": list(comp_guide.save_blade),
+                "minmax": dict((k, [v.min, v.max]) for k, v
+                               in comp_guide.minmax.items()),
+                "minmax_blade": dict((k, [v.min, v.max]) for k, v
+                                     in comp_guide.minmax_blade.items())}
+
+    return schemas
+
+
+def export_component_schemas(filePath):
+    """Export the component schemas to a json file. Needs Maya.
+
+    Args:
+        filePath (str): Path of the schemas file
+    """
+    with open(filePath, "w") as f:
+        f.write(json.dumps(get_component_schemas(), indent=4,
+                           sort_keys=True))
+
+
+def load_schemas(filePath):
+    """Load a component schemas file.
+
+    Args:
+        filePath (str): Path of the schemas file
+
+    Returns:
+        dict: The schemas
+    """
+    with open(filePath, "r") as f:
+        return json.load(f)
+
+
+##########################################################
+# MODEL
+##########################################################
+
+class ComponentModel(object):
+    """Guide component data of a template.
+
+    Attributes:
+        fullName (str): Component full name (ie. 'arm_L0')
+        type (str): Component type
+        param_values (dict): Parameter values
+        tra (dict): World matrices as 4x4 nested lists, by local name
+        pos (dict): World positions, by local name
+        blade (dict): Blade matrices, by local name
+        parent_fullName (str): Parent component full name or None
+        parent_localName (str): Parent object local name or None
+        child_components (list): Direct children full names
+    """
+
+    def __init__(self, fullName, data):
+        self.fullName = fullName
+        self.data = data
+        self.param_values = data.get("param_values", {})
+        self.type = self.param_values.get("comp_type")
+        self.tra = data.get("tra", {})
+        self.atra = data.get("atra", [])
+        self.pos = data.get("pos", {})
+        self.apos = data.get("apos", [])
+        self.blade = data.get("blade", {})
+        self.parent_fullName = data.get("parent_fullName")
+        self.parent_localName = data.get("parent_localName")
+        self.child_components = data.get("child_components", [])
+
+    def getFullName(self):
+        """Get the full name from the parameter values
+
+        Returns:
+            str: full name or None if the name parameters are missing
+        """
+        try:
+            return "{}_{}{}".format(self.param_values["comp_name"],
+                                    self.param_values["comp_side"],
+                                    self.param_values["comp_index"])
+        except KeyError:
+            return None
+
+
+class TemplateModel(object):
+    """Guide template data.
+
+    Attributes:
+        data (dict): The template dictionary
+        name (str): Guide root name
+        param_values (dict): Guide root parameter values
+        components (OrderedDict): ComponentModel by full name, in the
+            components list order
+        ctl_buffers (dict): Control buffers curve data or None
+        meta (dict): Template metadata or None
+    """
+
+    def __init__(self, data):
+        self.data = data
+        guide_root = data.get("guide_root") or {}
+        self.name = guide_root.get("name")
+        self.param_values = guide_root.get("param_values", {})
+        self.tra = guide_root.get("tra")
+        self.ctl_buffers = data.get("ctl_buffers_dict")
+        self.meta = data.get("meta")
+
+        self.components = OrderedDict()
+        comps_dict = data.get("components_dict") or {}
+        for name in data.get("components_list") or []:
+            if name in comps_dict:
+                self.components[name] = ComponentModel(name, comps_dict[name])
+
+    @classmethod
+    def from_file(cls, filePath):
+        """Load a template file.
+
+        Args:
+            filePath (str): Path to the .sgt file
+
+        Returns:
+            TemplateModel: the template
+        """
+        with open(filePath, "r") as f:
+            return cls(json.load(f))
+
+    def component_types(self):
+        """Get the component types used in the template
+
+        Returns:
+            set: component types
+        """
+        return set(c.type for c in self.components.values())
+
+    def children(self, fullName):
+        """Get the full names of the components parented to a component.
+
+        Args:
+            fullName (str): Component full name
+
+        Returns:
+            list of str: children full names
+        """
+        return [n for n, c in self.components.items()
+                if c.parent_fullName == fullName]
+
+    def validate(self, schemas=None):
+        """Validate the template.
+
+        Args:
+            schemas (dict, optional): Component schemas. If None, only the
+                structure of the template is validated
+
+        Returns:
+            ValidationReport: the report
+        """
+        return validate_template(self, schemas)
+
+
+##########################################################
+# VALIDATION
+##########################################################
+
+class ValidationReport(object):
+    """Validation issues of a template.
+
+    Attributes:
+        source (str): File path or name of the validated template
+        issues (list): (severity, component, message) tuples
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.issues = []
+
+    def add(self, severity, component, message):
+        self.issues.append((severity, component, message))
+
+    def error(self, component, message):
+        self.add(SEV_ERROR, component, message)
+
+    def warning(self, component, message):
+        self.add(SEV_WARNING, component, message)
+
+    @property
+    def errors(self):
+        return [i for i in self.issues if i[0] == SEV_ERROR]
+
+    @property
+    def warnings(self):
+        return [i for i in self.issues if i[0] == SEV_WARNING]
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def as_dict(self):
+        return {"source": self.source,
+                "valid": self.valid,
+                "issues": [{"severity": s, "component": c, "message": m}
+                           for s, c, m in self.issues]}
+
+    def __str__(self):
+        lines = ["{} : {}".format(self.source,
+                                  "OK" if self.valid else "INVALID")]
+        for severity, component, message in self.issues:
+            lines.append("    [{}] {}: {}".format(
+                severity, component or "guide", message))
+        return "\n".join(lines)
+
+
+def _is_number(value):
+    return (isinstance(value, (int, float))
+            and not isinstance(value, bool))
+
+
+def _is_matrix(value):
+    return (isinstance(value, list) and len(value) == 4
+            and all(isinstance(r, list) and len(r) == 4
+                    and all(_is_number(v) for v in r) for r in value))
+
+
+def _is_vector(value):
+    return (isinstance(value, list) and len(value) == 3
+            and all(_is_number(v) for v in value))
+
+
+def validate_params(values, params, component, report):
+    """Validate parameter values against the parameters schema.
+
+    Args:
+        values (dict): Parameter values
+        params (dict): Parameter schemas by script name
+        component (str): Component full name, for the report
+        report (ValidationReport): report to fill
+    """
+    for name, param in params.items():
+        if name not in values:
+            report.warning(component,
+                           "Missing parameter '{}', the default value "
+                           "will be used".format(name))
+            continue
+
+        value = values[name]
+        valueType = param.get("valueType")
+        if value is None:
+            continue
+        if valueType == "bool":
+            valid = isinstance(value, (bool, int))
+        elif valueType in INT_TYPES:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif valueType in FLOAT_TYPES:
+            valid = _is_number(value)
+        elif valueType == "string":
+            valid = isinstance(value, string_types)
+        else:
+            continue
+        if not valid:
+            report.error(component,
+                         "Parameter '{}' should be {}, got {!r}".format(
+                             name, valueType, value))
+            continue
+
+        if _is_number(value):
+            minimum = param.get("minimum")
+            maximum = param.get("maximum")
+            if minimum is not None and value < minimum:
+                report.error(component,
+                             "Parameter '{}' value {} is lower than the "
+                             "minimum {}".format(name, value, minimum))
+            if maximum is not None and value > maximum:
+                report.error(component,
+                             "Parameter '{}' value {} is greater than the "
+                             "maximum {}".format(name, value, maximum))
+            enum = param.get("enum")
+            if enum and valueType == "enum" and not 0 <= value < len(enum):
+                report.error(component,
+                             "Parameter '{}' value {} is not a valid enum "
+                             "index".format(name, value))
+
+    for name in values:
+        if name not in params:
+            report.warning(component,
+                           "Unknown parameter '{}'".format(name))
+
+
+def _validate_objects(names, minmax, data, component, kind, report):
+    for name in names:
+        if "#" not in name:
+            if name not in data:
+                report.error(component,
+                             "Missing {} : {}".format(kind, name))
+            continue
+
+        pattern = re.compile(
+            "^{}$".format(re.escape(name).replace(r"\#", "#").replace(
+                "#", "[0-9]+")))
+        count = len([k for k in data if pattern.match(k)])
+        minimum, maximum = minmax.get(name, [1, -1])
+        if count < minimum:
+            report.error(component,
+                         "Minimum of {} {} for {} hasn't been "
+                         "reached".format(minimum, kind, name))
+        if maximum > 0 and count > maximum:
+            report.error(component,
+                         "Maximum of {} {} for {} has been "
+                         "exceeded".format(maximum, kind, name))
+
+
+def validate_component(comp, template, schema, report):
+    """Validate a component of a template.
+
+    Args:
+        comp (ComponentModel): The component
+        template (TemplateModel): The template
+        schema (dict): The component type schema or None
+        report (ValidationReport): report to fill
+    """
+    name = comp.fullName
+    for key in ["comp_type", "comp_name", "comp_side", "comp_index"]:
+        if key not in comp.param_values:
+            report.error(name, "Missing parameter '{}'".format(key))
+    fullName = comp.getFullName()
+    if fullName and fullName != name:
+        report.error(name, "Name parameters don't match the component "
+                           "name: {}".format(fullName))
+
+    if comp.parent_fullName and comp.parent_fullName not in \
+            template.components:
+        report.error(name, "Parent component doesn't exist: {}".format(
+            comp.parent_fullName))
+    for child in comp.child_components:
+        child_comp = template.components.get(child)
+        if child_comp is None:
+            report.error(name, "Child component doesn't exist: {}".format(
+                child))
+        elif child_comp.parent_fullName != name:
+            report.error(name, "Child component {} is parented to {}".format(
+                child, child_comp.parent_fullName))
+
+    for k, v in comp.tra.items():
+        if not _is_matrix(v):
+            report.error(name, "Invalid transform matrix: {}".format(k))
+    for k, v in comp.blade.items():
+        if not _is_matrix(v):
+            report.error(name, "Invalid blade matrix: {}".format(k))
+    for k, v in comp.pos.items():
+        if not _is_vector(v):
+            report.error(name, "Invalid position: {}".format(k))
+    if len(comp.atra) != len(comp.tra):
+        report.error(name, "atra and tra lengths don't match")
+    if len(comp.apos) != len(comp.pos):
+        report.error(name, "apos and pos lengths don't match")
+
+    if schema is None:
+        return
+    validate_params(comp.param_values, schema.get("params", {}), name, report)
+    _validate_objects(schema.get("save_transform", []),
+                      schema.get("minmax", {}),
+                      comp.tra,
+                      name,
+                      "transform",
+                      report)
+    _validate_objects(schema.get("save_blade", []),
+                      schema.get("minmax_blade", {}),
+                      comp.blade,
+                      name,
+                      "blade",
+                      report)
+
+
+def validate_ctl_buffers(template, report):
+    """Validate the control buffers curve data.
+
+    Args:
+        template (TemplateModel): The template
+        report (ValidationReport): report to fill
+    """
+    buffers = template.ctl_buffers
+    if not buffers:
+        return
+    for crv in buffers.get("curves_names", []):
+        data = buffers.get(crv)
+        if not data:
+            report.error(None, "Missing control buffer data: {}".format(crv))
+            continue
+        for shape, shape_data in (data.get("shapes") or {}).items():
+            points = shape_data.get("points")
+            if not points or not all(_is_vector(p) for p in points):
+                report.error(None, "Invalid points in control buffer "
+                                   "shape: {}".format(shape))
+
+
+def validate_template(template, schemas=None, source=None):
+    """Validate a guide template.
+
+    Args:
+        template (TemplateModel or dict): The template
+        schemas (dict, optional): Component schemas. If None, only the
+            structure of the template is validated
+        source (str, optional): Source name for the report
+
+    Returns:
+        ValidationReport: the report
+    """
+    report = ValidationReport(source)
+
+    if isinstance(template, dict):
+        missing = [k for k in TEMPLATE_KEYS if k not in template]
+        if missing:
+            report.error(None, "Missing template keys: {}".format(
+                ", ".join(missing)))
+            return report
+        template = TemplateModel(template)
+
+    comps_dict = template.data["components_dict"] or {}
+    comps_list = template.data["components_list"] or []
+    for name in comps_list:
+        if name not in comps_dict:
+            report.error(None, "Component in list without data: {}".format(
+                name))
+    listed = set(comps_list)
+    for name in comps_dict:
+        if name not in listed:
+            report.error(None, "Component data not in list: {}".format(name))
+
+    component_schemas = {}
+    if schemas:
+        validate_params(template.param_values,
+                        schemas.get("guide_root", {}).get("params", {}),
+                        None,
+                        report)
+        component_schemas = schemas.get("components", {})
+
+    for comp in template.components.values():
+        schema = None
+        if schemas:
+            schema = component_schemas.get(comp.type)
+            if schema is None:
+                report.error(comp.fullName,
+                             "Unknown component type: {}".format(comp.type))
+        validate_component(comp, template, schema, report)
+
+    validate_ctl_buffers(template, report)
+
+    return report
+
+
+def validate_file(filePath, schemas=None):
+    """Validate a guide template file.
+
+    Args:
+        filePath (str): Path to the .sgt file
+        schemas (dict, optional): Component schemas
+
+    Returns:
+        ValidationReport: the report
+    """
+    try:
+        with open(filePath, "r") as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        report = ValidationReport(filePath)
+        report.error(None, "Can't read the template: {}".format(e))
+        return report
+    return validate_template(data, schemas, filePath)
+
+
+def _validate_file_job(args):
+    return validate_file(*args).as_dict()
+
+
+def validate_files(filePaths, schemas=None, processes=None):
+    """Validate several guide template files, using a process pool.
+
+    Args:
+        filePaths (list of str): Paths to the .sgt files
+        schemas (dict, optional): Component schemas
+        processes (int, optional): Number of processes. If None, use all
+            the CPU cores. If 1, validate in the current process
+
+    Returns:
+        list of dict: The reports as dictionaries, in the files order
+    """
+    jobs = [(p, schemas) for p in filePaths]
+    if processes == 1 or len(jobs) < 2:
+        return [_validate_file_job(j) for j in jobs]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_validate_file_job, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate Shifter guide templates without Maya")
+    parser.add_argument("templates", nargs="+",
+                        help="Template files or glob patterns")
+    parser.add_argument("--schemas", help="Component schemas json file")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Number of processes. Default all the cores")
+    parser.add_argument("--json", dest="json_path",
+                        help="Save the reports to a json file")
+    args = parser.parse_args(argv)
+
+    filePaths = []
+    for pattern in args.templates:
+        filePaths.extend(sorted(glob.glob(pattern)) or [pattern])
+    schemas = load_schemas(args.schemas) if args.schemas else None
+
+    reports = validate_files(filePaths, schemas, args.jobs)
+
+    invalid = 0
+    for report in reports:
+        if not report["valid"]:
+            invalid += 1
+        print("{} : {}".format(report["source"],
+                               "OK" if report["valid"] else "INVALID"))
+        for issue in report["issues"]:
+            print("    [{}] {}: {}".format(issue["severity"],
+                                           issue["component"] or "guide",
+                                           issue["message"]))
+    print("{} templates, {} invalid".format(len(reports), invalid))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            f.write(json.dumps(reports, indent=4))
+
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    # python 2 multiprocessing imports tempfile, and so io, when the pool
+    # starts. Run as a script, sys.path[0] is this folder and the shifter io
+    # module would be imported instead of the standard library one
+    del sys.path[0]
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Lazy reader for Shifter guide templates (.sgt).
+
+The template text is scanned once to index the offsets of the top level
+members, the components and the control buffers. A value is only decoded
+the first time it is requested, so reading a few components of a big
+template doesn't pay for decoding the whole file.
+
+This module only uses the python standard library.
+
+Example:
+    from mgear.shifter import guide_template_reader
+    conf = guide_template_reader.LazyTemplate(filePath)
+    arm = conf["components_dict"]["arm_L0"]
+    sub_conf = conf.partial_conf(["arm_L0"])
+"""
+import json
+import re
+from collections import OrderedDict
+
+_WS = re.compile(r"\s*")
+_SPACES = re.compile(r" *")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_SCALAR = re.compile(r"[^,\]}\s]+")
+# flat numeric array and array of flat numeric arrays (ie. matrix).
+# Most of the template data is one of these, so we skip them in one match.
+_NUM_ARRAY = re.compile(r"\[[-+0-9.eE,\s]*\]")
+_NUM_ARRAY2 = re.compile(
+    r"\[\s*(?:\[[-+0-9.eE,\s]*\]\s*(?:,\s*)?)*\]")
+_INDENT_PATTERNS = {}
+
+
+def _skip_ws(text, pos):
+    return _WS.match(text, pos).end()
+
+
+def _syntax_error(text, pos):
+    return ValueError("Invalid guide template at char {}: {!r}".format(
+        pos, text[pos:pos + 20]))
+
+
+def skip_value(text, pos):
+    """Get the end of the JSON value starting at pos, without decoding it.
+
+    Args:
+        text (str): JSON text
+        pos (int): Start of the value
+
+    Returns:
+        int: End of the value
+    """
+    char = text[pos:pos + 1]
+    if char == '"':
+        match = _STRING.match(text, pos)
+    elif char == "[":
+        match = _NUM_ARRAY.match(text, pos) or _NUM_ARRAY2.match(text, pos)
+        if not match:
+            return _skip_array(text, pos)
+    elif char == "{":
+        return _skip_object(text, pos)
+    else:
+        match = _SCALAR.match(text, pos)
+    if not match:
+        raise _syntax_error(text, pos)
+    return match.end()
+
+
+def _skip_array(text, pos):
+    pos = _skip_ws(text, pos + 1)
+    if text[pos:pos + 1] == "]":
+        return pos + 1
+    while True:
+        pos = _skip_ws(text, skip_value(text, pos))
+        char = text[pos:pos + 1]
+        if char == "]":
+            return pos + 1
+        if char != ",":
+            raise _syntax_error(text, pos)
+        pos = _skip_ws(text, pos + 1)
+
+
+def _skip_object(text, pos):
+    end = pos + 1
+    for key, start, end in iter_members(text, pos):
+        pass
+    return _skip_ws(text, end) + 1
+
+
+def iter_members(text, pos):
+    """Iterate the members of the JSON object starting at pos.
+
+    Args:
+        text (str): JSON text
+        pos (int): Start of the object, must be a "{"
+
+    Yields:
+        tuple: key, value start and value end
+    """
+    if text[pos:pos + 1] != "{":
+        raise _syntax_error(text, pos)
+    members = _iter_members_indented(text, pos)
+    if members is not None:
+        for member in members:
+            yield member
+        return
+    pos = _skip_ws(text, pos + 1)
+    if text[pos:pos + 1] == "}":
+        return
+    while True:
+        match = _STRING.match(text, pos)
+        if not match:
+            raise _syntax_error(text, pos)
+        key = json.loads(match.group())
+        pos = _skip_ws(text, match.end())
+        if text[pos:pos + 1] != ":":
+            raise _syntax_error(text, pos)
+        start = _skip_ws(text, pos + 1)
+        end = skip_value(text, start)
+        yield key, start, end
+        pos = _skip_ws(text, end)
+        char = text[pos:pos + 1]
+        if char == "}":
+            return
+        if char != ",":
+            raise _syntax_error(text, pos)
+        pos = _skip_ws(text, pos + 1)
+
+
+def _iter_members_indented(text, pos):
+    """Fast path of iter_members for indented JSON (ie. json.dumps with
+    indent, as the exported templates).
+
+    The members of the object are found from the indentation of the lines,
+    so the values are not scanned at all. JSON strings can't contain new
+    lines, so a new line followed by the member indentation and a quote is
+    always a member key.
+
+    Args:
+        text (str): JSON text
+        pos (int): Start of the object, must be a "{"
+
+    Returns:
+        list or None: (key, value start, value end) tuples or None if the
+            object is not indented
+    """
+    if text[pos + 1:pos + 2] != "\n":
+        return None
+    indent = _SPACES.match(text, pos + 2).end() - pos - 2
+    if not indent or text[pos + 2 + indent:pos + 3 + indent] != '"':
+        return None
+
+    if indent not in _INDENT_PATTERNS:
+        _INDENT_PATTERNS[indent] = (
+            re.compile(r'\n {%d}"' % indent),
+            re.compile(r"\n {0,%d}\}" % (indent - 1)))
+    memberPattern, closePattern = _INDENT_PATTERNS[indent]
+
+    close = closePattern.search(text, pos)
+    if not close:
+        return None
+    starts = [m.start() for m in memberPattern.finditer(
+        text, pos, close.start())]
+    starts.append(close.start())
+
+    members = []
+    for i, keyStart in enumerate(starts[:-1]):
+        match = _STRING.match(text, keyStart + 1 + indent)
+        colon = _skip_ws(text, match.end())
+        if text[colon:colon + 1] != ":":
+            return None
+        start = _skip_ws(text, colon + 1)
+        value = text[start:starts[i + 1]].rstrip().rstrip(",").rstrip()
+        members.append((json.loads(match.group()),
+                        start,
+                        start + len(value)))
+    return members
+
+
+class LazyObject(object):
+    """Read only dictionary of a JSON object, decoding the values on demand.
+
+    Attributes:
+        text (str): JSON text
+        offsets (OrderedDict): (start, end) of the values by key
+    """
+
+    def __init__(self, text, pos, lazy_keys=None):
+        self.text = text
+        self.offsets = OrderedDict()
+        for key, start, end in iter_members(text, pos):
+            self.offsets[key] = (start, end)
+        self.lazy_keys = lazy_keys or []
+        self.cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+        start, end = self.offsets[key]
+        if key in self.lazy_keys and self.text[start] == "{":
+            value = LazyObject(self.text, start)
+        else:
+            value = json.loads(self.text[start:end])
+        self.cache[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key in self.offsets:
+            return self[key]
+        return default
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def keys(self):
+        return list(self.offsets.keys())
+
+    def values(self):
+        return [self[k] for k in self.offsets]
+
+    def items(self):
+        return [(k, self[k]) for k in self.offsets]
+
+    def raw(self, key):
+        """Get the JSON text of a value, without decoding it.
+
+        Args:
+            key (str): The key
+
+        Returns:
+            str: The JSON text
+        """
+        start, end = self.offsets[key]
+        return self.text[start:end]
+
+    def to_dict(self):
+        """Decode all the values.
+
+        Returns:
+            dict: The decoded object
+        """
+        data = {}
+        for key in self.offsets:
+            value = self[key]
+            if isinstance(value, LazyObject):
+                value = value.to_dict()
+            data[key] = value
+        return data
+
+
+class LazyTemplate(LazyObject):
+    """Guide template decoded on demand.
+
+    It can be used as the guide template dictionary. The components and the
+    control buffers are only decoded when they are requested.
+
+    Args:
+        filePath (str, optional): Path to the template file
+        text (str, optional): The template JSON text. Used if no filePath
+    """
+
+    def __init__(self, filePath=None, text=None):
+        if filePath:
+            with open(filePath, "r") as f:
+                text = f.read()
+        self.filePath = filePath
+        super(LazyTemplate, self).__init__(
+            text,
+            _skip_ws(text, 0),
+            lazy_keys=["components_dict", "ctl_buffers_dict"])
+
+    def get_descendants(self, names):
+        """Get the components and all their children recursively.
+
+        Args:
+            names (list of str): Component full names
+
+        Returns:
+            set: The component full names
+        """
+        comps = self["components_dict"]
+        result = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in result or name not in comps:
+                continue
+            result.add(name)
+            stack.extend(comps[name]["child_components"])
+        return result
+
+    def partial_conf(self, partial):
+        """Get a template dictionary with only the components of a partial
+        import: the partial components, their children recursively and
+        their control buffers.
+
+        The parent of the partial components is set to None, since the
+        parent is not part of the partial template.
+
+        Args:
+            partial (str or list of str): Partial starting components
+
+        Returns:
+            dict: The partial template dictionary
+        """
+        if not isinstance(partial, list):
+            partial = [partial]
+        comps = self["components_dict"]
+        names = self.get_descendants(partial)
+        components_list = [n for n in self["components_list"] if n in names]
+
+        components_dict = {}
+        for name in components_list:
+            c_dict = dict(comps[name])
+            if c_dict["parent_fullName"] not in names:
+                c_dict["parent_fullName"] = None
+                c_dict["parent_localName"] = None
+            components_dict[name] = c_dict
+
+        conf = {}
+        for key in self:
+            if key not in ["components_dict", "components_list",
+                           "ctl_buffers_dict"]:
+                conf[key] = self[key]
+        conf["components_dict"] = components_dict
+        conf["components_list"] = components_list
+
+        buffers = self.get("ctl_buffers_dict")
+        if buffers:
+            prefix = tuple(c + "_" for c in components_list)
+            curves_names = [c for c in buffers["curves_names"]
+                            if c.startswith(prefix)]
+            ctl_buffers = dict((c, buffers[c]) for c in curves_names)
+            ctl_buffers["curves_names"] = curves_names
+            conf["ctl_buffers_dict"] = ctl_buffers
+        else:
+            conf["ctl_buffers_dict"] = None
+
+        return conf
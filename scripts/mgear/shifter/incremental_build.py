@@ -0,0 +1,196 @@
+"""Shifter incremental build.
+
+The guide data of each component (parameters, transforms, blades, parent
+and control buffers) is hashed and stored on the rig model. On the next
+incremental build of the same rig, only the components with a different
+hash are rebuilt, with the components that depend on them:
+
+    - The children components, they are connected to the parent objects.
+    - The components using it as UI host.
+    - The components using it in a space switch reference array.
+
+The rest of the rig is kept. The rig objects of the previous build are
+needed to reconnect the rebuilt components, so the incremental build is
+only available for rigs built in the current session, and the whole guide
+must be built (the guide model selected).
+"""
+import hashlib
+import json
+
+import maya.cmds as cmds
+
+SHIFTER_INCREMENTAL_ENV_KEY = "MGEAR_SHIFTER_INCREMENTAL"
+HASH_ATTR = "guide_hashes"
+RIG_KEY = "__rig__"
+
+# Rig attributes carried over from a build to the next incremental build
+RIG_STATE = ("model",
+             "hierarchyGroups",
+             "components",
+             "componentsIndex",
+             "components_infos",
+             "controllerTags",
+             "jnt_org",
+             "global_ctl",
+             "setupWS",
+             "jntVis_att")
+
+# State of the rigs built in incremental mode in this session by rig name
+_rigs = {}
+
+
+def _hash(data):
+    return hashlib.md5(
+        json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def component_buffers(conf):
+    """Get the control buffers of each component.
+
+    The buffers are assigned to the component with the longest full name
+    matching the start of the buffer name. The buffers without component are
+    returned with the RIG_KEY key.
+
+    Args:
+        conf (dict): The guide template dictionary
+
+    Returns:
+        dict: Control buffers names by component full name
+    """
+    buffers = {}
+    ctl_buffers = conf.get("ctl_buffers_dict")
+    if not ctl_buffers:
+        return buffers
+    prefixes = sorted(conf["components_list"], key=len, reverse=True)
+    for curveName in ctl_buffers["curves_names"]:
+        owner = RIG_KEY
+        for comp in prefixes:
+            if curveName.startswith(comp + "_"):
+                owner = comp
+                break
+        buffers.setdefault(owner, []).append(curveName)
+    return buffers
+
+
+def component_hashes(conf):
+    """Hash the guide data of each component.
+
+    Args:
+        conf (dict): The guide template dictionary, as returned by
+            guide.Rig.get_guide_template_dict
+
+    Returns:
+        dict: Hash by component full name. The hash of the guide root
+            settings uses the RIG_KEY key
+    """
+    buffers = component_buffers(conf)
+    ctl_buffers = conf.get("ctl_buffers_dict") or {}
+
+    hashes = {}
+    hashes[RIG_KEY] = _hash(
+        [conf["guide_root"]["param_values"],
+         [ctl_buffers[c] for c in buffers.get(RIG_KEY, [])]])
+    for comp in conf["components_list"]:
+        c_dict = conf["components_dict"][comp]
+        hashes[comp] = _hash(
+            [c_dict["param_values"],
+             c_dict["tra"],
+             c_dict["blade"],
+             c_dict["parent_fullName"],
+             c_dict["parent_localName"],
+             [ctl_buffers[c] for c in buffers.get(comp, [])]])
+    return hashes
+
+
+def get_rebuild_list(graph, oldHashes, newHashes):
+    """Get the components to rebuild and to remove.
+
+    Args:
+        graph (DependencyGraph): The dependency graph of the new guide
+        oldHashes (dict): The hashes of the built rig
+        newHashes (dict): The hashes of the new guide
+
+    Returns:
+        tuple or None: The components to rebuild, in build order, and the
+            components to remove. None if the rig needs a full build
+    """
+    if not oldHashes or oldHashes.get(RIG_KEY) != newHashes[RIG_KEY]:
+        return None
+
+    removed = [c for c in oldHashes
+               if c != RIG_KEY and c not in newHashes]
+    changed = [c for c in graph.order
+               if oldHashes.get(c) != newHashes[c]]
+    rebuild = graph.get_dependents(changed + removed)
+    return graph.schedule(rebuild), removed
+
+
+def store_hashes(model, hashes):
+    """Store the guide hashes on the rig model.
+
+    Args:
+        model (dagNode): The rig model
+        hashes (dict): Hash by component full name
+    """
+    name = model.longName()
+    if not cmds.attributeQuery(HASH_ATTR, node=name, exists=True):
+        cmds.addAttr(name, longName=HASH_ATTR, dataType="string")
+    cmds.setAttr("{}.{}".format(name, HASH_ATTR),
+                 json.dumps(hashes, sort_keys=True),
+                 type="string")
+
+
+def read_hashes(model):
+    """Read the guide hashes stored on the rig model.
+
+    Args:
+        model (dagNode): The rig model
+
+    Returns:
+        dict: Hash by component full name. Empty if the rig doesn't have
+            hashes
+    """
+    name = model.longName()
+    if not cmds.attributeQuery(HASH_ATTR, node=name, exists=True):
+        return {}
+    try:
+        return json.loads(
+            cmds.getAttr("{}.{}".format(name, HASH_ATTR)) or "{}")
+    except ValueError:
+        return {}
+
+
+def register_rig(rig):
+    """Keep the state of an incremental build for the next build.
+
+    Only the RIG_STATE attributes are kept, not the rig.
+
+    Args:
+        rig (Rig): The built rig
+    """
+    _rigs[rig.options["rig_name"]] = dict(
+        (key, getattr(rig, key)) for key in RIG_STATE if hasattr(rig, key))
+
+
+def get_registered_rig(rigName):
+    """Get the state of the last incremental build of a rig in this session.
+
+    Args:
+        rigName (str): The rig name
+
+    Returns:
+        dict or None: The RIG_STATE attributes of the built rig or None if
+            not found or already deleted
+    """
+    state = _rigs.get(rigName)
+    if state is None:
+        return None
+    if not state["model"].exists():
+        _rigs.pop(rigName)
+        return None
+    return state
+
+
+def clear_registered_rigs():
+    """Forget the incremental builds of this session."""
+    _rigs.clear()
@@ -4,6 +4,8 @@ import json
 import pymel.core as pm
 from mgear import shifter
 from mgear.core import curve
+from mgear.shifter import guide_template_reader
+from mgear.shifter import guide_template_binary
 
 
 def get_guide_template_dict(guide_node, meta=None):
@@ -60,7 +62,9 @@ def _get_file(write=False):
     filePath = pm.fileDialog2(
         startingDirectory=startDir,
         fileMode=mode,
-        fileFilter='Shifter Guide Template .sgt (*%s)' % ".sgt")
+        fileFilter='Shifter Guide Template .sgt (*%s);;'
+                   'Shifter Compact Guide Template .sgtb (*%s)' % (
+                       ".sgt", guide_template_binary.COMPACT_EXT))
 
     if not filePath:
         return
@@ -73,6 +77,9 @@ def _get_file(write=False):
 def export_guide_template(filePath=None, meta=None, conf=None, *args):
     """Export the guide templata to a file
 
+    If the file extension is .sgtb the template is saved in the compact
+    binary format.
+
     Args:
         filePath (str, optional): Path to save the file
         meta (dict, optional): Arbitraty metadata dictionary. This can
@@ -81,21 +88,27 @@ def export_guide_template(filePath=None, meta=None, conf=None, *args):
     if not conf:
         conf = get_template_from_selection(meta)
     if conf:
-        data_string = json.dumps(conf, indent=4, sort_keys=True)
         if not filePath:
             filePath = _get_file(True)
             if not filePath:
                 return
 
+        if filePath.endswith(guide_template_binary.COMPACT_EXT):
+            guide_template_binary.dump(conf, filePath)
+            return
+
+        data_string = json.dumps(conf, indent=4, sort_keys=True)
         with open(filePath, 'w') as f:
             f.write(data_string)
 
 
-def _import_guide_template(filePath=None):
+def _import_guide_template(filePath=None, lazy=False):
     """Summary
 
     Args:
         filePath (str, optional): Path to the template file to import
+        lazy (bool, optional): If True, returns a LazyTemplate that only
+            decodes the components when they are requested
 
     Returns:
         dict: the parsed guide dictionary
@@ -105,6 +118,10 @@ def _import_guide_template(filePath=None):
     if not filePath:
         pm.displayWarning("File path to template is None")
         return
+    if guide_template_binary.is_compact_file(filePath):
+        return guide_template_binary.load(filePath)
+    if lazy:
+        return guide_template_reader.LazyTemplate(filePath)
     conf = None
     with open(filePath, 'r') as f:
         if f:
@@ -132,8 +149,11 @@ def import_partial_guide(
             create a new initial heirarchy
     """
     if not conf:
-        conf = _import_guide_template(filePath)
+        conf = _import_guide_template(filePath, lazy=bool(partial))
     if conf:
+        if isinstance(conf, guide_template_reader.LazyTemplate):
+            # only the partial components and their children are decoded
+            conf = conf.partial_conf(partial)
         rig = shifter.Rig()
         rig.guide.set_from_dict(conf)
         partial_names, partial_idx = rig.guide.draw_guide(partial, initParent)
@@ -175,24 +195,38 @@ def import_guide_template(filePath=None, conf=None, *args):
     import_partial_guide(filePath, conf=conf)
 
 
-def build_from_file(filePath=None, conf=False, *args):
+def build_from_file(filePath=None, conf=False, components=None, *args):
     """Build a rig from a template file.
     The rig will be build from a previously exported guide template, without
     creating the guide in the scene.
 
     Args:
         filePath (None, optional): Guide template file path
+        components (list of str, optional): Partial build. Only these
+            components are built, with stubs for the parents and references
+            they need.
+
+    Example:
+        # test build of the left arm and the fingers
+        io.build_from_file(path, components=["arm_L0", "finger_L0"])
 
     """
     if not conf:
         conf = _import_guide_template(filePath)
     if conf:
         rig = shifter.Rig()
-        rig.buildFromDict(conf)
+        rig.buildFromDict(conf, components=components)
 
         # controls shapes buffer
-        if conf["ctl_buffers_dict"]:
-            curve.update_curve_from_data(conf["ctl_buffers_dict"],
+        ctl_buffers = conf["ctl_buffers_dict"]
+        if ctl_buffers and components:
+            prefix = tuple(c + "_" for c in components)
+            curves_names = [c for c in ctl_buffers["curves_names"]
+                            if c.startswith(prefix)]
+            ctl_buffers = dict((c, ctl_buffers[c]) for c in curves_names)
+            ctl_buffers["curves_names"] = curves_names
+        if ctl_buffers:
+            curve.update_curve_from_data(ctl_buffers,
                                          rplStr=["_controlBuffer", ""])
         return rig
 
@@ -13,6 +13,8 @@ def install():
         ("Extract Controls", str_extract_controls),
         ("-----", None),
         ("Build from Selection", str_build_from_selection),
+        ("Incremental Build from Selection",
+         str_incremental_build_from_selection),
         ("Build From Guide Template File", str_build_from_file),
         ("-----", None),
         ("Import Guide Template", str_import_guide_template),
@@ -97,6 +99,11 @@ from mgear.shifter import guide_manager
 guide_manager.build_from_selection()
 """
 
+str_incremental_build_from_selection = """
+from mgear.shifter import guide_manager
+guide_manager.incremental_build_from_selection()
+"""
+
 str_build_from_file = """
 from mgear.shifter import io
 io.build_from_file(None)
@@ -1,5 +1,7 @@
 import string
 import re
+import itertools
+
 import pymel.core as pm
 
 # default fields/tokens
@@ -15,6 +17,11 @@ DEFAULT_SIDE_C_NAME = "C"
 DEFAULT_CTL_EXT_NAME = "ctl"
 DEFAULT_JOINT_EXT_NAME = "jnt"
 
+# max number of compiled naming rules kept in the cache
+NAME_RULE_CACHE_SIZE = 64
+_name_rule_cache = {}
+_name_rule_clock = itertools.count()
+
 
 def normalize_name_rule(text):
     """Normalize naming rule templates removing
@@ -64,11 +71,111 @@ def name_rule_validator(rule, valid_tokens, log=True):
         return True
 
 
+class NameRule(object):
+    """Compiled naming rule.
+
+    The rule tokens are parsed and validated only once, so solving a name
+    only needs to collect the values and format the rule.
+
+    Args:
+        rule (str): name rule
+        valid_tokens (list, optional): Valid tokens for the rule
+
+    Attributes:
+        rule (str): name rule
+        fields (list): Fields of the rule, in order
+        invalid_tokens (list): Invalid tokens of the rule
+        solvable (bool): False if the rule has an empty token
+        used (int): Last use of the rule in the cache
+    """
+
+    def __init__(self, rule, valid_tokens=NAMING_RULE_TOKENS):
+        self.rule = rule
+        self.used = 0
+        self.fields = []
+        self.invalid_tokens = []
+        self.solvable = True
+
+        for token in string.Formatter().parse(rule):
+            if token[1] and token[1] in valid_tokens:
+                pass
+            # compare to None to avoid errors with empty token
+            elif token[1] is None and token[0]:
+                pass
+            else:
+                self.invalid_tokens.append(token[1])
+
+            if token[1]:
+                self.fields.append(token[1])
+            elif not token[0]:
+                self.solvable = False
+
+    def __bool__(self):
+        # an empty rule falls back to the legacy naming, like the rule string
+        return bool(self.rule)
+
+    __nonzero__ = __bool__
+
+    @property
+    def valid(self):
+        return not self.invalid_tokens
+
+    def solve(self, values, validate=True):
+        """Solve the name of the object based on the rule
+
+        Args:
+            values (dict): Values to populate the name rule
+            validate (bool, optional): If True will validate the rule
+                before solve it
+
+        Returns:
+            str: The solved name
+        """
+        if validate and self.invalid_tokens:
+            pm.displayWarning(
+                "{} not valid token".format(self.invalid_tokens))
+            pm.displayInfo("Valid tokens are: {}".format(NAMING_RULE_TOKENS))
+            return
+        if not self.solvable:
+            return
+
+        included_val = dict()
+        for field in self.fields:
+            if field in values:
+                included_val[field] = values[field]
+
+        return self.rule.format(**included_val)
+
+
+def get_name_rule(rule):
+    """Get the compiled naming rule.
+
+    The compiled rules are kept in a LRU cache of NAME_RULE_CACHE_SIZE
+    rules, keyed by rule string.
+
+    Args:
+        rule (str): name rule
+
+    Returns:
+        NameRule: The compiled rule
+    """
+    name_rule = _name_rule_cache.get(rule)
+    if name_rule is None:
+        if len(_name_rule_cache) >= NAME_RULE_CACHE_SIZE:
+            # remove the least recently used rule
+            del _name_rule_cache[min(_name_rule_cache,
+                                     key=lambda k: _name_rule_cache[k].used)]
+        name_rule = NameRule(rule)
+        _name_rule_cache[rule] = name_rule
+    name_rule.used = next(_name_rule_clock)
+    return name_rule
+
+
 def name_solve(rule, values, validate=True):
     """Solve the name of the object based on the rule
 
     Args:
-        rule (str): name rule
+        rule (str or NameRule): name rule
         values (dict): Values to populate the name rule
         validate (bool, optional): If True will validate the rule
             before solve it
@@ -76,21 +183,9 @@ def name_solve(rule, values, validate=True):
     Returns:
         str: The solved name
     """
-    included_val = dict()
-    if validate and not name_rule_validator(rule, NAMING_RULE_TOKENS):
-        return
-    for token in string.Formatter().parse(rule):
-        if token[1]:
-            try:
-                included_val[token[1]] = values[token[1]]
-            except KeyError:
-                continue
-        elif token[0]:
-            continue
-        else:
-            return
-
-    return rule.format(**included_val)
+    if not isinstance(rule, NameRule):
+        rule = get_name_rule(rule)
+    return rule.solve(values, validate)
 
 
 def letter_case_solve(name, letter_case=0):
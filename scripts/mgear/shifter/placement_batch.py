@@ -0,0 +1,470 @@
+"""Relative guide placement transfer to many characters.
+
+One placement recording is fitted to the meshes of many characters and a
+guide template is written for each of them, without moving the guide in
+the scene. The meshes are read from files, imported one at a time in a
+temporary namespace, or from the meshes already in the scene.
+
+The guide template of the scene guide is read once. The reposition of the
+guides of each character only needs the recorded matrices and the vertex
+positions of its mesh, and is computed by placement_math.fit_job in the
+current process. A process pool can be used with the processes argument,
+but each process imports mgear.shifter, and so PyMEL and Maya, to unpickle
+the job, which costs more than the fit unless the guides and characters
+are many. In the Maya GUI the pool runs in mayapy.
+
+The fitted guides keep the scale of the scene guide, applied to the world
+matrix axes, unless reset_scale is used. The guide nodes that are not in
+the recording, like the blades and the skipped nodes, keep their local
+matrix and move with their parent, as in the scene.
+
+Example:
+    from mgear.shifter import placement_batch
+    placement_batch.transfer_placement(
+        "Y:/tmp/placement.rgpc",
+        ["Y:/chars/charA.ma", "Y:/chars/charB.ma"],
+        "Y:/tmp/templates")
+"""
+import copy
+import multiprocessing
+import os
+import sys
+
+import maya.cmds as mc
+import pymel.core as pm
+
+from mgear import shifter
+from mgear.core import utils
+from mgear.shifter import io
+from mgear.shifter import placement_file
+from mgear.shifter import placement_math
+from mgear.shifter import placement_mesh
+from mgear.shifter import relative_guide_placement
+
+IMPORT_NAMESPACE = "placementBatch"
+
+
+def _flatten(matrix):
+    """16 floats of a matrix given as 4 rows or 16 floats"""
+    if len(matrix) == 16:
+        return list(matrix)
+    return [v for row in matrix for v in row]
+
+
+def _rows(values):
+    """4 rows of a matrix given as 16 floats"""
+    values = list(values)
+    return [values[0:4], values[4:8], values[8:12], values[12:16]]
+
+
+def get_template_matrices(conf):
+    """Get the world matrices of the guide nodes of a template.
+
+    Args:
+        conf (dict): The guide template
+
+    Returns:
+        dict: Matrix as 16 floats by node name
+    """
+    matrices = {}
+    for c_dict in conf["components_dict"].values():
+        values = c_dict["param_values"]
+        fullName = "{}_{}{}".format(values["comp_name"],
+                                    values["comp_side"],
+                                    values["comp_index"])
+        for key in ("tra", "blade"):
+            for name, matrix in c_dict[key].items():
+                matrices[fullName + "_" + name] = _flatten(matrix)
+    return matrices
+
+
+def get_transform_orders(guide):
+    """Get the transform name of each atra and apos value of the components.
+
+    The atra and apos lists follow the order of the transforms read from
+    the guide hierarchy, which the tra and pos dictionaries of the template
+    don't keep.
+
+    Args:
+        guide (Rig): The guide, set from the hierarchy
+
+    Returns:
+        dict: The names of the atra and apos values by component full name.
+            None for the values that are not a transform
+    """
+    orders = {}
+    for fullName, comp_guide in guide.components.items():
+        store = comp_guide.transforms
+        traNames = dict((row, name) for name, row in store.tra.items())
+        posNames = dict((row, name) for name, row in store.pos.items())
+        orders[fullName] = ([traNames.get(row) for row in store.atra],
+                            [posNames.get(row) for row in store.apos])
+    return orders
+
+
+def update_template(conf, fitted, orders):
+    """Get a copy of a template with new guide world matrices.
+
+    The atra and apos values of the updated transforms are replaced too, by
+    index, so the transforms with the same matrix are updated separately.
+
+    Args:
+        conf (dict): The guide template
+        fitted (dict): Matrix as 16 floats by node name
+        orders (dict): The names of the atra and apos values by component
+            full name, from get_transform_orders
+
+    Returns:
+        dict: The updated template
+    """
+    conf = copy.deepcopy(conf)
+    for c_dict in conf["components_dict"].values():
+        values = c_dict["param_values"]
+        fullName = "{}_{}{}".format(values["comp_name"],
+                                    values["comp_side"],
+                                    values["comp_index"])
+        updated = {}
+        for name in c_dict["tra"]:
+            new = fitted.get(fullName + "_" + name)
+            if new is None:
+                continue
+            updated[name] = new
+            c_dict["tra"][name] = _rows(new)
+            c_dict["pos"][name] = list(new[12:15])
+
+        traNames, posNames = orders.get(fullName, ([], []))
+        for i, name in enumerate(traNames):
+            if name in updated and i < len(c_dict["atra"]):
+                c_dict["atra"][i] = _rows(updated[name])
+        for i, name in enumerate(posNames):
+            if name in updated and i < len(c_dict["apos"]):
+                c_dict["apos"][i] = list(updated[name][12:15])
+
+        for name in c_dict["blade"]:
+            new = fitted.get(fullName + "_" + name)
+            if new is not None:
+                c_dict["blade"][name] = _rows(new)
+    return conf
+
+
+def get_guide_hierarchy(guide_root):
+    """Get the transforms of a guide, parents first.
+
+    Args:
+        guide_root (str): The guide
+
+    Returns:
+        list of tuple: The name, the parent name and the matrix relative to
+            the parent, as 16 floats, of each transform. None parent and
+            the world matrix for the guide root
+    """
+    paths = mc.ls(guide_root, dag=True, long=True, type="transform") or []
+    names = mc.ls(guide_root, dag=True, type="transform") or []
+    byPath = dict(zip(paths, names))
+    world = {}
+    hierarchy = []
+    for path, name in zip(paths, names):
+        parent = byPath.get(path.rsplit("|", 1)[0])
+        world[name] = mc.xform(path, query=True, matrix=True,
+                               worldSpace=True)
+        local = world[name]
+        if parent is not None:
+            local = placement_math.mult_matrix(
+                local, placement_math.inverse_matrix(world[parent]))
+        hierarchy.append((name, parent, local))
+    return hierarchy
+
+
+def propagate_matrices(fitted, hierarchy):
+    """Move the transforms that are not fitted with their parent.
+
+    Args:
+        fitted (dict): Matrix as 16 floats by node name
+        hierarchy (list of tuple): From get_guide_hierarchy
+
+    Returns:
+        dict: The fitted matrices and the matrices of the moved children
+    """
+    result = dict(fitted)
+    for name, parent, local in hierarchy:
+        if name not in fitted and parent in result:
+            result[name] = placement_math.mult_matrix(local, result[parent])
+    return result
+
+
+def read_guide(guide_root):
+    """Read the guide template and the transform orders of a guide.
+
+    Args:
+        guide_root (str): The guide
+
+    Returns:
+        tuple: The guide template and the transform orders. None if the
+            guide is not valid
+    """
+    try:
+        rig = shifter.Rig()
+        rig.guide.setFromHierarchy(pm.PyNode(guide_root))
+        return (rig.guide.get_guide_template_dict(),
+                get_transform_orders(rig.guide))
+    except TypeError:
+        pm.displayWarning("The selected object is not a valid guide element")
+        return None, None
+
+
+def _get_meshes(names, shapes):
+    """Match the recorded meshes to the shapes of a character.
+
+    Args:
+        names (list of str): The recorded mesh names
+        shapes (list of str): The character mesh shapes
+
+    Returns:
+        list of str: The shape of each recorded mesh. None if not found
+    """
+    byName = dict((s.split("|")[-1].split(":")[-1], s) for s in shapes)
+    result = []
+    for name in names:
+        shape = byName.get(name.split("|")[-1].split(":")[-1])
+        if shape is None and len(shapes) == 1:
+            shape = shapes[0]
+        result.append(shape)
+    return result
+
+
+def _read_meshes(meshNames, shapes):
+    """PlacementMesh and fingerprint of the recorded meshes"""
+    shapes = _get_meshes(meshNames, shapes)
+    if None in shapes:
+        return None, None
+    meshes = [placement_mesh.PlacementMesh(s) for s in shapes]
+    fingerprints = dict((n, m.fingerprint())
+                        for n, m in zip(meshNames, meshes))
+    return meshes, fingerprints
+
+
+def get_character_name(source):
+    """Get the name of the guide template of a character.
+
+    Args:
+        source (str): Maya or fbx file of the character, or mesh name in
+            the scene
+
+    Returns:
+        str: The file name, or the mesh name with its namespace
+    """
+    if os.path.isfile(source):
+        return os.path.splitext(os.path.basename(source))[0]
+    return source.split("|")[-1].replace(":", "_")
+
+
+def check_character_names(sources):
+    """Check that the characters don't save their templates to the same file.
+
+    Args:
+        sources (list of str): Maya or fbx files of the characters, or mesh
+            names in the scene
+
+    Raises:
+        ValueError: Characters have the same name
+    """
+    names = {}
+    for source in sources:
+        names.setdefault(get_character_name(source).lower(), []).append(
+            source)
+    collisions = [s for s in names.values() if len(s) > 1]
+    if collisions:
+        raise ValueError(
+            "Characters with the same name would overwrite their guide "
+            "templates: {}".format("; ".join(", ".join(s)
+                                             for s in collisions)))
+
+
+def read_character(source, meshNames):
+    """Read the meshes of a character.
+
+    Args:
+        source (str): Maya or fbx file of the character, or mesh name in
+            the scene
+        meshNames (list of str): The recorded mesh names
+
+    Returns:
+        tuple: The character name, the PlacementMesh of each recorded mesh
+            and their topology fingerprint by recorded mesh name. None
+            meshes if a mesh is missing
+    """
+    name = get_character_name(source)
+    if not os.path.isfile(source):
+        shapes = mc.ls(source, dag=True, type="mesh", noIntermediate=True,
+                       long=True)
+        return (name,) + _read_meshes(meshNames, shapes)
+
+    if mc.namespace(exists=IMPORT_NAMESPACE):
+        mc.namespace(removeNamespace=IMPORT_NAMESPACE,
+                     deleteNamespaceContent=True)
+    try:
+        nodes = mc.file(source,
+                        i=True,
+                        namespace=IMPORT_NAMESPACE,
+                        returnNewNodes=True,
+                        ignoreVersion=True)
+        shapes = mc.ls(nodes, type="mesh", noIntermediate=True, long=True)
+        # the points are copied, the meshes can be deleted
+        return (name,) + _read_meshes(meshNames, shapes)
+    finally:
+        if mc.namespace(exists=IMPORT_NAMESPACE):
+            mc.namespace(removeNamespace=IMPORT_NAMESPACE,
+                         deleteNamespaceContent=True)
+
+
+def get_mayapy():
+    """Get the mayapy executable next to the Maya executable.
+
+    Returns:
+        str: The mayapy path. None if not found
+    """
+    folder = os.path.dirname(sys.executable)
+    name = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+    # on macOS Maya is in Maya.app/Contents/MacOS, mayapy in Contents/bin
+    for path in (os.path.join(folder, name),
+                 os.path.join(folder, os.pardir, "bin", name)):
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    return None
+
+
+def _get_pool(processes):
+    """Get a process pool that can be started from this Maya session.
+
+    In the Maya GUI the processes can't be forked from Maya or started with
+    the Maya executable, they are spawned with mayapy.
+
+    Args:
+        processes (int): Number of processes. None for the CPU cores
+
+    Returns:
+        Pool: The pool. None if the processes can't be started
+    """
+    if pm.about(batch=True):
+        return multiprocessing.Pool(processes)
+    mayapy = get_mayapy()
+    if mayapy is None:
+        return None
+    if hasattr(multiprocessing, "get_context"):
+        context = multiprocessing.get_context("spawn")
+    elif sys.platform == "win32":
+        # python 2 only spawns the processes on Windows
+        context = multiprocessing
+    else:
+        return None
+    context.set_executable(mayapy)
+    return context.Pool(processes)
+
+
+def fit_characters(jobs, processes=1):
+    """Compute the guide matrices of the characters.
+
+    With more than one process the jobs run in a process pool, in mayapy
+    in the Maya GUI. Each process starts Maya when it imports the job. If
+    mayapy is not found, or the processes can't be spawned, the matrices
+    are computed in the current process.
+
+    Args:
+        jobs (list of tuple): The placement_math.fit_job arguments
+        processes (int, optional): Number of processes. If 1, compute in
+            the current process. If None, use all the CPU cores
+
+    Returns:
+        list: The world matrices of each character
+    """
+    pool = None
+    if processes != 1 and len(jobs) > 1:
+        pool = _get_pool(processes)
+    if pool is None:
+        return [placement_math.fit_job(j) for j in jobs]
+
+    try:
+        return pool.map(placement_math.fit_job, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+@utils.viewport_off
+def transfer_placement(filepath,
+                       sources,
+                       output_dir,
+                       guide_root=relative_guide_placement.GUIDE_ROOT,
+                       reset_scale=False,
+                       processes=1,
+                       ext=".sgt"):
+    """Fit a placement recording to many characters.
+
+    Args:
+        filepath (str): The json or compact placement file
+        sources (list of str): Maya or fbx files of the characters, or mesh
+            names in the scene
+        output_dir (str): Folder of the guide templates
+        guide_root (str, optional): The guide to fit
+        reset_scale (bool, optional): Set the guides scale to 1
+        processes (int, optional): Number of processes, see
+            fit_characters. Default is to compute in the current process
+        ext (str, optional): Extension of the guide templates, .sgt or
+            .sgtb
+
+    Returns:
+        list of str: The guide templates paths
+
+    Raises:
+        ValueError: Characters have the same name
+    """
+    check_character_names(sources)
+    data = relative_guide_placement.importPlacementData(filepath)
+    conf, orders = read_guide(guide_root)
+    if not conf:
+        return []
+    templateMatrices = get_template_matrices(conf)
+    skip = set(relative_guide_placement.SKIP_PLACEMENT_NODES)
+    rows = [row for row, guide in enumerate(data.guides)
+            if guide in templateMatrices and guide not in skip]
+    if not rows:
+        pm.displayWarning("No guide of the placement in {}".format(
+            guide_root))
+        return []
+    guides = [data.guides[row] for row in rows]
+    hierarchy = get_guide_hierarchy(guide_root)
+    scales = None
+    if not reset_scale:
+        scales = [placement_math.get_scale(templateMatrices[g])
+                  for g in guides]
+
+    names = []
+    jobs = []
+    for source in sources:
+        name, meshes, fingerprints = read_character(source, data.meshes)
+        if meshes is None:
+            pm.displayWarning(
+                "Skipped {}: reference mesh not found".format(source))
+            continue
+        if data.fingerprints:
+            mismatches = placement_file.fingerprint_mismatches(
+                data.fingerprints, fingerprints)
+            if mismatches:
+                pm.displayWarning("Skipped {}: topology changed, {}".format(
+                    source, ", ".join(mismatches)))
+                continue
+        args = relative_guide_placement.getDataRepositionArguments(
+            data, rows, meshes)
+        jobs.append(tuple(args) + (scales,))
+        names.append(name)
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    paths = []
+    for name, matrices in zip(names, fit_characters(jobs, processes)):
+        path = os.path.join(output_dir, name + ext)
+        fitted = propagate_matrices(dict(zip(guides, matrices)), hierarchy)
+        io.export_guide_template(filePath=path,
+                                 conf=update_template(conf, fitted, orders))
+        paths.append(path)
+    return paths
@@ -0,0 +1,358 @@
+"""Compact relative guide placement file.
+
+The relative guide placement JSON stores, for each guide, the full names of
+its reference vertices and three 4x4 matrices as nested lists. The compact
+file stores the same data as:
+
+    magic (4 bytes) "RGPC"
+    version and header size (2 little endian uint32)
+    header (utf-8 JSON)
+    vertex count of each guide (int32 array)
+    mesh index of each vertex (int32 array)
+    vertex index of each vertex (int32 array)
+    node, reference and mirror reference matrices of each guide
+        (float64 array, 48 values per guide)
+
+The header holds the guide order, the guides of the arrays, the reference
+meshes and their topology fingerprint (vertex count, face count and a hash
+of the face vertices), to detect a changed topology before applying.
+
+This module doesn't need Maya.
+"""
+import hashlib
+import json
+import struct
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EXTENSION = "rgpc"
+MAGIC = b"RGPC"
+VERSION = 1
+
+_HEADER_STRUCT = struct.Struct("<II")
+
+
+def _to_bytes(values):
+    """little endian bytes of an array"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    if hasattr(values, "tobytes"):
+        return values.tobytes()
+    return values.tostring()
+
+
+def _from_bytes(typecode, data):
+    """array from little endian bytes"""
+    values = array(typecode)
+    if hasattr(values, "frombytes"):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _flatten(matrix):
+    """16 floats of a matrix given as 4 rows or 16 floats"""
+    if len(matrix) == 16:
+        return [float(v) for v in matrix]
+    return [float(v) for row in matrix for v in row]
+
+
+def split_vertex_name(vertexName):
+    """Split a vertex name in mesh name and vertex index.
+
+    Args:
+        vertexName (str): Vertex name, ie. "meshShape.vtx[12]"
+
+    Returns:
+        tuple: The mesh name and the vertex index
+    """
+    mesh, component = vertexName.rsplit(".", 1)
+    return mesh, int(component.rsplit("[", 1)[1][:-1])
+
+
+def topology_hash(faceCounts, faceVertices):
+    """Get the hash of a mesh topology.
+
+    Args:
+        faceCounts (list of int): The vertex count of each face
+        faceVertices (list of int): The vertices of all the faces
+
+    Returns:
+        str: The hash, as a hexadecimal string
+    """
+    sha = hashlib.sha1()
+    sha.update(_to_bytes(array("i", faceCounts)))
+    sha.update(_to_bytes(array("i", faceVertices)))
+    return sha.hexdigest()
+
+
+def fingerprint_mismatches(recorded, current):
+    """Compare the recorded mesh fingerprints to the current ones.
+
+    Args:
+        recorded (dict): Fingerprint by mesh name, from the file. The
+            meshes without fingerprint (None) are not checked
+        current (dict): Fingerprint by mesh name, from the scene. None if
+            the mesh doesn't exist
+
+    Returns:
+        list of str: A message for each mesh with a different topology
+    """
+    mismatches = []
+    for mesh, fingerprint in recorded.items():
+        if fingerprint is None:
+            continue
+        other = current.get(mesh)
+        if other is None:
+            mismatches.append("{}: mesh not found".format(mesh))
+            continue
+        for key in ("vertices", "faces", "hash"):
+            if fingerprint.get(key) != other.get(key):
+                mismatches.append("{}: {} {} != {}".format(
+                    mesh, key, fingerprint.get(key), other.get(key)))
+                break
+    return mismatches
+
+
+class PlacementData(object):
+    """Relative guide placement, stored in flat arrays.
+
+    Attributes:
+        ordered_hierarchy (list of str): The guide order
+        guides (list of str): The guides of the arrays
+        meshes (list of str): The reference meshes
+        fingerprints (dict): Topology fingerprint by mesh name
+        counts (array): Vertex count of each guide
+        offsets (list of int): Start of the vertices of each guide
+        meshIds (array): Mesh index of each vertex
+        vertices (array): Vertex index of each vertex
+        matrices (array): Node, reference and mirror reference matrices of
+            each guide, 48 float64 values per guide
+    """
+
+    def __init__(self):
+        self.ordered_hierarchy = []
+        self.guides = []
+        self.meshes = []
+        self.fingerprints = {}
+        self.counts = array("i")
+        self.offsets = [0]
+        self.meshIds = array("i")
+        self.vertices = array("i")
+        self.matrices = array("d")
+
+    def __len__(self):
+        return len(self.guides)
+
+    @classmethod
+    def from_dict(cls, relativeGuide_dict, ordered_hierarchy,
+                  fingerprints=None):
+        """Create the data from a relative guide placement dictionary.
+
+        Args:
+            relativeGuide_dict (dict): guide: [vertex names, node matrix,
+                reference matrix, mirror reference matrix]
+            ordered_hierarchy (list of str): The guide order
+            fingerprints (dict, optional): Topology fingerprint by mesh name
+
+        Returns:
+            PlacementData: The data
+        """
+        data = cls()
+        data.ordered_hierarchy = list(ordered_hierarchy)
+        meshIndex = {}
+        # the guides in hierarchy order first, to apply them in one pass
+        guides = [g for g in ordered_hierarchy if g in relativeGuide_dict]
+        ordered = set(guides)
+        guides.extend(sorted(g for g in relativeGuide_dict
+                             if g not in ordered))
+        for guide in guides:
+            (vertexIds,
+             node_matrix,
+             orig_ref_matrix,
+             mr_orig_ref_matrix) = relativeGuide_dict[guide]
+            data.guides.append(guide)
+            data.counts.append(len(vertexIds))
+            data.offsets.append(data.offsets[-1] + len(vertexIds))
+            for vertexId in vertexIds:
+                mesh, index = split_vertex_name(vertexId)
+                if mesh not in meshIndex:
+                    meshIndex[mesh] = len(data.meshes)
+                    data.meshes.append(mesh)
+                data.meshIds.append(meshIndex[mesh])
+                data.vertices.append(index)
+            for matrix in (node_matrix, orig_ref_matrix, mr_orig_ref_matrix):
+                data.matrices.extend(_flatten(matrix))
+        if fingerprints:
+            data.fingerprints = dict((mesh, fingerprints[mesh])
+                                     for mesh in data.meshes
+                                     if mesh in fingerprints)
+        return data
+
+    def vertex_ids(self, row):
+        """Get the vertex names of a guide.
+
+        Args:
+            row (int): The guide row
+
+        Returns:
+            list of str: The vertex names, ie. "meshShape.vtx[12]"
+        """
+        return ["{}.vtx[{}]".format(self.meshes[self.meshIds[i]],
+                                    self.vertices[i])
+                for i in range(self.offsets[row], self.offsets[row + 1])]
+
+    def matrix(self, row, index):
+        """Get a matrix of a guide.
+
+        Args:
+            row (int): The guide row
+            index (int): 0 node, 1 reference, 2 mirror reference matrix
+
+        Returns:
+            list: The 4 rows of the matrix
+        """
+        start = row * 48 + index * 16
+        m = self.matrices[start:start + 16].tolist()
+        return [m[0:4], m[4:8], m[8:12], m[12:16]]
+
+    def as_arrays(self):
+        """Get the matrices and vertices as NumPy arrays, without copy.
+
+        Returns:
+            tuple: Nx3x4x4 matrices, mesh index and vertex index arrays.
+                None without NumPy
+        """
+        if numpy is None:
+            return None
+        matrices = numpy.frombuffer(self.matrices, dtype=numpy.float64)
+        return (matrices.reshape(-1, 3, 4, 4),
+                numpy.frombuffer(self.meshIds, dtype=numpy.int32),
+                numpy.frombuffer(self.vertices, dtype=numpy.int32))
+
+    def to_dict(self):
+        """Get the relative guide placement dictionary.
+
+        Returns:
+            dict: guide: [vertex names, node matrix, reference matrix,
+                mirror reference matrix]
+        """
+        relativeGuide_dict = {}
+        for row, guide in enumerate(self.guides):
+            relativeGuide_dict[guide] = [self.vertex_ids(row),
+                                         self.matrix(row, 0),
+                                         self.matrix(row, 1),
+                                         self.matrix(row, 2)]
+        return relativeGuide_dict
+
+    def dumps(self):
+        """Get the file content.
+
+        Returns:
+            bytes: The content
+        """
+        header = {"ordered_hierarchy": self.ordered_hierarchy,
+                  "guides": self.guides,
+                  "meshes": self.meshes,
+                  "fingerprints": self.fingerprints,
+                  "vertex_count": len(self.vertices)}
+        header = json.dumps(header, sort_keys=True).encode("utf-8")
+        return b"".join([MAGIC,
+                         _HEADER_STRUCT.pack(VERSION, len(header)),
+                         header,
+                         _to_bytes(self.counts),
+                         _to_bytes(self.meshIds),
+                         _to_bytes(self.vertices),
+                         _to_bytes(self.matrices)])
+
+    @classmethod
+    def loads(cls, content):
+        """Create the data from a file content.
+
+        Args:
+            content (bytes): The content
+
+        Returns:
+            PlacementData: The data
+
+        Raises:
+            ValueError: The content is not a compact placement file
+        """
+        if content[:4] != MAGIC:
+            raise ValueError("Not a compact guide placement file")
+        start = 4 + _HEADER_STRUCT.size
+        version, size = _HEADER_STRUCT.unpack(content[4:start])
+        if version > VERSION:
+            raise ValueError(
+                "Unsupported guide placement file version: {}".format(
+                    version))
+        header = json.loads(content[start:start + size].decode("utf-8"))
+        start += size
+
+        data = cls()
+        data.ordered_hierarchy = header["ordered_hierarchy"]
+        data.guides = header["guides"]
+        data.meshes = header["meshes"]
+        data.fingerprints = header["fingerprints"]
+        nbGuides = len(data.guides)
+        nbVertices = header["vertex_count"]
+        for name, typecode, count in (("counts", "i", nbGuides),
+                                      ("meshIds", "i", nbVertices),
+                                      ("vertices", "i", nbVertices),
+                                      ("matrices", "d", nbGuides * 48)):
+            end = start + count * array(typecode).itemsize
+            values = _from_bytes(typecode, content[start:end])
+            if len(values) != count:
+                raise ValueError("Truncated guide placement file")
+            setattr(data, name, values)
+            start = end
+        for count in data.counts:
+            data.offsets.append(data.offsets[-1] + count)
+        return data
+
+
+def write(filepath, data):
+    """Write a compact placement file.
+
+    Args:
+        filepath (str): The file path
+        data (PlacementData): The data
+    """
+    with open(filepath, "wb") as f:
+        f.write(data.dumps())
+
+
+def read(filepath):
+    """Read a compact placement file.
+
+    Args:
+        filepath (str): The file path
+
+    Returns:
+        PlacementData: The data
+    """
+    with open(filepath, "rb") as f:
+        return PlacementData.loads(f.read())
+
+
+def is_compact(filepath):
+    """Check the extension of a placement file.
+
+    Args:
+        filepath (str): The file path
+
+    Returns:
+        bool: True for a compact placement file
+    """
+    if not filepath:
+        return False
+    return filepath.lower().endswith("." + EXTENSION)
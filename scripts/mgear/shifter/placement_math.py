@@ -0,0 +1,268 @@
+"""Relative guide placement math.
+
+The reposition of the guides from the recorded reference vertices to the
+current ones, same as relative_guide_placement.getRepositionMatrix, for
+many guides at once. The matrices are lists of 16 floats, the positions
+lists of 3 floats.
+
+This module doesn't use maya.cmds or PyMEL, only plain lists, so the jobs
+can be pickled to a process pool. The pool processes still import the
+mgear.shifter package, and so PyMEL, to load it.
+
+The scale is removed with the OpenMaya MTransformationMatrix when
+available, like transform.setMatrixScale. Without it the scale and shear
+are decomposed in python, which gives the same result for the matrices
+with a positive determinant.
+"""
+import math
+
+try:
+    import maya.api.OpenMaya as om2
+except ImportError:
+    om2 = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def translation_matrix(position):
+    """Get an identity matrix with a translation.
+
+    Args:
+        position (list of float): The translation
+
+    Returns:
+        list of float: The matrix
+    """
+    return [1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            position[0], position[1], position[2], 1.0]
+
+
+def mult_matrix(a, b):
+    """Multiply 2 matrices, a * b.
+
+    Args:
+        a (list of float): The first matrix
+        b (list of float): The second matrix
+
+    Returns:
+        list of float: The matrix
+    """
+    return [a[r * 4] * b[c]
+            + a[r * 4 + 1] * b[4 + c]
+            + a[r * 4 + 2] * b[8 + c]
+            + a[r * 4 + 3] * b[12 + c]
+            for r in range(4) for c in range(4)]
+
+
+def inverse_matrix(values):
+    """Invert a matrix.
+
+    Args:
+        values (list of float): The matrix
+
+    Returns:
+        list of float: The inverse matrix
+    """
+    if om2 is not None:
+        return list(om2.MMatrix(values).inverse())
+    rows = [list(values[r * 4:r * 4 + 4])
+            + [1.0 if c == r else 0.0 for c in range(4)]
+            for r in range(4)]
+    for c in range(4):
+        pivot = max(range(c, 4), key=lambda r: abs(rows[r][c]))
+        rows[c], rows[pivot] = rows[pivot], rows[c]
+        scale = float(rows[c][c])
+        rows[c] = [v / scale for v in rows[c]]
+        for r in range(4):
+            if r != c and rows[r][c]:
+                factor = rows[r][c]
+                rows[r] = [v - factor * w for v, w in zip(rows[r], rows[c])]
+    return [v for row in rows for v in row[4:]]
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _remove_scale(values):
+    """python version of remove_scale, keeping the shear"""
+    r0 = values[0:3]
+    r1 = values[4:7]
+    r2 = values[8:11]
+    sx = math.sqrt(_dot(r0, r0))
+    r0 = [v / sx for v in r0]
+    shxy = _dot(r0, r1)
+    r1 = [r1[i] - shxy * r0[i] for i in range(3)]
+    sy = math.sqrt(_dot(r1, r1))
+    r1 = [v / sy for v in r1]
+    shxy /= sy
+    shxz = _dot(r0, r2)
+    r2 = [r2[i] - shxz * r0[i] for i in range(3)]
+    shyz = _dot(r1, r2)
+    r2 = [r2[i] - shyz * r1[i] for i in range(3)]
+    sz = math.sqrt(_dot(r2, r2))
+    r2 = [v / sz for v in r2]
+    shxz /= sz
+    shyz /= sz
+    cross = [r1[1] * r2[2] - r1[2] * r2[1],
+             r1[2] * r2[0] - r1[0] * r2[2],
+             r1[0] * r2[1] - r1[1] * r2[0]]
+    if _dot(r0, cross) < 0:
+        r0 = [-v for v in r0]
+        r1 = [-v for v in r1]
+        r2 = [-v for v in r2]
+    r1 = [shxy * r0[i] + r1[i] for i in range(3)]
+    r2 = [shxz * r0[i] + shyz * r1[i] + r2[i] for i in range(3)]
+    return (r0 + [0.0] + r1 + [0.0] + r2 + [0.0]
+            + list(values[12:15]) + [1.0])
+
+
+def remove_scale(values):
+    """Remove the scale of a matrix, like transform.setMatrixScale.
+
+    Args:
+        values (list of float): The matrix
+
+    Returns:
+        list of float: The matrix
+    """
+    if om2 is None:
+        return _remove_scale(values)
+    tm = om2.MTransformationMatrix(om2.MMatrix(values))
+    tm.setScale([1.0, 1.0, 1.0], om2.MSpace.kWorld)
+    return list(tm.asMatrix())
+
+
+def set_scale(values, scale):
+    """Scale the axes of a matrix without scale.
+
+    Args:
+        values (list of float): The matrix
+        scale (list of float): The scale of each axis
+
+    Returns:
+        list of float: The matrix
+    """
+    values = list(values)
+    for axis in range(3):
+        for i in range(axis * 4, axis * 4 + 3):
+            values[i] *= scale[axis]
+    return values
+
+
+def get_scale(values):
+    """Get the length of the axes of a matrix.
+
+    Args:
+        values (list of float): The matrix
+
+    Returns:
+        list of float: The scale of each axis
+    """
+    return [math.sqrt(_dot(values[i:i + 3], values[i:i + 3]))
+            for i in (0, 4, 8)]
+
+
+def lerp_distance(v0, v1):
+    """Get the mid point and the distance of 2 positions.
+
+    Same as vector.linearlyInterpolate and vector.getDistance.
+
+    Args:
+        v0 (list of float): The first position
+        v1 (list of float): The second position
+
+    Returns:
+        tuple: The mid point and the distance
+    """
+    d = [v1[0] - v0[0], v1[1] - v0[1], v1[2] - v0[2]]
+    center = [v0[0] + d[0] * .5, v0[1] + d[1] * .5, v0[2] + d[2] * .5]
+    return center, math.sqrt(d[0] * d[0] + d[1] * d[1] + d[2] * d[2])
+
+
+def compute_reposition_matrices(node_matrices,
+                                orig_pos,
+                                mr_orig_pos,
+                                current_pos,
+                                mr_current_pos):
+    """Compute the reposition matrices, same as getRepositionMatrix.
+
+    Args:
+        node_matrices (list): The recorded guide world matrices
+        orig_pos (list): The recorded reference vertex positions
+        mr_orig_pos (list): The recorded mirror reference vertex positions
+        current_pos (list): The current reference vertex positions
+        mr_current_pos (list): The current mirror reference vertex
+            positions
+
+    Returns:
+        list: The world matrices, without scale
+    """
+    if numpy is None:
+        matrices = []
+        for i in range(len(node_matrices)):
+            orig_center, orig_length = lerp_distance(orig_pos[i],
+                                                     mr_orig_pos[i])
+            current_center, current_length = lerp_distance(
+                current_pos[i], mr_current_pos[i])
+            length_percentage = 1
+            if orig_length != 0:
+                length_percentage = current_length / orig_length
+            inverse_center = translation_matrix([-v for v in orig_center])
+            delta = mult_matrix(list(node_matrices[i]), inverse_center)
+            delta = remove_scale([v * length_percentage for v in delta])
+            matrices.append(
+                mult_matrix(delta, translation_matrix(current_center)))
+        return matrices
+
+    def lerpDistance(v0, v1):
+        v0 = numpy.array(v0, dtype=numpy.float64)
+        d = numpy.array(v1, dtype=numpy.float64) - v0
+        length = numpy.sqrt(d[:, 0] * d[:, 0]
+                            + d[:, 1] * d[:, 1]
+                            + d[:, 2] * d[:, 2])
+        return v0 + d * .5, length
+
+    orig_center, orig_length = lerpDistance(orig_pos, mr_orig_pos)
+    current_center, current_length = lerpDistance(current_pos,
+                                                   mr_current_pos)
+    count = len(node_matrices)
+    length_percentage = numpy.ones(count)
+    valid = orig_length != 0
+    length_percentage[valid] = current_length[valid] / orig_length[valid]
+
+    inverse_center = numpy.tile(numpy.identity(4), (count, 1, 1))
+    inverse_center[:, 3, :3] = -orig_center
+    delta = numpy.matmul(
+        numpy.array(node_matrices, dtype=numpy.float64).reshape(-1, 4, 4),
+        inverse_center)
+    delta *= length_percentage[:, None, None]
+    delta = numpy.array([remove_scale(m.ravel().tolist()) for m in delta])
+
+    current_matrix = numpy.tile(numpy.identity(4), (count, 1, 1))
+    current_matrix[:, 3, :3] = current_center
+    matrices = numpy.matmul(delta.reshape(-1, 4, 4), current_matrix)
+    return matrices.reshape(-1, 16).tolist()
+
+
+def fit_job(args):
+    """Compute the guide world matrices of a character.
+
+    Args:
+        args (tuple): The reposition arguments of
+            compute_reposition_matrices, followed by the scale of each
+            guide, or None to reset the scale
+
+    Returns:
+        list: The world matrices
+    """
+    matrices = compute_reposition_matrices(*args[:5])
+    scales = args[5]
+    if scales is None:
+        return matrices
+    return [set_scale(m, s) for m, s in zip(matrices, scales)]
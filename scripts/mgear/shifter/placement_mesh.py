@@ -0,0 +1,285 @@
+"""Relative guide placement mesh queries.
+
+The relative guide placement queries the closest vertex of the reference
+mesh for each guide. The mesh points and the face vertices are read once
+and the closest vertex of many positions is found in one batch, instead of
+creating PyMEL components for each query.
+
+The closest vertex is the same as meshNavigation.getClosestVertexFromTransform:
+the vertex of the closest face nearest to the position.
+
+The frame of a vertex (the bounding box centre of its connected faces and
+their averaged normal) is computed from the topology arrays the first time
+it is requested, without selecting the faces.
+"""
+import math
+
+import maya.api.OpenMaya as om
+
+from mgear.shifter import placement_file
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def get_vertex_index(vertexName):
+    """Get the index of a vertex from its name.
+
+    Args:
+        vertexName (str): Vertex name, ie. "meshShape.vtx[12]"
+
+    Returns:
+        int: The vertex index
+    """
+    return int(vertexName.rsplit("[", 1)[1][:-1])
+
+
+class PlacementMesh(object):
+    """Points and topology of a mesh, read once.
+
+    Args:
+        mesh (str or dagNode): The mesh transform or shape
+
+    Attributes:
+        name (str): The mesh shape name, used for the vertex names
+        mpoints (MPointArray): World position of each vertex
+        points (list of tuple): World position of each vertex, converted
+            on first use
+        faceOffsets (list of int): Start of the vertices of each face in
+            faceVertices. One more item than the faces. Read on first use
+        faceVertices (list of int): The vertices of all the faces. Read on
+            first use
+        vertexFaces (list of list): Connected faces of each vertex. None
+            until the first vertex frame query
+        frames (dict): Centre and normal by vertex index
+    """
+
+    def __init__(self, mesh):
+        selList = om.MSelectionList()
+        selList.add(str(mesh))
+        dagPath = selList.getDagPath(0)
+        if not dagPath.hasFn(om.MFn.kMesh):
+            raise ValueError("{} is not a mesh".format(mesh))
+        if dagPath.apiType() != om.MFn.kMesh:
+            dagPath.extendToShape()
+        self.dagPath = dagPath
+        self.fnMesh = om.MFnMesh(dagPath)
+        self.name = dagPath.partialPathName()
+
+        self.mpoints = self.fnMesh.getPoints(om.MSpace.kWorld)
+        self._points = None
+        self._faceVertices = None
+        self._faceOffsets = None
+
+        self.vertexFaces = None
+        self.faceNormals = {}
+        self.frames = {}
+
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = [(p.x, p.y, p.z) for p in self.mpoints]
+        return self._points
+
+    @property
+    def faceVertices(self):
+        if self._faceVertices is None:
+            self.read_topology()
+        return self._faceVertices
+
+    @property
+    def faceOffsets(self):
+        if self._faceOffsets is None:
+            self.read_topology()
+        return self._faceOffsets
+
+    @property
+    def numVertices(self):
+        return len(self.mpoints)
+
+    @property
+    def numFaces(self):
+        return self.fnMesh.numPolygons
+
+    def read_topology(self):
+        """Read the vertices of all the faces."""
+        counts, vertices = self.fnMesh.getVertices()
+        self._faceVertices = list(vertices)
+        offsets = [0]
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        self._faceOffsets = offsets
+
+    def fingerprint(self):
+        """Get the topology fingerprint of the mesh.
+
+        Returns:
+            dict: The vertex count, face count and topology hash
+        """
+        offsets = self.faceOffsets
+        counts = [offsets[i + 1] - offsets[i]
+                  for i in range(len(offsets) - 1)]
+        return {"vertices": self.numVertices,
+                "faces": self.numFaces,
+                "hash": placement_file.topology_hash(counts,
+                                                     self.faceVertices)}
+
+    def get_point(self, index):
+        """Get the world position of a vertex.
+
+        Args:
+            index (int): The vertex index
+
+        Returns:
+            tuple: The position
+        """
+        p = self.mpoints[index]
+        return (p.x, p.y, p.z)
+
+    def as_array(self):
+        """Get the points as a Nx3 NumPy array.
+
+        Returns:
+            numpy.ndarray: The points. None without NumPy
+        """
+        if numpy is None:
+            return None
+        return numpy.array(self.points, dtype=numpy.float64)
+
+    def get_face_vertices(self, face):
+        """Get the vertices of a face, in the face order.
+
+        Args:
+            face (int): The face index
+
+        Returns:
+            list of int: The vertices
+        """
+        return self.faceVertices[self.faceOffsets[face]:
+                                 self.faceOffsets[face + 1]]
+
+    def vertex_name(self, index):
+        """Get the name of a vertex.
+
+        Args:
+            index (int): The vertex index
+
+        Returns:
+            str: The vertex name, ie. "meshShape.vtx[12]"
+        """
+        return "{}.vtx[{}]".format(self.name, index)
+
+    def get_closest_face(self, position):
+        """Get the closest face of a world position.
+
+        Args:
+            position (list of float): The position
+
+        Returns:
+            int: The face index
+        """
+        point = om.MPoint(position[0], position[1], position[2])
+        return self.fnMesh.getClosestPoint(point, om.MSpace.kWorld)[1]
+
+    def get_closest_vertex(self, position):
+        """Get the vertex of the closest face nearest to a position.
+
+        Args:
+            position (list of float): The world position
+
+        Returns:
+            int: The vertex index
+        """
+        px, py, pz = position[0], position[1], position[2]
+        closest = None
+        minLength = None
+        for v in self.get_face_vertices(self.get_closest_face(position)):
+            x, y, z = self.get_point(v)
+            length = math.sqrt((px - x) * (px - x)
+                               + (py - y) * (py - y)
+                               + (pz - z) * (pz - z))
+            if minLength is None or length < minLength:
+                minLength = length
+                closest = v
+        return closest
+
+    def get_closest_vertices(self, positions):
+        """Get the closest vertex of each position.
+
+        Args:
+            positions (list): The world positions
+
+        Returns:
+            list of int: The vertex indexes
+        """
+        return [self.get_closest_vertex(p) for p in positions]
+
+    def build_vertex_faces(self):
+        """Build the connected faces of each vertex, in one pass."""
+        vertexFaces = [[] for i in range(self.numVertices)]
+        offsets = self.faceOffsets
+        faceVertices = self.faceVertices
+        for face in range(len(offsets) - 1):
+            for v in faceVertices[offsets[face]:offsets[face + 1]]:
+                vertexFaces[v].append(face)
+        self.vertexFaces = vertexFaces
+
+    def get_face_normal(self, face):
+        """Get the world normal of a face.
+
+        Args:
+            face (int): The face index
+
+        Returns:
+            tuple: The normal
+        """
+        normal = self.faceNormals.get(face)
+        if normal is None:
+            n = self.fnMesh.getPolygonNormal(face, om.MSpace.kWorld)
+            normal = self.faceNormals[face] = (n.x, n.y, n.z)
+        return normal
+
+    def get_vertex_frame(self, vertex):
+        """Get the frame of a vertex.
+
+        The centre is the bounding box centre of the connected faces, the
+        normal is the normalized sum of the connected face normals.
+
+        Args:
+            vertex (int): The vertex index
+
+        Returns:
+            tuple: The centre and the normal, as 3 floats tuples
+        """
+        frame = self.frames.get(vertex)
+        if frame is not None:
+            return frame
+        if self.vertexFaces is None:
+            self.build_vertex_faces()
+
+        faces = self.vertexFaces[vertex]
+        vertices = set()
+        nx = ny = nz = 0.0
+        for face in faces:
+            vertices.update(self.get_face_vertices(face))
+            normal = self.get_face_normal(face)
+            nx += normal[0]
+            ny += normal[1]
+            nz += normal[2]
+        length = math.sqrt(nx * nx + ny * ny + nz * nz)
+        if length:
+            normal = (nx / length, ny / length, nz / length)
+        else:
+            normal = (0.0, 1.0, 0.0)
+
+        if not vertices:
+            vertices = [vertex]
+        xs, ys, zs = zip(*[self.get_point(v) for v in vertices])
+        centre = ((min(xs) + max(xs)) / 2.0,
+                  (min(ys) + max(ys)) / 2.0,
+                  (min(zs) + max(zs)) / 2.0)
+
+        frame = self.frames[vertex] = (centre, normal)
+        return frame
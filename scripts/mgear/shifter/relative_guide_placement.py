@@ -28,17 +28,26 @@ Attributes:
 # python
 import json
 import math
+import re
 
 # dcc
 import maya.cmds as mc
 import pymel.core as pm
 import maya.OpenMaya as om
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # mgear
 from mgear.core import utils
 from mgear.core import vector
 from mgear.core import transform
 from mgear.core import meshNavigation
+from mgear.shifter import placement_file
+from mgear.shifter import placement_math
+from mgear.shifter import placement_mesh
 
 
 # constants -------------------------------------------------------------------
@@ -90,34 +99,106 @@ UNIVERSAL_MESH_NAME = "skin_geo_setup"
 
 # general functions -----------------------------------------------------------
 
+def getSkipMatcher(skip_crawl_nodes, skip_strings=None):
+    """get a function checking if a node and its descendents are skipped
+
+    The skip lists are compiled once: sets for the names and types and a
+    case insensitive regular expression for the skip strings.
+
+    Args:
+        skip_crawl_nodes (list): nodes to skip crawl
+        skip_strings (list, optional): strings to check to skip node
+
+    Returns:
+        function: skip(name, nodeType), True if the node is skipped
+    """
+    skip_nodes = set(skip_crawl_nodes or [])
+    suffixes = tuple(SKIP_SUFFIX)
+    node_types = set(SKIP_NODETYPES)
+    pattern = None
+    if skip_strings:
+        pattern = re.compile("|".join(re.escape(skip_str)
+                                      for skip_str in skip_strings),
+                             re.IGNORECASE)
+
+    def skip(name, nodeType):
+        return (name in skip_nodes
+                or name.endswith(suffixes)
+                or nodeType in node_types
+                or (pattern is not None and pattern.search(name) is not None))
+
+    return skip
+
+
+def getHierarchyListing(parentNode):
+    """get the transforms under a node, with two scene queries
+
+    Args:
+        parentNode (str): node to query
+
+    Returns:
+        tuple: full paths, unique names and node types, in dag order. The
+            first item is the parent node
+    """
+    listing = mc.ls(parentNode, dag=True, long=True, showType=True,
+                    type="transform") or []
+    names = mc.ls(parentNode, dag=True, type="transform") or []
+    return tuple(listing[0::2]), tuple(names), tuple(listing[1::2])
+
+
+def orderHierarchy(listing, skip, visited=None):
+    """order the crawled nodes depth first, like the dag children order
+
+    A skipped node is not crawled.
+
+    Args:
+        listing (tuple): full paths, unique names and types of the nodes,
+            from getHierarchyListing
+        skip (function): from getSkipMatcher
+        visited (set, optional): nodes to skip, already crawled
+
+    Returns:
+        list: of the node unique names
+    """
+    paths, names, types = listing
+    if not paths:
+        return []
+    visited = visited or set()
+    children = {}
+    for i in range(1, len(paths)):
+        children.setdefault(paths[i].rsplit("|", 1)[0], []).append(i)
+
+    ordered_hierarchy = []
+    stack = list(reversed(children.get(paths[0], [])))
+    while stack:
+        i = stack.pop()
+        name = names[i]
+        if name in visited or skip(name, types[i]):
+            continue
+        visited.add(name)
+        ordered_hierarchy.append(name)
+        stack.extend(reversed(children.get(paths[i], [])))
+    return ordered_hierarchy
+
+
 def crawlHierarchy(parentNode,
                    ordered_hierarchy,
                    skip_crawl_nodes,
                    skip_strings=None):
-    """recursive function to crawl a hierarchy of nodes to return decendents
+    """crawl a hierarchy of nodes to return decendents
+
+    The hierarchy is listed with two queries and ordered in python.
 
     Args:
         parentNode (str): node to query
         ordered_hierarchy (str): list to continuesly pass itself
         skip_crawl_nodes (list): nodes to skip crawl
+        skip_strings (list, optional): strings to check to skip node
     """
-    if not skip_strings:
-        skip_strings = []
-    for node in mc.listRelatives(parentNode, type="transform") or []:
-        if node in skip_crawl_nodes or node in ordered_hierarchy:
-            continue
-        if node.endswith(tuple(SKIP_SUFFIX)):
-            continue
-        if mc.objectType(node) in SKIP_NODETYPES:
-            continue
-        if [True for skip_str in skip_strings
-                if skip_str.lower() in node.lower()]:
-            continue
-        ordered_hierarchy.append(node)
-        crawlHierarchy(node,
-                       ordered_hierarchy,
-                       skip_crawl_nodes,
-                       skip_strings=skip_strings)
+    skip = getSkipMatcher(skip_crawl_nodes, skip_strings)
+    ordered_hierarchy.extend(orderHierarchy(getHierarchyListing(parentNode),
+                                            skip,
+                                            set(ordered_hierarchy)))
 
 
 def getPostionFromLoop(vertList):
@@ -134,32 +215,73 @@ def getPostionFromLoop(vertList):
     return pos
 
 
-def getVertMatrix(closestVert):
+# PlacementMesh by mesh name, used when no mesh is given to getVertMatrix
+_PLACEMENT_MESHES = {}
+
+
+def getPlacementMesh(mesh):
+    """get the PlacementMesh of a mesh, read once and kept
+
+    The mesh points are not read again when the mesh changes, call
+    clearPlacementMeshCache after modifying the mesh.
+
+    Args:
+        mesh (str): name of the mesh
+
+    Returns:
+        PlacementMesh: the mesh points and topology
+    """
+    placementMesh = _PLACEMENT_MESHES.get(mesh)
+    if placementMesh is None:
+        placementMesh = placement_mesh.PlacementMesh(mesh)
+        _PLACEMENT_MESHES[mesh] = placementMesh
+    return placementMesh
+
+
+def clearPlacementMeshCache():
+    """forget the meshes read by getPlacementMesh"""
+    _PLACEMENT_MESHES.clear()
+
+
+def getVertMatrix(closestVert, placementMesh=None):
     """create a matrix from the closestVert and the normals of the surrounding
     faces for later comparison
 
     Args:
-        node (str): guide node to query
         closestVert (str): closest vert to guide
+        placementMesh (PlacementMesh, optional): The mesh of the vertex, to
+            reuse its vertex frames. If None the mesh is read once and kept,
+            see getPlacementMesh
 
     Returns:
         list: of matrices
     """
-    closestVert = pm.PyNode(closestVert)
-    faces = closestVert.connectedFaces()
-    normalVector = faces.getNormal("world")
-    pm.select(faces)
-    faces_str = mc.ls(sl=True, fl=True)
-    pm.select(cl=True)
-    face_pos = pm.dt.Vector(getPostionFromLoop(faces_str))
-    normal_rot = getOrient([normalVector.x, normalVector.y, normalVector.z],
+    if placementMesh is None:
+        placementMesh = getPlacementMesh(closestVert.split(".")[0])
+    face_pos, normalVector = placementMesh.get_vertex_frame(
+        placement_mesh.get_vertex_index(closestVert))
+
+    return getFrameMatrix(face_pos, normalVector)
+
+
+def getFrameMatrix(position, normal):
+    """create a matrix from a position and a normal direction
+
+    Args:
+        position (list): world position
+        normal (list): world normal
+
+    Returns:
+        pm.dt.TransformationMatrix: the matrix
+    """
+    normal_rot = getOrient([normal[0], normal[1], normal[2]],
                            [0, 1, 0],
                            ro=0)
-    orig_ref_matrix = pm.dt.TransformationMatrix()
-    orig_ref_matrix.setTranslation(face_pos, pm.dt.Space.kWorld)
-    orig_ref_matrix.setRotation(normal_rot)
+    ref_matrix = pm.dt.TransformationMatrix()
+    ref_matrix.setTranslation(pm.dt.Vector(position), pm.dt.Space.kWorld)
+    ref_matrix.setRotation(normal_rot)
 
-    return orig_ref_matrix
+    return ref_matrix
 
 
 def getOrient(normal, tangent, ro=0):
@@ -241,7 +363,8 @@ def getRepositionMatrix(node_matrix,
 def getRepositionMatrixSingleRef(node_matrix,
                                  orig_ref_matrix,
                                  mr_orig_ref_matrix,
-                                 closestVerts):
+                                 closestVerts,
+                                 placementMesh=None):
     """Get the delta matrix from the original position and multiply by the
     new vert position. Add the rotations from the face normals.
 
@@ -249,23 +372,14 @@ def getRepositionMatrixSingleRef(node_matrix,
         node_matrix (pm.dt.Matrix): matrix of the guide
         orig_ref_matrix (pm.dt.Matrix): matrix from the original vert position
         closestVerts (str): name of the closest vert
+        placementMesh (PlacementMesh, optional): The mesh of the vertex, to
+            reuse its vertex frames. If None the mesh is read once and kept,
+            see getPlacementMesh
 
     Returns:
         mmatrix: matrix of the new offset position, worldSpace
     """
-    closestVerts = pm.PyNode(closestVerts[0])
-    faces = closestVerts.connectedFaces()
-    normalVector = faces.getNormal("world")
-    pm.select(faces)
-    faces_str = mc.ls(sl=True, fl=True)
-    pm.select(cl=True)
-    face_pos = pm.dt.Vector(getPostionFromLoop(faces_str))
-    normal_rot = getOrient([normalVector.x, normalVector.y, normalVector.z],
-                           [0, 1, 0],
-                           ro=0)
-    refPosition_matrix = pm.dt.TransformationMatrix()
-    refPosition_matrix.setTranslation(face_pos, pm.dt.Space.kWorld)
-    refPosition_matrix.setRotation(normal_rot)
+    refPosition_matrix = getVertMatrix(closestVerts[0], placementMesh)
 
     deltaMatrix = node_matrix * orig_ref_matrix.inverse()
     refPosition_matrix = deltaMatrix * refPosition_matrix
@@ -273,6 +387,134 @@ def getRepositionMatrixSingleRef(node_matrix,
     return refPosition_matrix
 
 
+def getRepositionMatrices(guideOrder, guideDictionary, placementMeshes=None):
+    """Get the reposition matrix of all the guides in one batch.
+
+    Same as getRepositionMatrix for each guide. The positions of the
+    referenced vertices are read with one mesh query per mesh, the delta
+    matrices, length ratios and centres are computed with NumPy when
+    available.
+
+    Args:
+        guideOrder (list): of the hierarchy to crawl
+        guideDictionary (dictionary): dict of the guide:edge, matrix position
+        placementMeshes (dict, optional): PlacementMesh by mesh name, to
+            reuse the meshes already read
+
+    Returns:
+        list: of guide name and world matrix as 16 floats, in guideOrder
+    """
+    if placementMeshes is None:
+        placementMeshes = {}
+    existing = set(mc.ls(list(guideOrder)) or [])
+
+    guides = []
+    node_matrices = []
+    orig_pos = []
+    mr_orig_pos = []
+    current_pos = []
+    mr_current_pos = []
+    for guide in guideOrder:
+        if guide not in guideDictionary or guide not in existing:
+            continue
+        elif guide in SKIP_PLACEMENT_NODES:
+            continue
+        (vertexIds,
+         node_matrix,
+         orig_ref_matrix,
+         mr_orig_ref_matrix) = guideDictionary[guide]
+        guides.append(guide)
+        node_matrices.append([v for row in node_matrix for v in row])
+        orig_pos.append(orig_ref_matrix[3][:3])
+        mr_orig_pos.append(mr_orig_ref_matrix[3][:3])
+        points = []
+        for vertexId in vertexIds[:2]:
+            meshName = vertexId.split(".")[0]
+            mesh = placementMeshes.get(meshName)
+            if mesh is None:
+                mesh = placement_mesh.PlacementMesh(meshName)
+                placementMeshes[meshName] = mesh
+            points.append(
+                mesh.get_point(placement_mesh.get_vertex_index(vertexId)))
+        current_pos.append(points[0])
+        mr_current_pos.append(points[1])
+
+    if not guides:
+        return []
+    matrices = placement_math.compute_reposition_matrices(node_matrices,
+                                                          orig_pos,
+                                                          mr_orig_pos,
+                                                          current_pos,
+                                                          mr_current_pos)
+    return list(zip(guides, matrices))
+
+
+def getRepositionMatricesFromData(data, placementMeshes=None):
+    """Get the reposition matrix of all the guides of a compact placement.
+
+    Same as getRepositionMatrices, reading the matrices and the vertex
+    indices from the placement_file.PlacementData arrays.
+
+    Args:
+        data (PlacementData): the placement data
+        placementMeshes (dict, optional): PlacementMesh by mesh name, to
+            reuse the meshes already read
+
+    Returns:
+        list: of guide name and world matrix as 16 floats, in guide order
+    """
+    if placementMeshes is None:
+        placementMeshes = {}
+    meshes = []
+    for meshName in data.meshes:
+        mesh = placementMeshes.get(meshName)
+        if mesh is None:
+            mesh = placement_mesh.PlacementMesh(meshName)
+            placementMeshes[meshName] = mesh
+        meshes.append(mesh)
+    existing = set(mc.ls(list(data.guides)) or [])
+
+    rows = [row for row, guide in enumerate(data.guides)
+            if guide in existing and guide not in SKIP_PLACEMENT_NODES]
+    if not rows:
+        return []
+    matrices = placement_math.compute_reposition_matrices(
+        *getDataRepositionArguments(data, rows, meshes))
+    return list(zip([data.guides[row] for row in rows], matrices))
+
+
+def getDataRepositionArguments(data, rows, meshes):
+    """get the compute_reposition_matrices arguments of compact placement
+
+    Args:
+        data (PlacementData): the placement data
+        rows (list): of the guide rows to reposition
+        meshes (list): of PlacementMesh, matching the data meshes
+
+    Returns:
+        tuple: node matrices, recorded and current reference positions
+    """
+    current_pos = []
+    mr_current_pos = []
+    for row in rows:
+        i = data.offsets[row]
+        current_pos.append(
+            meshes[data.meshIds[i]].get_point(data.vertices[i]))
+        mr_current_pos.append(
+            meshes[data.meshIds[i + 1]].get_point(data.vertices[i + 1]))
+
+    if numpy is not None:
+        matrices = data.as_arrays()[0][rows]
+        node_matrices = matrices[:, 0].reshape(-1, 16)
+        orig_pos = matrices[:, 1, 3, :3]
+        mr_orig_pos = matrices[:, 2, 3, :3]
+    else:
+        node_matrices = [data.matrices[r * 48:r * 48 + 16] for r in rows]
+        orig_pos = [data.matrices[r * 48 + 28:r * 48 + 31] for r in rows]
+        mr_orig_pos = [data.matrices[r * 48 + 44:r * 48 + 47] for r in rows]
+    return node_matrices, orig_pos, mr_orig_pos, current_pos, mr_current_pos
+
+
 @utils.viewport_off
 @utils.one_undo
 def getGuideRelativeDictionaryLegacy(mesh, guideOrder):
@@ -287,13 +529,14 @@ def getGuideRelativeDictionaryLegacy(mesh, guideOrder):
     """
     relativeGuide_dict = {}
     mesh = pm.PyNode(mesh)
+    placementMesh = placement_mesh.PlacementMesh(mesh)
     for guide in guideOrder:
         guide = pm.PyNode(guide)
         # slow function A
         clst_vert = meshNavigation.getClosestVertexFromTransform(mesh, guide)
         vertexIds = [clst_vert.name()]
         # slow function B
-        orig_ref_matrix = getVertMatrix(clst_vert.name())
+        orig_ref_matrix = getVertMatrix(clst_vert.name(), placementMesh)
         #  --------------------------------------------------------------------
         a_mat = guide.getMatrix(worldSpace=True)
 
@@ -301,7 +544,7 @@ def getGuideRelativeDictionaryLegacy(mesh, guideOrder):
         pos = mm[3][:3]
 
         mr_vert = meshNavigation.getClosestVertexFromTransform(mesh, pos)
-        mr_orig_ref_matrix = getVertMatrix(mr_vert.name())
+        mr_orig_ref_matrix = getVertMatrix(mr_vert.name(), placementMesh)
         vertexIds.append(mr_vert.name())
 
         node_matrix = guide.getMatrix(worldSpace=True)
@@ -325,22 +568,23 @@ def yieldGuideRelativeDictionary(mesh, guideOrder, relativeGuide_dict):
     Returns:
         dictionary: create a dictionary of guide:[[edgeIDs], relativeMatrix]
     """
-    for guide in guideOrder:
-        guide = pm.PyNode(guide)
-        # slow function A
-        clst_vert = meshNavigation.getClosestVertexFromTransform(mesh, guide)
-        vertexIds = [clst_vert.name()]
-        # slow function B
-        orig_ref_matrix = getVertMatrix(clst_vert.name())
+    placementMesh = placement_mesh.PlacementMesh(mesh)
+    guides = [pm.PyNode(guide) for guide in guideOrder]
+    # closest vertex of all the guides in one batch
+    closestVerts = placementMesh.get_closest_vertices(
+        [guide.getTranslation(space="world") for guide in guides])
+    for guide, clst_vert in zip(guides, closestVerts):
+        vertexIds = [placementMesh.vertex_name(clst_vert)]
+        orig_ref_matrix = getVertMatrix(vertexIds[0], placementMesh)
         #  --------------------------------------------------------------------
         a_mat = guide.getMatrix(worldSpace=True)
 
         mm = ((orig_ref_matrix - a_mat) * -1) + a_mat
         pos = mm[3][:3]
 
-        mr_vert = meshNavigation.getClosestVertexFromTransform(mesh, pos)
-        mr_orig_ref_matrix = getVertMatrix(mr_vert.name())
-        vertexIds.append(mr_vert.name())
+        mr_vert = placementMesh.get_closest_vertex(pos)
+        vertexIds.append(placementMesh.vertex_name(mr_vert))
+        mr_orig_ref_matrix = getVertMatrix(vertexIds[1], placementMesh)
 
         node_matrix = guide.getMatrix(worldSpace=True)
         relativeGuide_dict[guide.name()] = [vertexIds,
@@ -449,6 +693,61 @@ def updateGuidePlacement(guideOrder, guideDictionary, reset_scale=False):
         yield True
 
 
+@utils.viewport_off
+@utils.one_undo
+def updateGuidePlacementBatch(guideOrder, guideDictionary, reset_scale=False):
+    """update the guides based on new universal mesh, in the provided order
+
+    All the reposition matrices are computed in one batch before setting
+    the guides world matrix in the hierarchy order.
+
+    Args:
+        guideOrder (list): of the hierarchy to crawl
+        guideDictionary (dictionary): dict of the guide:edge, matrix position
+        reset_scale (bool, optional): set the guides scale to 1
+
+    Returns:
+        list: of the updated guides
+    """
+    matrices = getRepositionMatrices(guideOrder, guideDictionary)
+    return _setGuideMatrices(matrices, reset_scale=reset_scale)
+
+
+@utils.viewport_off
+@utils.one_undo
+def updateGuidePlacementFromData(data, reset_scale=False):
+    """update the guides from a compact placement, in the guide order
+
+    Args:
+        data (PlacementData): the placement data
+        reset_scale (bool, optional): set the guides scale to 1
+
+    Returns:
+        list: of the updated guides
+    """
+    matrices = getRepositionMatricesFromData(data)
+    return _setGuideMatrices(matrices, reset_scale=reset_scale)
+
+
+def _setGuideMatrices(matrices, reset_scale=False):
+    """set the guides world matrix, keeping or resetting their scale
+
+    Args:
+        matrices (list): of guide name and world matrix as 16 floats
+        reset_scale (bool, optional): set the guides scale to 1
+
+    Returns:
+        list: of the updated guides
+    """
+    for guide, matrix in matrices:
+        scl = mc.getAttr(guide + ".scale")[0]
+        mc.xform(guide, matrix=matrix, worldSpace=True, preserve=True)
+        if reset_scale:
+            scl = [1, 1, 1]
+        mc.xform(guide, scale=scl)
+    return [guide for guide, matrix in matrices]
+
+
 # ==============================================================================
 # Data export, still testing
 # ==============================================================================
@@ -469,6 +768,86 @@ def _exportData(data, filepath):
         print e
 
 
+def getMeshFingerprints(meshes):
+    """get the topology fingerprint of the meshes in the scene
+
+    Args:
+        meshes (list): of mesh names
+
+    Returns:
+        dict: fingerprint by mesh name, None if the mesh doesn't exist
+    """
+    fingerprints = {}
+    for mesh in meshes:
+        if not mc.objExists(mesh):
+            fingerprints[mesh] = None
+            continue
+        fingerprints[mesh] = placement_mesh.PlacementMesh(mesh).fingerprint()
+    return fingerprints
+
+
+def exportPlacementData(filepath, relativeGuide_dict, ordered_hierarchy):
+    """write the placement to a json or a compact placement file
+
+    The compact file is used for the .rgpc extension, with the topology
+    fingerprint of the reference meshes.
+
+    Args:
+        filepath (str): path to export too. Nothing is written if None
+        relativeGuide_dict (dict): dict of the guide:edge, matrix position
+        ordered_hierarchy (list): of the hierarchy to crawl
+    """
+    if not filepath:
+        return
+    if not placement_file.is_compact(filepath):
+        data = {}
+        data["relativeGuide_dict"] = relativeGuide_dict
+        data["ordered_hierarchy"] = ordered_hierarchy
+        _exportData(data, filepath)
+        return
+    data = placement_file.PlacementData.from_dict(relativeGuide_dict,
+                                                  ordered_hierarchy)
+    # the meshes missing from the scene have no fingerprint
+    data.fingerprints = dict(
+        (mesh, fingerprint)
+        for mesh, fingerprint in getMeshFingerprints(data.meshes).items()
+        if fingerprint is not None)
+    placement_file.write(filepath, data)
+
+
+def importPlacementData(filepath):
+    """read a json or a compact placement file as PlacementData
+
+    Args:
+        filepath (str): file to the json or the compact placement
+
+    Returns:
+        PlacementData: the placement data
+    """
+    if placement_file.is_compact(filepath):
+        return placement_file.read(filepath)
+    data = _importData(filepath)
+    return placement_file.PlacementData.from_dict(data["relativeGuide_dict"],
+                                                  data["ordered_hierarchy"])
+
+
+def checkPlacementTopology(data):
+    """check the reference meshes topology against the recorded one
+
+    Args:
+        data (PlacementData): the placement data
+
+    Returns:
+        bool: True if all the meshes match
+    """
+    current = getMeshFingerprints(list(data.fingerprints))
+    mismatches = placement_file.fingerprint_mismatches(data.fingerprints,
+                                                       current)
+    for msg in mismatches:
+        pm.displayWarning("Guide placement topology changed: {}".format(msg))
+    return not mismatches
+
+
 def exportGuidePlacement(filepath=None,
                          reference_mesh=UNIVERSAL_MESH_NAME,
                          root_node=GUIDE_ROOT,
@@ -487,35 +866,47 @@ def exportGuidePlacement(filepath=None,
         list: dict, list, str
     """
     if filepath is None:
+        fileFilter = "Export position(*.json *.{})".format(
+            placement_file.EXTENSION)
         filepath = pm.fileDialog2(fileMode=0,
                                   startingDirectory="/",
-                                  fileFilter="Export position(*.json)")
-        if filepath:
-            filepath = filepath[0]
+                                  fileFilter=fileFilter)
+        if not filepath:
+            return
+        filepath = filepath[0]
     (relativeGuide_dict,
      ordered_hierarchy) = recordInitialGuidePlacement(
         reference_mesh=reference_mesh,
         root_node=root_node,
         skip_crawl_nodes=skip_crawl_nodes,
         skip_strings=skip_strings)
-    data = {}
-    data["relativeGuide_dict"] = relativeGuide_dict
-    data["ordered_hierarchy"] = ordered_hierarchy
-    _exportData(data, filepath)
+    exportPlacementData(filepath, relativeGuide_dict, ordered_hierarchy)
     print "Guide position exported: {}".format(filepath)
     return relativeGuide_dict, ordered_hierarchy, filepath
 
 
 @utils.one_undo
-def importGuidePlacement(filepath):
+def importGuidePlacement(filepath, apply=True, reset_scale=False):
     """import the position from the provided file
 
+    The compact placement files (.rgpc) are only applied if the topology of
+    the reference meshes didn't change.
+
     Args:
-        filepath (str): file to the json
-        referenceMesh (str, optional): name of mesh to compare against
+        filepath (str): file to the json or the compact placement
+        apply (bool, optional): update the guides placement
+        reset_scale (bool, optional): set the guides scale to 1
     """
+    if placement_file.is_compact(filepath):
+        data = placement_file.read(filepath)
+        if apply and checkPlacementTopology(data):
+            updateGuidePlacementFromData(data, reset_scale=reset_scale)
+        return data.to_dict(), data.ordered_hierarchy
     data = _importData(filepath)
-    updateGuidePlacement(data["ordered_hierarchy"], data["relativeGuide_dict"])
+    if apply:
+        updateGuidePlacementBatch(data["ordered_hierarchy"],
+                                  data["relativeGuide_dict"],
+                                  reset_scale=reset_scale)
     return data["relativeGuide_dict"], data["ordered_hierarchy"]
 
 
@@ -0,0 +1,283 @@
+"""Shifter component guide transform store.
+
+The transforms of a component guide (tra, atra, pos, apos and blades) are
+stored as rows of flat float64 arrays: 16 values per matrix and 3 per
+position. The list transforms share the rows of the named transforms with
+the same values. The PyMEL matrices, vectors and blades are only created
+when they are accessed, so loading a guide template or exporting it back
+doesn't create them.
+
+The arrays are python array.array("d"). With NumPy, as_arrays gives them as
+Nx4x4 and Nx3 arrays without copy.
+"""
+from array import array
+from itertools import chain
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _flatten(values, size):
+    """Flatten a matrix or a vector to a list of floats.
+
+    Args:
+        values (list): Matrix as 4 rows or 16 floats, or vector as 3 floats
+        size (int): 16 for a matrix, 3 for a vector
+
+    Returns:
+        list of float: The values
+    """
+    if len(values) == size:
+        return list(values)
+    return list(chain.from_iterable(values))
+
+
+class TransformStore(object):
+    """Matrices and positions of a component guide.
+
+    Attributes:
+        matrices (array): 16 float64 values per matrix
+        positions (array): 3 float64 values per position
+        tra (dict): Matrix row by transform name
+        atra (list): Matrix row of each transform, in order
+        pos (dict): Position row by transform name
+        apos (list): Position row of each transform, in order
+        blades (dict): Matrix row by blade name
+    """
+
+    def __init__(self):
+        self.matrices = array("d")
+        self.positions = array("d")
+        self.tra = {}
+        self.atra = []
+        self.pos = {}
+        self.apos = []
+        self.blades = {}
+
+    def __len__(self):
+        return len(self.matrices) // 16
+
+    def add_matrix(self, values):
+        """Add a matrix.
+
+        Args:
+            values (list): 4 rows or 16 floats
+
+        Returns:
+            int: The matrix row
+        """
+        self.matrices.extend(_flatten(values, 16))
+        return len(self.matrices) // 16 - 1
+
+    def add_position(self, values):
+        """Add a position.
+
+        Args:
+            values (list): 3 floats
+
+        Returns:
+            int: The position row
+        """
+        self.positions.extend(_flatten(values, 3))
+        return len(self.positions) // 3 - 1
+
+    def matrix(self, row):
+        """Get a matrix.
+
+        Args:
+            row (int): The matrix row
+
+        Returns:
+            list: The 4 rows of the matrix
+        """
+        m = self.matrices[row * 16:row * 16 + 16].tolist()
+        return [m[0:4], m[4:8], m[8:12], m[12:16]]
+
+    def position(self, row):
+        """Get a position.
+
+        Args:
+            row (int): The position row
+
+        Returns:
+            list of float: The position
+        """
+        return self.positions[row * 3:row * 3 + 3].tolist()
+
+    def add_transform(self, name, values):
+        """Add a transform read from the guide.
+
+        The transform is added to tra and atra, and its translation to pos
+        and apos.
+
+        Args:
+            name (str): The transform name
+            values (list of float): The 16 values of the world matrix
+        """
+        row = self.add_matrix(values)
+        self.tra[name] = row
+        self.atra.append(row)
+        row = self.add_position(values[12:15])
+        self.pos[name] = row
+        self.apos.append(row)
+
+    def add_blade(self, name, values):
+        """Add a blade read from the guide.
+
+        Args:
+            name (str): The blade name
+            values (list of float): The 16 values of the blade matrix
+        """
+        self.blades[name] = self.add_matrix(values)
+
+    @classmethod
+    def from_dict(cls, c_dict):
+        """Create the store from a component guide template dictionary.
+
+        Args:
+            c_dict (dict): The component dictionary
+
+        Returns:
+            TransformStore: The store
+        """
+        store = cls()
+        rows = {}
+        for name, values in c_dict["tra"].items():
+            values = _flatten(values, 16)
+            store.tra[name] = rows[tuple(values)] = store.add_matrix(values)
+        for values in c_dict["atra"]:
+            values = _flatten(values, 16)
+            row = rows.get(tuple(values))
+            if row is None:
+                row = store.add_matrix(values)
+            store.atra.append(row)
+
+        rows = {}
+        for name, values in c_dict["pos"].items():
+            values = _flatten(values, 3)
+            store.pos[name] = rows[tuple(values)] = store.add_position(
+                values)
+        for values in c_dict["apos"]:
+            values = _flatten(values, 3)
+            row = rows.get(tuple(values))
+            if row is None:
+                row = store.add_position(values)
+            store.apos.append(row)
+
+        for name, values in c_dict["blade"].items():
+            store.blades[name] = store.add_matrix(values)
+        return store
+
+    def as_arrays(self):
+        """Get the matrices and positions as NumPy arrays.
+
+        The arrays share the memory of the store.
+
+        Returns:
+            tuple: Nx4x4 matrices and Nx3 positions arrays. None without
+                NumPy
+        """
+        if numpy is None:
+            return None
+        matrices = numpy.frombuffer(self.matrices, dtype=numpy.float64)
+        positions = numpy.frombuffer(self.positions, dtype=numpy.float64)
+        return matrices.reshape(-1, 4, 4), positions.reshape(-1, 3)
+
+    @property
+    def nbytes(self):
+        """int: Size of the stored values in bytes."""
+        return (len(self.matrices) + len(self.positions)) * 8
+
+
+class LazyMap(MutableMapping):
+    """Dictionary view of named store rows.
+
+    The objects are created from the store values the first time they are
+    accessed. The objects set after creation replace the store values.
+
+    Args:
+        rows (dict): Store row by name. Shared with the store
+        read (function): Returns the values of a row
+        factory (function): Creates the object from the values
+    """
+
+    def __init__(self, rows, read, factory):
+        self.rows = rows
+        self.read = read
+        self.factory = factory
+        self.cache = {}
+
+    def __getitem__(self, name):
+        obj = self.cache.get(name)
+        if obj is None:
+            obj = self.cache[name] = self.factory(
+                self.read(self.rows[name]))
+        return obj
+
+    def __setitem__(self, name, obj):
+        self.cache[name] = obj
+        if name not in self.rows:
+            self.rows[name] = None
+
+    def __delitem__(self, name):
+        del self.rows[name]
+        self.cache.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get_values(self, getter):
+        """Get the values of all the items, without creating the objects.
+
+        Args:
+            getter (function): Returns the values of a created object
+
+        Returns:
+            dict: Values by name
+        """
+        values = {}
+        for name, row in self.rows.items():
+            if name in self.cache:
+                values[name] = getter(self.cache[name])
+            else:
+                values[name] = self.read(row)
+        return values
+
+
+def get_values(view, getter):
+    """Get the values of a transform dictionary.
+
+    Args:
+        view (LazyMap or dict): The transforms
+        getter (function): Returns the values of an object
+
+    Returns:
+        dict: Values by name
+    """
+    if isinstance(view, LazyMap):
+        return view.get_values(getter)
+    return dict((name, getter(obj)) for name, obj in view.items())
+
+
+def reset(view, name):
+    """Drop the created object of a name, to use the store values again.
+
+    Args:
+        view (LazyMap or dict): The transforms
+        name (str): The transform name
+    """
+    if isinstance(view, LazyMap):
+        view.cache.pop(name, None)